@@ -0,0 +1,284 @@
+# archive.py — record fetched METAR payloads, replay them later at N× speed
+#
+# Recording (RECORD): every payload handed to the parser — each mirror
+# chunk, or the batched direct response — is appended as one line to the
+# newest file under DIR, before it is parsed:
+#   [t, "mirror", {"date": ..., "etag": ..., "lm": ...}, [row, row, ...]]
+# t is the Unix time the refresh started (begin()); all lines of one
+# refresh share it. A row is one station report with the FIELDS values
+# in order and clouds as [cover, base] pairs; each file starts with a
+# {"archive": 1, "fields": [...]} header. Files are a00001.jsl, a00002.jsl, ...;
+# past FILE_BYTES a new one is started and the oldest beyond FILES is
+# deleted, so the archive never takes more than FILES x FILE_BYTES of flash.
+#
+# Replay: replay(parse) feeds the next refresh's lines through the same
+# parser, oldest first, wrapping at the end. wait_s() is the recorded gap
+# to the following refresh divided by SPEED (the fetch interval at the
+# end of the archive), so a day of 15-minute fetches plays back in 24
+# minutes at SPEED = 60.
+#
+# Demo mode: a DEMO_FILE on the device ({"speed": 60}, or empty) makes
+# boot.py skip Wi-Fi and main.py replay the archive.
+
+import json, os
+import log
+import stats
+import timesvc
+import upstream
+
+DIR = "archive"
+FILES = 4
+FILE_BYTES = 48 * 1024
+FIELDS = upstream.KEEP      # everything the parser reads
+RECORD = False
+SPEED = 60
+DEMO_FILE = "demo.json"
+
+_name = None                # file being appended to
+_size = 0
+_t = None                   # start of the current refresh (begin())
+
+_file = None                # replay position: file name and byte offset
+_offset = 0
+_fields = FIELDS
+_gap = None                 # seconds to the next recorded refresh
+
+records = 0
+bytes_out = 0
+replayed = 0
+loops = 0
+last_error = None
+
+
+def configure(record=None, speed=None, directory=None):
+    global RECORD, SPEED, DIR
+    if record is not None:
+        RECORD = record
+    if speed is not None:
+        SPEED = speed
+    if directory is not None:
+        DIR = directory
+
+
+def demo_requested():
+    """True if DEMO_FILE exists; applies its "speed"."""
+    try:
+        with open(DEMO_FILE) as f:
+            text = f.read().strip()
+    except OSError:
+        return False
+    try:
+        opts = json.loads(text) if text else {}
+        configure(speed=opts.get("speed"))
+    except ValueError:
+        pass
+    return True
+
+
+def _dumps(x):
+    try:
+        return json.dumps(x, separators=(",", ":"))
+    except TypeError:       # older MicroPython: no separators argument
+        return json.dumps(x)
+
+
+def _path(name):
+    return DIR + "/" + name
+
+
+def _files():
+    try:
+        return sorted(n for n in os.listdir(DIR) if n[0] == "a" and n.endswith(".jsl"))
+    except OSError:
+        return []
+
+
+# ---------- recording ----------
+def _validators(headers):
+    v = {}
+    if headers:
+        for k, val in headers.items():
+            k = k.lower()
+            if k == "date":
+                v["date"] = val
+            elif k == "etag":
+                v["etag"] = val
+            elif k == "last-modified":
+                v["lm"] = val
+    return v
+
+
+def _row(e):
+    out = []
+    for k in FIELDS:
+        v = e.get(k)
+        if k == "clouds" and v:
+            v = [[c.get("cover"), c.get("base")] for c in v]
+        out.append(v)
+    return out
+
+
+def _start_file():
+    global _name, _size
+    names = _files()
+    seq = int(names[-1][1:6]) + 1 if names else 1
+    _name = "a%05d.jsl" % seq
+    head = _dumps({"archive": 1, "fields": list(FIELDS)}) + "\n"
+    with open(_path(_name), "w") as f:
+        f.write(head)
+    _size = len(head)
+    names.append(_name)
+    while len(names) > FILES:
+        os.remove(_path(names.pop(0)))
+
+
+def _open_last():
+    global _name, _size
+    try:
+        os.mkdir(DIR)
+    except OSError:
+        pass                # already there
+    names = _files()
+    if not names:
+        _start_file()
+        return
+    _name = names[-1]
+    _size = os.stat(_path(_name))[6]
+
+
+def begin():
+    """Start of a refresh: every record() until the next begin() shares its time."""
+    global _t
+    _t = timesvc.unix()
+
+
+def record(src, entries, headers=None):
+    """Append one payload (a list of report dicts) before it is parsed."""
+    global RECORD, records, bytes_out, last_error
+    if not RECORD or not entries:
+        return
+    t0 = stats.start()
+    try:
+        if _name is None:
+            _open_last()
+        if _size >= FILE_BYTES:
+            _start_file()
+        n = _write(src, entries, headers)
+        records += 1
+        bytes_out += n
+    except OSError as e:
+        # flash full or read-only: stop rather than fail every refresh
+        RECORD = False
+        last_error = str(e)
+        log.warn("Archive: recording stopped:", e)
+    stats.stop('archive', t0)
+
+
+def _write(src, entries, headers):
+    global _size
+    n = 0
+    with open(_path(_name), "a") as f:
+        # written row by row: the line is never built whole in RAM
+        n += f.write('[%d,"%s",%s,[' % (_t if _t is not None else timesvc.unix(), src,
+                                        _dumps(_validators(headers))))
+        first = True
+        for e in entries:
+            n += f.write(("" if first else ",") + _dumps(_row(e)))
+            first = False
+        n += f.write("]]\n")
+    _size += n
+    return n
+
+
+# ---------- replay ----------
+def _entry(row):
+    e = {}
+    for k, v in zip(_fields, row):
+        if k == "clouds" and v:
+            v = [{"cover": c[0], "base": c[1]} for c in v]
+        e[k] = v
+    return e
+
+
+def _next_line():
+    """Next record line, moving on to the next file at the end of one; None at the end."""
+    global _file, _offset, _fields
+    names = _files()
+    if _file not in names:
+        if not names:
+            return None
+        _file, _offset = names[0], 0
+    while True:
+        with open(_path(_file)) as f:
+            f.seek(_offset)
+            line = f.readline()
+            _offset = f.tell()
+        if line.startswith("["):
+            return line
+        if line.startswith("{"):
+            _fields = tuple(json.loads(line).get("fields", FIELDS))
+            continue
+        if line:
+            continue
+        i = names.index(_file) + 1
+        if i >= len(names):
+            return None
+        _file, _offset = names[i], 0
+
+
+def _line_t(line):
+    return int(line[1:line.index(",")])
+
+
+def replay(parse):
+    """Parse the next recorded refresh; wraps to the oldest at the end. Returns a fetch code."""
+    global _file, _offset, _gap, replayed, loops
+    t_fetch = stats.start()
+    line = _next_line()
+    if line is None:
+        _file = None                        # wrap
+        line = _next_line()
+        if line is None:
+            log.warn("Archive: nothing to replay in", DIR)
+            return 404
+        loops += 1
+    t = _line_t(line)
+    code = 200
+    _gap = None
+    while line is not None:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            rec = None                      # torn by a reset mid-write: skip it
+        line = None
+        if rec is not None:
+            c = parse([_entry(r) for r in rec[3]])
+            rec = None
+            replayed += 1
+            if c != 200 and code == 200:
+                code = c
+        pos = (_file, _offset)
+        nxt = _next_line()
+        if nxt is None:
+            break
+        if _line_t(nxt) != t:
+            _gap = _line_t(nxt) - t
+            _file, _offset = pos            # leave it for the next refresh
+            break
+        line = nxt
+    stats.collect()
+    stats.stop('fetch', t_fetch)
+    return code
+
+
+def wait_s(interval):
+    """Seconds to show this refresh: the recorded gap / SPEED (interval / SPEED at a wrap)."""
+    gap = _gap if _gap is not None and _gap > 0 else interval
+    return max(1, int(gap / SPEED + 0.5))
+
+
+def status():
+    return {"record": RECORD, "dir": DIR, "files": len(_files()), "file": _name,
+            "records": records, "bytes": bytes_out, "replayed": replayed,
+            "loops": loops, "replay_file": _file, "speed": SPEED,
+            "last_error": last_error}
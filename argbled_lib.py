@@ -46,6 +46,20 @@ class slice_maker_class:
 slice_maker = slice_maker_class()
 
 
+# Power model for WS2812/SK6812: each colour channel draws up to ~20 mA at
+# full value, and each LED idles at ~1 mA even when dark. The estimate is a
+# running sum of every channel byte in the buffer (after brightness), kept
+# up to date in set_pixel, so show() never has to rescan the strip.
+MA_PER_CHANNEL = 20
+IDLE_MA_PER_LED = 1
+
+
+def scale_word(v, k):
+    """Scale all four bytes of pixel word v by k/256 (0..256)."""
+    return ((((v >> 24) & 255) * k >> 8) << 24 | (((v >> 16) & 255) * k >> 8) << 16 |
+            (((v >> 8) & 255) * k >> 8) << 8 | ((v & 255) * k >> 8))
+
+
 # Delay here is the reset time. You need a pause to reset the LED strip back to the initial LED
 # however, if you have quite a bit of processing to do before the next time you update the strip
 # you could put in delay=0 (or a lower delay)
@@ -71,9 +85,11 @@ class Argbled:
     #    'shift',      # shift amount for each component, in a tuple for (R,B,G,W)
     #    'delay',      # delay amount
     #    'brightnessvalue', # brightness scale factor 1..255
+    #    'max_ma',     # current cap in mA (None = no limit)
+    #    'level_sum',  # sum of all channel bytes in pixels (power estimate)
     # ]
 
-    def __init__(self, num_leds, state_machine, pin, mode="RGB", delay=0.0001):
+    def __init__(self, num_leds, state_machine, pin, mode="RGB", delay=0.0001, max_ma=None):
         """
         Constructor for library class
 
@@ -83,6 +99,7 @@ class Argbled:
         :param mode: [default: "RGB"] mode and order of bits representing the color value.
         This can be any order of RGB or RGBW (neopixels are usually GRB)
         :param delay: [default: 0.0001] delay used for latching of leds when sending data
+        :param max_ma: [default: None] current budget in mA; frames estimated above it are dimmed
         """
         self.pixels = array.array("I", [0] * num_leds)
         self.mode = mode
@@ -101,6 +118,11 @@ class Argbled:
         self.num_leds = num_leds
         self.delay = delay
         self.brightnessvalue = 255
+        self.max_ma = max_ma
+        self.level_sum = 0
+        self.frame_ma = 0           # estimate for the last frame shown (before limiting)
+        self.peak_ma = 0
+        self.limited_frames = 0
 
     def brightness(self, brightness=None):
         """
@@ -192,12 +214,27 @@ class Argbled:
             white = round(rgb_w[3] * bratio)
 
         pix_value = white << sh_W | blue << sh_B | red << sh_R | green << sh_G
+        level = red + green + blue + white
+        pixels = self.pixels
         # set some subset, if pixel_num is a slice:
         if type(pixel_num) is slice:
-            for i in range(*pixel_num.indices(self.num_leds)):
-                self.pixels[i] = pix_value
+            start, stop, step = pixel_num.indices(self.num_leds)
+            if start == 0 and stop == self.num_leds and step == 1:
+                # whole strip: the new sum is known without reading the old one
+                for i in range(stop):
+                    pixels[i] = pix_value
+                self.level_sum = level * stop
+                return
+            s = self.level_sum
+            for i in range(start, stop, step):
+                old = pixels[i]
+                s += level - ((old & 255) + (old >> 8 & 255) + (old >> 16 & 255) + (old >> 24 & 255))
+                pixels[i] = pix_value
+            self.level_sum = s
         else:
-            self.pixels[pixel_num] = pix_value
+            old = pixels[pixel_num]
+            self.level_sum += level - ((old & 255) + (old >> 8 & 255) + (old >> 16 & 255) + (old >> 24 & 255))
+            pixels[pixel_num] = pix_value
 
     def get_pixel(self, pixel_num):
         """
@@ -327,10 +364,81 @@ class Argbled:
         if self.W_in_mode:
             cut = 0
         sm_put = self.sm.put
-        for pixval in self.pixels:
-            sm_put(pixval, cut)
+        k = self._frame_scale()
+        if k < 256:
+            for pixval in self.pixels:
+                sm_put(scale_word(pixval, k), cut)
+        else:
+            for pixval in self.pixels:
+                sm_put(pixval, cut)
         time.sleep(self.delay)
 
+    def estimate_ma(self):
+        """
+        Estimated strip current for the buffer as it stands now.
+
+        :return: milliamps (int)
+        """
+        return self.num_leds * IDLE_MA_PER_LED + self.level_sum * MA_PER_CHANNEL // 255
+
+    def _frame_scale(self):
+        # Record this frame's estimate; return the scale (0..256, 256 = as is)
+        # that keeps it within max_ma. The buffer itself is never changed.
+        ma = self.estimate_ma()
+        self.frame_ma = ma
+        if ma > self.peak_ma:
+            self.peak_ma = ma
+        cap = self.max_ma
+        if not cap or ma <= cap:
+            return 256
+        self.limited_frames += 1
+        idle = self.num_leds * IDLE_MA_PER_LED
+        if cap <= idle:
+            return 0
+        return (cap - idle) * 256 // (ma - idle)
+
+    def power_status(self):
+        """
+        Power figures for instrumentation.
+
+        :return: dict with frame_ma, peak_ma, max_ma and limited_frames
+        """
+        return {"frame_ma": self.frame_ma, "peak_ma": self.peak_ma,
+                "max_ma": self.max_ma, "limited_frames": self.limited_frames}
+
+    def snapshot(self, out=None, offset=0):
+        """
+        Copy the raw pixel words (colour order and brightness applied) into out.
+
+        :param out: [default: None] array('I') to copy into; a new one is made if None
+        :param offset: [default: 0] position in out of the first word
+        :return: out
+        """
+        if out is None:
+            out = array.array("I", self.pixels)
+        else:
+            out[offset:offset + self.num_leds] = self.pixels
+        return out
+
+    def blit(self, words, offset=0, level_sum=None):
+        """
+        Replace the whole buffer with num_leds raw words from words[offset:].
+        Words must come from snapshot() at the same mode. No per-pixel work.
+
+        :param words: array('I') (or memoryview of one) holding raw words
+        :param offset: [default: 0] index of the first word to copy
+        :param level_sum: [default: None] power estimate for these words (see snapshot)
+        :return: None
+        """
+        n = self.num_leds
+        memoryview(self.pixels)[:] = memoryview(words)[offset:offset + n]
+        if level_sum is None:
+            s = 0
+            for v in self.pixels:
+                s += (v & 255) + (v >> 8 & 255) + (v >> 16 & 255) + (v >> 24 & 255)
+            level_sum = s
+        self.level_sum = level_sum
+
     def fill(self, rgb_w, how_bright=None):
         """
         Fill the entire strip with color rgb_w
@@ -349,3 +457,4 @@ class Argbled:
         :return: None
         """
         self.pixels = array.array("I", [0] * self.num_leds)
+        self.level_sum = 0
@@ -0,0 +1,193 @@
+# argbled_multi.py — one logical LED strip spread over several pins / PIO state machines
+#
+# A WS2812 takes 24 bits at 800 kHz = 30 us per LED, so one strip of 400
+# LEDs needs 12 ms per frame. Split the same 400 LEDs over 4 pins and the
+# four state machines clock out in parallel: 100 LEDs' worth, 3 ms.
+#
+#   pixels = MultiArgbled([(1, 100), (2, 100), (3, 100, True), (4, 100)], "GRB")
+#
+# Each strip is (pin, count) or (pin, count, reversed). Logical indices run
+# along strip 0, then strip 1, ... (reversed strips are numbered from their
+# far end), unless index_map is given: index_map[logical] = physical index
+# in that same numbering. The class has the same drawing surface as
+# Argbled (set_pixel, fill, brightness, show, ...), so functions.py does
+# not need to know how the map is wired.
+
+import array, time
+from argbled_lib import Argbled, slice_maker, scale_word
+
+WIRE_US_PER_BIT = 1.25      # WS2812 800 kHz bit time
+RESET_US = 80               # latch gap after a frame
+MAX_STATE_MACHINES = 8      # 2 PIO blocks x 4
+
+
+class MultiArgbled:
+
+    def __init__(self, strips, mode="RGB", first_sm=0, index_map=None, delay=0.0001, max_ma=None):
+        """
+        :param strips: list of (pin, count) or (pin, count, reversed)
+        :param mode: colour order, as for Argbled
+        :param first_sm: state machine id used for strip 0; strip n uses first_sm + n
+        :param index_map: optional sequence, index_map[logical] = physical index
+        :param delay: latch delay after each show()
+        :param max_ma: current budget in mA for all strips together (None = no limit)
+        """
+        if first_sm + len(strips) > MAX_STATE_MACHINES:
+            raise ValueError("not enough PIO state machines for %d strips" % len(strips))
+        self.strips = []
+        phys_strip = bytearray()
+        phys_off = array.array("H")
+        for n, spec in enumerate(strips):
+            pin, count = spec[0], spec[1]
+            rev = len(spec) > 2 and spec[2]
+            self.strips.append(Argbled(count, first_sm + n, pin, mode, delay=0))
+            for k in range(count):
+                phys_strip.append(n)
+                phys_off.append(count - 1 - k if rev else k)
+
+        if index_map is None:
+            index_map = range(len(phys_off))
+        self.num_leds = len(index_map)
+        self._strip = bytearray(self.num_leds)
+        self._off = array.array("H", [0] * self.num_leds)
+        for i, p in enumerate(index_map):
+            self._strip[i] = phys_strip[p]
+            self._off[i] = phys_off[p]
+
+        first = self.strips[0]
+        self.mode = mode
+        self.W_in_mode = first.W_in_mode
+        self.shift = first.shift
+        self.delay = delay
+        self.brightnessvalue = 255
+        self.max_ma = max_ma
+        self.level_sum = 0
+        self.frame_ma = 0
+        self.peak_ma = 0
+        self.limited_frames = 0
+        self._bufs = [s.pixels for s in self.strips]
+        self._lens = [s.num_leds for s in self.strips]
+
+    def physical(self, logical):
+        """(strip, offset) that logical index drives."""
+        return self._strip[logical], self._off[logical]
+
+    def brightness(self, brightness=None):
+        if brightness is None:
+            return self.brightnessvalue
+        if brightness < 1:
+            brightness = 1
+        if brightness > 255:
+            brightness = 255
+        self.brightnessvalue = brightness
+        for s in self.strips:
+            s.brightnessvalue = brightness
+
+    def set_pixel(self, pixel_num, rgb_w, how_bright=None):
+        if how_bright is None:
+            how_bright = self.brightnessvalue
+        sh_R, sh_G, sh_B, sh_W = self.shift
+        bratio = how_bright / 255.0
+        white = 0
+        if len(rgb_w) == 4 and self.W_in_mode:
+            white = round(rgb_w[3] * bratio)
+        red = round(rgb_w[0] * bratio)
+        green = round(rgb_w[1] * bratio)
+        blue = round(rgb_w[2] * bratio)
+        pix_value = white << sh_W | blue << sh_B | red << sh_R | green << sh_G
+        level = red + green + blue + white
+        bufs, strip, off = self._bufs, self._strip, self._off
+        if type(pixel_num) is slice:
+            s = self.level_sum
+            for i in range(*pixel_num.indices(self.num_leds)):
+                b = bufs[strip[i]]
+                old = b[off[i]]
+                s += level - ((old & 255) + (old >> 8 & 255) + (old >> 16 & 255) + (old >> 24 & 255))
+                b[off[i]] = pix_value
+            self.level_sum = s
+        else:
+            b = bufs[strip[pixel_num]]
+            old = b[off[pixel_num]]
+            self.level_sum += level - ((old & 255) + (old >> 8 & 255) + (old >> 16 & 255) + (old >> 24 & 255))
+            b[off[pixel_num]] = pix_value
+
+    def get_pixel(self, pixel_num):
+        return self.strips[self._strip[pixel_num]].get_pixel(self._off[pixel_num])
+
+    # drawing helpers only go through set_pixel / brightness, so share them
+    set_pixel_line_gradient = Argbled.set_pixel_line_gradient
+    set_pixel_line = Argbled.set_pixel_line
+    __setitem__ = Argbled.__setitem__
+    colorHSV = Argbled.colorHSV
+    # power estimate / limiter works on num_leds, level_sum and max_ma
+    estimate_ma = Argbled.estimate_ma
+    _frame_scale = Argbled._frame_scale
+    power_status = Argbled.power_status
+
+    def fill(self, rgb_w, how_bright=None):
+        self.set_pixel(slice_maker[:], rgb_w, how_bright)
+
+    def snapshot(self, out=None, offset=0):
+        """Raw words of all strips, strip 0 first (physical order)."""
+        if out is None:
+            out = array.array("I", [0] * sum(self._lens))
+        o = offset
+        for b in self._bufs:
+            out[o:o + len(b)] = b
+            o += len(b)
+        return out
+
+    def blit(self, words, offset=0, level_sum=None):
+        """Load raw words laid out as by snapshot() back into the strips."""
+        mv = memoryview(words)
+        o = offset
+        for b in self._bufs:
+            memoryview(b)[:] = mv[o:o + len(b)]
+            o += len(b)
+        if level_sum is None:
+            s = 0
+            for b in self._bufs:
+                for v in b:
+                    s += (v & 255) + (v >> 8 & 255) + (v >> 16 & 255) + (v >> 24 & 255)
+            level_sum = s
+        self.level_sum = level_sum
+
+    def clear(self):
+        for b in self._bufs:
+            for i in range(len(b)):
+                b[i] = 0
+        self.level_sum = 0
+
+    def show(self):
+        """
+        Feed all state machines word by word in turn, so every strip is
+        clocking out at once; put() only blocks while that FIFO is full.
+        """
+        cut = 0 if self.W_in_mode else 8
+        puts = [s.sm.put for s in self.strips]
+        bufs = self._bufs
+        lens = self._lens
+        ns = len(puts)
+        common = min(lens)
+        sc = self._frame_scale()
+        if sc < 256:
+            # over budget: dim this frame's words on the way out
+            for i in range(max(lens)):
+                for k in range(ns):
+                    if i < lens[k]:
+                        puts[k](scale_word(bufs[k][i], sc), cut)
+            time.sleep(self.delay)
+            return
+        for i in range(common):
+            for k in range(ns):
+                puts[k](bufs[k][i], cut)
+        for i in range(common, max(lens)):
+            for k in range(ns):
+                if i < lens[k]:
+                    puts[k](bufs[k][i], cut)
+        time.sleep(self.delay)
+
+    def frame_us(self):
+        """Modelled wire time of one show(): the longest strip plus the latch gap."""
+        bits = 32 if self.W_in_mode else 24
+        return int(max(self._lens) * bits * WIRE_US_PER_BIT) + RESET_US
@@ -1,14 +1,16 @@
 # boot.py — simple, robust Wi-Fi setup portal for Pico W
 
+try:
+    import wifi_link   # first: starts the boot → connected timer
+except ImportError:
+    wifi_link = None   # left behind by an older updater: see fetch_missing()
 from phew import access_point, dns, server
 import network, machine, utime, json, _thread, os
 network.WLAN(network.AP_IF).active(False)
-network.WLAN(network.STA_IF).active(False)
-utime.sleep_ms(200)
 
 AP_NAME        = "WEATHER_MAP"
 AP_DOMAIN      = "weathermap.setup"       # not a real domain
-WIFI_FILE      = "wifi.json"
+WIFI_FILE      = wifi_link.WIFI_FILE if wifi_link else "wifi.json"
 
 # ---------------------------------------------------------------
 def machine_reset():
@@ -17,85 +19,72 @@ def machine_reset():
     machine.reset()
 
 # ---------------------------------------------------------------
-def try_connect_saved():
+def try_connect_saved(use_cache=True):
     """Try to connect with saved wifi.json. Return True if connected."""
+    if wifi_link is None:
+        return _connect_plain()
+    creds = wifi_link.load_creds()
+    if not creds:
+        return False
+    ssid, password = creds
+    print("Connecting to", ssid, "…")
+    return wifi_link.connect(ssid, password, use_cache) is not None
+
+def _connect_plain():
+    """Plain DHCP connect without wifi_link.py, just enough to fetch it."""
     try:
         with open(WIFI_FILE) as f:
             creds = json.load(f)
     except Exception as e:
         print("⚠️ No wifi.json found:", e)
         return False
-
-    ssid = creds.get("ssid", "")
-    password = creds.get("password", "")
-    if isinstance(ssid, str): ssid = ssid.encode()
-    if isinstance(password, str): password = password.encode()
-
-    print("Connecting to", ssid, "…")
-
-    # Make sure AP is down and STA reset
-    ap = network.WLAN(network.AP_IF)
-    ap.active(False)
     wlan = network.WLAN(network.STA_IF)
-    wlan.active(False)
-    utime.sleep_ms(200)
     wlan.active(True)
-
-    # Check interface really came up
-    if not wlan.active():
-        print("⚠️ WLAN interface failed to start, retrying…")
-        utime.sleep(0.5)
-        wlan.active(True)
-    utime.sleep(0.3)
-
     try:
-        wlan.connect(ssid, password)
+        wlan.connect(creds.get("ssid", ""), creds.get("password", ""))
     except OSError as e:
         print("⚠️ wlan.connect() raised:", e)
         return False
-
     for _ in range(60):
         if wlan.isconnected():
             print("✅ Connected:", wlan.ifconfig())
             return True
         utime.sleep(0.5)
-
-    print("❌ Connection failed.")
     wlan.active(False)
     return False
 
+# ---------------------------------------------------------------
+# An update only fetches the files in the running updater's list, so a
+# device can come back from one without modules the new main.py imports
+# (the first ota_daily.py knew four files). Before main.py: bring the
+# updater and its imports up to date with whichever ota_daily.py is on
+# flash and reboot; the new one then fetches everything still missing.
+OTA_BOOTSTRAP = ("log.py", "stats.py", "watchdog.py", "timesvc.py", "upstream.py", "ota_daily.py")
+
+def fetch_missing():
+    try:
+        import ota_daily
+    except ImportError as e:
+        print("⚠️ OTA updater unusable:", e)
+        return
+    if not hasattr(ota_daily, "fetch_missing"):
+        print("Older OTA updater on flash — updating it first…")
+        for fname in OTA_BOOTSTRAP:
+            # ota_daily.py last: it only goes in once its imports are there
+            if not ota_daily._download_and_replace(fname):
+                return
+        machine_reset()
+    if ota_daily.fetch_missing():
+        print("Fetched files missing after an update")
+        machine_reset()
+
 
 # ---------------------------------------------------------------
 def setup_mode():
     print("Entering setup mode…")
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    nets = wlan.scan()
-    ssids = []
-    for n in nets:
-        try:
-            name = n[0].decode("utf-8").strip()
-        except:
-            name = ""
-        if name:
-            ssids.append(name)
-    ssids = sorted(set(ssids))
-    print("Found networks:", ssids)
+    import portal
 
     # ---------- Handlers ----------
-    def ap_index(request):
-        opts = "".join(f'<option value="{s}">{s}</option>' for s in ssids)
-        html = f"""<!DOCTYPE html>
-<html><head><meta charset="utf-8"><title>Select Wi-Fi</title></head>
-<body>
-<h2>Select Wi-Fi Network</h2>
-<form action="/configure" method="get">
-<select name="ssid">{opts}</select><br><br>
-Password: <input type="password" name="password"><br><br>
-<button type="submit">Connect</button>
-</form></body></html>"""
-        return html
-
     def ap_configure(request):
         print("Saving Wi-Fi credentials…")
 
@@ -149,22 +138,9 @@ Password: <input type="password" name="password"><br><br>
 
 
 
-    def portal_probe(request):
-        # Redirect captive portal probes to the setup page
-        return '<meta http-equiv="refresh" content="0; url=/">'
-
-    def ap_catch_all(request):
-        return "Not found", 404
-
     # ---------- Routes ----------
-    server.add_route("/", ap_index)
-    server.add_route("/configure", ap_configure)
-    server.add_route("/generate_204", portal_probe)
-    server.add_route("/gen_204", portal_probe)
-    server.add_route("/hotspot-detect.html", portal_probe)
-    server.add_route("/connecttest.txt", portal_probe)
-    server.add_route("/ncsi.txt", portal_probe)
-    server.set_callback(ap_catch_all)
+    # portal.py serves the static page, the cached scan and the probe redirects
+    portal.start(ap_configure, AP_DOMAIN)
 
     # ---------- Start AP ----------
     ap = access_point(AP_NAME)
@@ -175,23 +151,60 @@ Password: <input type="password" name="password"><br><br>
 
 # ---------------------------------------------------------------
 # Startup logic — retry Wi-Fi for up to ~3 minutes before setup mode
+# The first attempt joins the cached BSSID; later ones do a full connect.
 MAX_WIFI_RETRIES = 9        # 9 × ~20s timeout = ~3 minutes
 RETRY_DELAY_S    = 15       # extra pause between attempts (router recovery)
+MAX_IMPORT_RETRIES = 3      # reboots to fetch a module main.py lacks, then setup mode
+IMPORT_RETRY_FILE  = ".import_retries.txt"
+
+def import_retries(n=None):
+    """Boots in a row that failed on a missing module; n stores a new count (0 deletes)."""
+    if n is None:
+        try:
+            with open(IMPORT_RETRY_FILE) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return 0
+    try:
+        if n:
+            with open(IMPORT_RETRY_FILE, "w") as f:
+                f.write(str(n))
+        else:
+            os.remove(IMPORT_RETRY_FILE)
+    except OSError:
+        pass
+    return n
+
+# demo.json (archive.py): replay the recorded archive, no Wi-Fi needed
+try:
+    import archive
+    demo = archive.demo_requested()
+except ImportError:
+    demo = False
 
 connected = False
 for attempt in range(1, MAX_WIFI_RETRIES + 1):
+    if demo:
+        break
     print(f"Wi-Fi attempt {attempt}/{MAX_WIFI_RETRIES}…")
-    if try_connect_saved():
+    if try_connect_saved(use_cache=(attempt == 1)):
         connected = True
         break
     if attempt < MAX_WIFI_RETRIES:
         print(f"Waiting {RETRY_DELAY_S}s before retry…")
         utime.sleep(RETRY_DELAY_S)
 
-if connected:
-    print("Wi-Fi connected — launching main.py…")
+if connected or demo:
+    if demo:
+        print("demo.json found — launching main.py in replay mode…")
+    else:
+        if wifi_link:
+            wifi_link.log_boot_timing()
+        fetch_missing()
+        print("Wi-Fi connected — launching main.py…")
     try:
         import main
+        import_retries(0)
         if hasattr(main, "run"):
             main.run()
         elif hasattr(main, "main"):
@@ -201,9 +214,25 @@ if connected:
         sys.print_exception(e)
         print("main.py crashed — falling back to setup mode.")
         try:
-            os.remove(WIFI_FILE)
+            import log
+            log.exception(e, "main.py crashed")
+            log.flush()
         except:
             pass
+        if isinstance(e, ImportError) and not demo:
+            # a file is still missing after an update: keep the Wi-Fi
+            # details and let fetch_missing() try again after a reboot,
+            # right away (main.py may have armed the watchdog already)
+            tries = import_retries(import_retries() + 1)
+            if tries < MAX_IMPORT_RETRIES:
+                machine_reset()
+            print("Module still missing after", tries, "boots — entering setup mode.")
+            import_retries(0)       # a reboot from setup mode tries again
+        elif not demo:              # the saved network was not the problem
+            try:
+                os.remove(WIFI_FILE)
+            except:
+                pass
         setup_mode()
 else:
     print("All Wi-Fi attempts failed — entering setup mode.")
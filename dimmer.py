@@ -0,0 +1,184 @@
+# dimmer.py — day/night brightness with smooth ramps and one ticks deadline
+#
+# Call tick() as often as you like (every frame is fine): unless its
+# deadline has passed it is a single ticks_diff compare. When the deadline
+# passes it either takes the next step of a brightness ramp, or works out
+# where we are in the day and sleeps until the next change (capped at
+# MAX_WAIT_S so a clock correction is picked up).
+#
+# The day runs between the fixed bright/dim local times or, with use_sun
+# on, from sunrise to sunset (suntable.py, generated host-side by
+# host/make_suntable.py, so the device only indexes a table). Ramps walk a
+# precomputed step table from day to night brightness over RAMP_S.
+
+import time
+import timesvc
+import log
+
+RAMP_S = 20 * 60            # length of a dusk / dawn ramp
+RAMP_STEPS = 40             # brightness steps in a ramp
+MAX_WAIT_S = 15 * 60        # re-plan at least this often
+UNSYNCED_RETRY_S = 10
+
+# ---------- config (set by configure()) ----------
+enabled = True
+use_sun = False             # fixed times unless configure(use_sun_times=True)
+sunrise_offset_min = 0      # + = brighten later than sunrise
+sunset_offset_min = 0       # + = dim later than sunset
+bright_start = (7, 0)       # fixed-time mode, local
+dim_start = (21, 0)
+day_level = 20
+night_level = 10
+
+# ---------- state ----------
+_pixels = None
+_deadline = None            # ticks_ms of the next piece of work (None = now)
+_ramp = b""                 # steps still to apply, in order
+_ramp_i = 0
+_step_ms = RAMP_S * 1000 // RAMP_STEPS
+_down = b""                 # day → night step table
+_up = b""                   # night → day
+_table = None
+phase = None                # "day" / "night" once planned
+next_change = None          # epoch secs of the next dawn / dusk
+
+
+def night_level_for(day, dim):
+    """Dim setting → brightness. Values <= 1 are a fraction of day (0.5 = half)."""
+    if dim <= 1:
+        dim = day * dim
+    return max(1, min(255, int(dim + 0.5)))
+
+
+def _steps(a, b):
+    # Eased a → b (quadratic, so the change is gentle at the dark end where
+    # the eye is most sensitive); integer math, one byte per step.
+    out = bytearray(RAMP_STEPS)
+    n2 = RAMP_STEPS * RAMP_STEPS
+    for k in range(1, RAMP_STEPS + 1):
+        r = RAMP_STEPS - k
+        if b < a:     # dimming: fast first, slow near the night level
+            v = b + (a - b) * r * r // n2
+        else:         # brightening: slow first, away from the night level
+            v = a + (b - a) * k * k // n2
+        out[k - 1] = v
+    return bytes(out)
+
+
+def configure(pixels=None, day=None, dim=None, use_sun_times=None, bright=None, dim_at=None,
+              active=None, rise_offset=None, set_offset=None):
+    """Set any subset of the dimming config and re-plan on the next tick."""
+    global _pixels, day_level, night_level, use_sun, bright_start, dim_start, enabled
+    global sunrise_offset_min, sunset_offset_min, _down, _up, _deadline, _ramp, _ramp_i
+    if pixels is not None:
+        _pixels = pixels
+    if day is not None:
+        day_level = day
+    if dim is not None:
+        night_level = night_level_for(day_level, dim)
+    if use_sun_times is not None:
+        use_sun = use_sun_times
+    if bright is not None:
+        bright_start = tuple(bright)
+    if dim_at is not None:
+        dim_start = tuple(dim_at)
+    if active is not None:
+        enabled = active
+    if rise_offset is not None:
+        sunrise_offset_min = rise_offset
+    if set_offset is not None:
+        sunset_offset_min = set_offset
+    _down = _steps(day_level, night_level)
+    _up = _steps(night_level, day_level)
+    _ramp = b""
+    _ramp_i = 0
+    _deadline = None
+
+
+def _sun(yday):
+    global _table
+    if _table is None:
+        import suntable
+        _table = suntable.TABLE
+    i = (yday - 1) * 4
+    t = _table
+    return (t[i] << 8 | t[i + 1]), (t[i + 2] << 8 | t[i + 3])
+
+
+def day_window(now):
+    """(dawn, dusk) epoch seconds for the UTC day containing now."""
+    if use_sun:
+        midnight = now - now % 86400
+        rise, sset = _sun(time.gmtime(now)[7])
+        return (midnight + (rise + sunrise_offset_min) * 60,
+                midnight + (sset + sunset_offset_min) * 60)
+    off = timesvc.utc_offset_s(now)
+    local = now + off
+    midnight = local - local % 86400 - off
+    return (midnight + (bright_start[0] * 60 + bright_start[1]) * 60,
+            midnight + (dim_start[0] * 60 + dim_start[1]) * 60)
+
+
+def _plan(now):
+    """Return (phase, seconds until the next change)."""
+    global next_change
+    dawn, dusk = day_window(now)
+    if now < dawn:
+        ph, nxt = "night", dawn
+    elif now < dusk:
+        ph, nxt = "day", dusk
+    else:
+        ph, nxt = "night", day_window(now + 86400 - now % 86400)[0]
+    next_change = nxt
+    return ph, nxt - now
+
+
+def _set(level):
+    if _pixels.brightness() != level:
+        _pixels.brightness(level)
+
+
+def tick():
+    """Cheap unless a deadline has passed. Returns True when brightness changed."""
+    global _deadline, _ramp, _ramp_i, phase
+    if _deadline is not None and time.ticks_diff(_deadline, time.ticks_ms()) > 0:
+        return False
+    now_ms = time.ticks_ms()
+    if _ramp_i < len(_ramp):
+        _set(_ramp[_ramp_i])
+        _ramp_i += 1
+        _deadline = time.ticks_add(now_ms, _step_ms)
+        return True
+    if not enabled or _pixels is None:
+        if _pixels is not None:
+            _set(day_level)
+        _deadline = time.ticks_add(now_ms, MAX_WAIT_S * 1000)
+        return False
+    if not timesvc.synced:
+        _deadline = time.ticks_add(now_ms, UNSYNCED_RETRY_S * 1000)
+        return False
+    ph, wait_s = _plan(time.time())
+    target = day_level if ph == "day" else night_level
+    changed = False
+    if phase is None or _pixels.brightness() not in (day_level, night_level):
+        # first plan (or config change): go straight there, no ramp
+        _set(target)
+        changed = True
+    elif ph != phase:
+        log.info("Dimmer:", ph, "ramp to", target)
+        _ramp = _up if ph == "day" else _down
+        _ramp_i = 0
+        phase = ph
+        return tick()
+    phase = ph
+    _deadline = time.ticks_add(now_ms, int(min(wait_s, MAX_WAIT_S)) * 1000)
+    return changed
+
+
+def status():
+    return {
+        "enabled": enabled, "use_sun": use_sun, "phase": phase,
+        "level": _pixels.brightness() if _pixels else None,
+        "day_level": day_level, "night_level": night_level,
+        "next_change": next_change, "ramping": _ramp_i < len(_ramp),
+    }
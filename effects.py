@@ -0,0 +1,100 @@
+# effects.py — geographic effects over the weather frame, by table lookup only
+#
+# A ripple starts at one station and spreads outward through its nearest
+# neighbours (stationdb.neighbours / buckets, precomputed host-side): on
+# frame f of the ripple, neighbours whose distance bucket is f light up with
+# _STRENGTH[f], so the effect moves BUCKET_KM per frame and fades as it
+# goes. Two kinds:
+#   KIND_LTG        a lightning flash echoing to nearby stations
+#   1..4            a category change (history.CAT_CODES) sweeping out
+#                   in the new category's colour, like a front passing
+# step() runs once per render frame and fills `level` / `kind` (one byte
+# per station); render_weather_frame blends them over the base colour.
+# No distances are computed on the device.
+
+import array
+import stationdb
+
+MAX_RIPPLES = 8
+RINGS = 6                   # distance buckets a ripple travels
+LTG_COOLDOWN = 12           # frames before a station's next lightning ripple
+KIND_LTG = 0
+_FREE = 255
+_STRENGTH = bytes([200, 170, 135, 100, 70, 40])   # overlay /256 per ring
+
+_src = array.array("H", [0] * MAX_RIPPLES)
+_kind = bytearray(MAX_RIPPLES)
+_age = bytearray([_FREE]) * MAX_RIPPLES
+level = bytearray(0)        # overlay strength per station this frame
+kind = bytearray(0)         # overlay kind per station this frame
+_cool = bytearray(0)
+_zero = b""
+_lit = False                # level has non-zero entries
+started = 0
+dropped = 0
+
+
+def init(n):
+    global level, kind, _cool, _zero, _lit
+    level = bytearray(n)
+    kind = bytearray(n)
+    _cool = bytearray(n)
+    _zero = bytes(n)
+    _lit = False
+    for r in range(MAX_RIPPLES):
+        _age[r] = _FREE
+
+
+def trigger(i, k):
+    """Start a ripple of kind k at station i. Returns False if none was started."""
+    global started, dropped
+    if i >= len(_cool) or not stationdb.k:
+        return False
+    if k == KIND_LTG:
+        if _cool[i]:
+            return False
+        _cool[i] = LTG_COOLDOWN
+    for r in range(MAX_RIPPLES):
+        if _age[r] == _FREE:
+            _src[r] = i
+            _kind[r] = k
+            _age[r] = 0
+            started += 1
+            return True
+    dropped += 1
+    return False
+
+
+def step():
+    """Advance every ripple one frame. Returns True if any station is overlaid."""
+    global _lit
+    if _lit:
+        level[:] = _zero
+        _lit = False
+    cool = _cool
+    for i in range(len(cool)):
+        if cool[i]:
+            cool[i] -= 1
+    nb = stationdb.neighbours
+    bk = stationdb.buckets
+    kk = stationdb.k
+    for r in range(MAX_RIPPLES):
+        ring = _age[r]
+        if ring == _FREE:
+            continue
+        s = _STRENGTH[ring]
+        o = _src[r] * kk
+        for n in range(kk):
+            j = nb[o + n]
+            if j == stationdb.NONE:
+                break
+            if bk[o + n] == ring and s > level[j]:
+                level[j] = s
+                kind[j] = _kind[r]
+                _lit = True
+        _age[r] = ring + 1 if ring + 1 < RINGS else _FREE
+    return _lit
+
+
+def status():
+    return {"active": sum(1 for a in _age if a != _FREE), "started": started, "dropped": dropped}
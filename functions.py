@@ -3,18 +3,16 @@
 # - Ceiling blending
 # - Lightning flash
 # - HARD blink for windy/gusty stations only (on/off)
-# - Minimal debug
+# - Logging via log.py (per-station lines at DEBUG only)
 
 import urequests
 import time
 import gc
 import data
-
-# ---------- Minimal Debug ----------
-DEBUG = True
-def debug(*args):
-    if DEBUG:
-        print("[DEBUG-FN]", *args)
+import stats
+import log
+import history
+import effects
 
 # ---------- Globals injected from main.py ----------
 _pixels = None
@@ -42,6 +40,19 @@ FADE_INSTEAD_OF_BLINK = False  # hard blink mode
 ACTIVATE_WIND_ANIM = True
 ACTIVATE_LIGHTNING_ANIM = True
 BLINK_SPEED = 0.3
+
+# Trend mode: stations whose category changed in their last report pulse
+# slowly toward the colour they had before (history.trend_from).
+ACTIVATE_TREND_ANIM = False
+TREND_PERIOD = 16            # frames per pulse
+TREND_MAX_MIX = 128          # strongest pull toward the old colour, /256
+_TREND_MIX = bytes([TREND_MAX_MIX * (TREND_PERIOD // 2 - abs(k - TREND_PERIOD // 2)) // (TREND_PERIOD // 2)
+                    for k in range(TREND_PERIOD)])
+_CAT_COLORS = ((0,0,0), COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR)   # by history code
+# Geographic effects (effects.py): lightning echoes to nearby stations and
+# category changes sweep outward over the neighbour table
+ACTIVATE_GEO_EFFECTS = False
+_frame = 0
 BLINK_TOTAL = 900
 
 _wind_cycle = False
@@ -55,6 +66,7 @@ def init_globals(**kwargs):
     global WIND_BLINK_THRESHOLD, HIGH_WINDS_THRESHOLD, ALWAYS_BLINK_FOR_GUSTS
     global FADE_INSTEAD_OF_BLINK, ACTIVATE_WIND_ANIM, ACTIVATE_LIGHTNING_ANIM
     global BLINK_SPEED, BLINK_TOTAL
+    global ACTIVATE_TREND_ANIM, _CAT_COLORS, ACTIVATE_GEO_EFFECTS
 
     _pixels = kwargs['pixels']
     _LED_COUNT = kwargs['led_count']
@@ -79,17 +91,67 @@ def init_globals(**kwargs):
     ACTIVATE_LIGHTNING_ANIM = kwargs['ltg_anim']
     BLINK_SPEED = kwargs['blink_speed']
     BLINK_TOTAL = kwargs['blink_total']
+    ACTIVATE_TREND_ANIM = kwargs.get('trend_anim', False)
+    ACTIVATE_GEO_EFFECTS = kwargs.get('geo_effects', False)
+    _CAT_COLORS = (COLOR_CLEAR, COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR)
+
+def fade_of(color):
+    """Dim partner of a category colour for the wind fade (80/255, as the defaults)."""
+    return (color[0] * 80 // 255, color[1] * 80 // 255, color[2] * 80 // 255)
+
+def configure(**kwargs):
+    """
+    Change any subset of the init_globals settings at runtime (settings.py).
+    A new category colour also replaces its fade colour; everything is read
+    per frame, so the change shows on the next render.
+    """
+    global COLOR_VFR, COLOR_VFR_FADE, COLOR_MVFR, COLOR_MVFR_FADE
+    global COLOR_IFR, COLOR_IFR_FADE, COLOR_LIFR, COLOR_LIFR_FADE
+    global COLOR_LIGHTNING, COLOR_HIGH_WINDS
+    global WIND_BLINK_THRESHOLD, HIGH_WINDS_THRESHOLD, ALWAYS_BLINK_FOR_GUSTS
+    global ACTIVATE_WIND_ANIM, ACTIVATE_LIGHTNING_ANIM, BLINK_SPEED
+    global ACTIVATE_TREND_ANIM, _CAT_COLORS, ACTIVATE_GEO_EFFECTS
+    if 'color_vfr' in kwargs:
+        COLOR_VFR = kwargs['color_vfr']
+        COLOR_VFR_FADE = fade_of(COLOR_VFR)
+    if 'color_mvfr' in kwargs:
+        COLOR_MVFR = kwargs['color_mvfr']
+        COLOR_MVFR_FADE = fade_of(COLOR_MVFR)
+    if 'color_ifr' in kwargs:
+        COLOR_IFR = kwargs['color_ifr']
+        COLOR_IFR_FADE = fade_of(COLOR_IFR)
+    if 'color_lifr' in kwargs:
+        COLOR_LIFR = kwargs['color_lifr']
+        COLOR_LIFR_FADE = fade_of(COLOR_LIFR)
+    COLOR_LIGHTNING = kwargs.get('color_lightning', COLOR_LIGHTNING)
+    COLOR_HIGH_WINDS = kwargs.get('color_high_winds', COLOR_HIGH_WINDS)
+    WIND_BLINK_THRESHOLD = kwargs.get('wind_threshold', WIND_BLINK_THRESHOLD)
+    HIGH_WINDS_THRESHOLD = kwargs.get('high_wind_threshold', HIGH_WINDS_THRESHOLD)
+    ACTIVATE_WIND_ANIM = kwargs.get('wind_anim', ACTIVATE_WIND_ANIM)
+    ACTIVATE_LIGHTNING_ANIM = kwargs.get('ltg_anim', ACTIVATE_LIGHTNING_ANIM)
+    BLINK_SPEED = kwargs.get('blink_speed', BLINK_SPEED)
+    ACTIVATE_TREND_ANIM = kwargs.get('trend_anim', ACTIVATE_TREND_ANIM)
+    ACTIVATE_GEO_EFFECTS = kwargs.get('geo_effects', ACTIVATE_GEO_EFFECTS)
+    if 'gusts_always' in kwargs:
+        ALWAYS_BLINK_FOR_GUSTS = kwargs['gusts_always']
+        # windGust is derived at parse time; redo it for the stored reports
+        for ap in data.leds:
+            ap['windGust'] = bool(ALWAYS_BLINK_FOR_GUSTS and (ap.get('windGustSpeed') or 0) > 0)
+    _CAT_COLORS = (COLOR_CLEAR, COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR)
 
 def _set(i, color):
     _pixels.set_pixel(i, color)
 
 def _show():
+    t0 = stats.start()
     _pixels.show()
+    stats.stop('show', t0)
 
 # ----------------------------
 # Fetch + Parse (aviationweather.gov JSON classic keys)
 # ----------------------------
 def parse_chunk(chunk_json):
+    t0 = stats.start()
     try:
         for entry in chunk_json:
             icao = entry.get('icaoId')
@@ -159,24 +221,36 @@ def parse_chunk(chunk_json):
             ap['windGustSpeed'] = wgst
             ap['windGust'] = True if (ALWAYS_BLINK_FOR_GUSTS and wgst > 0) else False
             ap['raw'] = entry.get('rawOb')
+            if history.record(idx, flightCat, wspd, wgst, lightning, entry.get('obsTime')) \
+                    and ACTIVATE_GEO_EFFECTS and history.trend_from[idx]:
+                effects.trigger(idx, history.CAT_CODES.get(flightCat, 0))
     
-            debug("Update:", icao, "→", flightCat, "Wind:", wspd, "Gust:", wgst, "Ltg:", lightning)
+            if log.level <= log.DEBUG:
+                log.debug("Update:", icao, "→", flightCat, "Wind:", wspd, "Gust:", wgst, "Ltg:", lightning)
     
         del chunk_json
-        gc.collect()
+        stats.stop('parse', t0)
+        stats.collect()
         return 200
 
     except Exception as e:
-        debug("Fetch/Parse error:", e)
+        log.warn("Fetch/Parse error:", e)
         return 500
 
 # ----------------------------
 # Render one animation frame (HARD BLINK)
 # ----------------------------
 def render_weather_frame():
-    global _wind_cycle
+    global _wind_cycle, _frame
+    t0 = stats.start()
+    trend = history.trend_from if ACTIVATE_TREND_ANIM else None
+    mix = _TREND_MIX[_frame % TREND_PERIOD]
+    _frame += 1
+    fx = ACTIVATE_GEO_EFFECTS and effects.step()
+    fx_level = effects.level
+    fx_kind = effects.kind
 
-    for ap in data.leds:
+    for idx, ap in enumerate(data.leds):
         base = COLOR_CLEAR
 
         # Determine base color from category
@@ -202,6 +276,8 @@ def render_weather_frame():
         ltg = ACTIVATE_LIGHTNING_ANIM and ap.get('lightning')
         if ltg and (not _wind_cycle):
             _set(ap['led'], COLOR_LIGHTNING)
+            if ACTIVATE_GEO_EFFECTS:
+                effects.trigger(idx, effects.KIND_LTG)   # rate-limited per station
             continue
 
         # Should this station blink?
@@ -223,9 +299,24 @@ def render_weather_frame():
                 color = COLOR_LIFR_FADE if _wind_cycle else COLOR_LIFR
             else:
                 color = base
+        elif trend and idx < len(trend) and trend[idx] and base is not COLOR_HIGH_WINDS:
+            # improving / deteriorating: pulse toward the previous category
+            old = _CAT_COLORS[trend[idx]]
+            color = (base[0] + ((old[0] - base[0]) * mix >> 8),
+                     base[1] + ((old[1] - base[1]) * mix >> 8),
+                     base[2] + ((old[2] - base[2]) * mix >> 8))
         else:
             color = base
 
+        if fx and fx_level[idx]:
+            # a ripple passing through: blend toward its colour
+            k = fx_kind[idx]
+            over = COLOR_LIGHTNING if k == effects.KIND_LTG else _CAT_COLORS[k]
+            m = fx_level[idx]
+            color = (color[0] + ((over[0] - color[0]) * m >> 8),
+                     color[1] + ((over[1] - color[1]) * m >> 8),
+                     color[2] + ((over[2] - color[2]) * m >> 8))
+
         _set(ap['led'], color)
 
     # Legend
@@ -244,6 +335,7 @@ def render_weather_frame():
         except:
             pass
 
+    stats.stop('render', t0)
     _show()
     time.sleep(BLINK_SPEED)
     _wind_cycle = not _wind_cycle
@@ -0,0 +1,104 @@
+# heap.py — heap layout: long-lived buffers first, GC at chosen moments
+#
+# Startup: main.py calls begin() (one collection, so what follows packs
+# into the low end of a clean heap), then the init()/reserve() of every
+# module that keeps a buffer for the life of the program — history,
+# mirror, effects, taf, the upstream request heads — and then settle(),
+# which collects again and records the baseline. Per-fetch JSON garbage
+# is allocated above those blocks and cannot strand them in holes.
+#
+# Run time: gc.threshold() is set to THRESHOLD_FRAC of the free heap, so
+# the automatic collection is only a backstop. slack() runs right after a
+# frame has been shown, when there is time before the next one, and
+# collects once SLACK_BYTES have been allocated since the last explicit
+# collection (stats.collect(), which the fetch stages also call).
+#
+# Every FRAG_EVERY_S slack() also measures the largest block that can be
+# allocated against the total free heap (bisection over trial
+# allocations). frag_pct = 100 * (1 - largest / free); the worst seen is
+# kept so /status shows whether a long run is heading for a MemoryError.
+
+import gc, time
+import stats
+
+SLACK_BYTES = 16 * 1024     # collect in slack() after this much allocation
+THRESHOLD_FRAC = 0.5        # automatic GC after this fraction of the settled free heap
+FRAG_EVERY_S = 300
+PROBE_STEP = 256            # bisection resolution, bytes
+
+baseline_free = None        # free heap after settle()
+largest = None              # largest allocatable block, last probe
+frag_pct = None
+worst_frag_pct = None
+min_largest = None
+probes = 0
+slack_collects = 0
+_next_probe = None
+
+
+def begin():
+    """Start of the long-lived allocations."""
+    gc.collect()
+
+
+def settle():
+    """End of the long-lived allocations: collect, set the GC threshold, probe once."""
+    global baseline_free
+    stats.collect()
+    baseline_free = gc.mem_free()
+    try:
+        gc.threshold(int(baseline_free * THRESHOLD_FRAC))
+    except (AttributeError, ValueError):
+        pass
+    probe()
+
+
+def largest_block(hi=None):
+    """Largest bytearray that can be allocated now (to PROBE_STEP)."""
+    gc.collect()
+    lo = 0
+    hi = hi or gc.mem_free()
+    while hi - lo > PROBE_STEP:
+        mid = (lo + hi) // 2
+        try:
+            b = bytearray(mid)
+        except MemoryError:
+            hi = mid
+            continue
+        b = None
+        gc.collect()            # give the trial block back before the next try
+        lo = mid
+    return lo
+
+
+def probe():
+    global largest, frag_pct, worst_frag_pct, min_largest, probes, _next_probe
+    t0 = stats.start()
+    largest = largest_block()
+    free = gc.mem_free()
+    frag_pct = round(100 * (1 - largest / free), 1) if free else 0
+    if worst_frag_pct is None or frag_pct > worst_frag_pct:
+        worst_frag_pct = frag_pct
+    if min_largest is None or largest < min_largest:
+        min_largest = largest
+    probes += 1
+    stats.collect()
+    _next_probe = time.ticks_add(time.ticks_ms(), FRAG_EVERY_S * 1000)
+    stats.stop('heap_probe', t0)
+
+
+def slack():
+    """Call just after a frame is shown: collect (and probe) if it is due."""
+    global slack_collects
+    if _next_probe is not None and time.ticks_diff(time.ticks_ms(), _next_probe) >= 0:
+        probe()
+        return
+    if gc.mem_alloc() - stats.alloc_mark >= SLACK_BYTES:
+        stats.collect()
+        slack_collects += 1
+
+
+def status():
+    return {"baseline_free": baseline_free, "free": gc.mem_free(), "largest": largest,
+            "frag_pct": frag_pct, "worst_frag_pct": worst_frag_pct, "min_largest": min_largest,
+            "probes": probes, "slack_collects": slack_collects}
@@ -0,0 +1,125 @@
+# history.py — last N observations per station, packed into one bytearray
+#
+# Every station (by its index in data.leds) owns DEPTH fixed 8-byte slots
+# in a single preallocated buffer, used as a ring:
+#   byte 0     category code (CAT_CODES: 0 unknown, 1 VFR .. 4 LIFR)
+#   byte 1     wind speed, kt (capped at 255)
+#   byte 2     gust speed, kt (capped at 255)
+#   byte 3     flags (FLAG_LTG, FLAG_GUST)
+#   bytes 4-7  observation time, epoch seconds, little endian
+# record() writes in place and bumps the station's head: O(1), no
+# allocation. The same METAR fetched again (same obsTime) is not stored
+# twice, so the ring covers the last DEPTH distinct reports.
+#
+# trend_from[i] holds the category the station had before its latest
+# report when that changed within TREND_WINDOW_S (else 0), so render code
+# can read it per frame without touching the ring.
+
+DEPTH = 8
+RECORD = 8
+TREND_WINDOW_S = 3 * 3600
+
+CAT_CODES = {"VFR": 1, "MVFR": 2, "IFR": 3, "LIFR": 4}
+CAT_NAMES = (None, "VFR", "MVFR", "IFR", "LIFR")
+FLAG_LTG = 1
+FLAG_GUST = 2
+
+_buf = bytearray(0)
+_head = bytearray(0)        # next slot to write, per station
+_count = bytearray(0)       # valid slots, per station
+trend_from = bytearray(0)
+records = 0
+
+
+def init(n, depth=None):
+    """Allocate rings for n stations (drops any existing history)."""
+    global _buf, _head, _count, trend_from, DEPTH, records
+    if depth is not None:
+        DEPTH = depth
+    _buf = bytearray(n * DEPTH * RECORD)
+    _head = bytearray(n)
+    _count = bytearray(n)
+    trend_from = bytearray(n)
+    records = 0
+
+
+def _offset(i, back):
+    # slot of the back-th most recent record (0 = latest)
+    return (i * DEPTH + (_head[i] - 1 - back) % DEPTH) * RECORD
+
+
+def _obs(o):
+    b = _buf
+    return b[o + 4] | b[o + 5] << 8 | b[o + 6] << 16 | b[o + 7] << 24
+
+
+def record(i, cat, wind, gust, ltg, obs):
+    """Store one observation for station i. Returns False if it was a repeat."""
+    global records
+    if i >= len(_head):
+        return False
+    obs = int(obs or 0)
+    code = CAT_CODES.get(cat, 0)
+    wind = min(int(wind or 0), 255)
+    gust = min(int(gust or 0), 255)
+    flags = (FLAG_LTG if ltg else 0) | (FLAG_GUST if gust else 0)
+    b = _buf
+    n = _count[i]
+    prev_code = 0
+    if n:
+        o = _offset(i, 0)
+        if obs and _obs(o) == obs:
+            return False
+        if not obs and b[o] == code and b[o + 1] == wind and b[o + 2] == gust and b[o + 3] == flags:
+            return False
+        prev_code = b[o]
+        prev_obs = _obs(o)
+    h = _head[i]
+    o = (i * DEPTH + h) * RECORD
+    b[o] = code
+    b[o + 1] = wind
+    b[o + 2] = gust
+    b[o + 3] = flags
+    b[o + 4] = obs & 255
+    b[o + 5] = (obs >> 8) & 255
+    b[o + 6] = (obs >> 16) & 255
+    b[o + 7] = (obs >> 24) & 255
+    _head[i] = (h + 1) % DEPTH
+    if n < DEPTH:
+        _count[i] = n + 1
+    if prev_code and prev_code != code and (not obs or obs - prev_obs <= TREND_WINDOW_S):
+        trend_from[i] = prev_code
+    else:
+        trend_from[i] = 0
+    records += 1
+    return True
+
+
+def get(i, back=0):
+    """(category, wind, gust, flags, obs) of the back-th most recent record, or None."""
+    if i >= len(_count) or back >= _count[i]:
+        return None
+    o = _offset(i, back)
+    b = _buf
+    return CAT_NAMES[b[o]] if b[o] < len(CAT_NAMES) else None, b[o + 1], b[o + 2], b[o + 3], _obs(o)
+
+
+def station(i):
+    """All stored records for station i, newest first."""
+    return [get(i, k) for k in range(_count[i] if i < len(_count) else 0)]
+
+
+def dump(stations, code=None):
+    """{icao: [[obs, cat, wind, gust, flags], ...]} newest first; one station if code given."""
+    out = {}
+    for i, ap in enumerate(stations):
+        if code and ap.get("code") != code:
+            continue
+        if i < len(_count) and _count[i]:
+            out[ap.get("code")] = [[r[4], r[0], r[1], r[2], r[3]] for r in station(i)]
+    return out
+
+
+def status():
+    return {"depth": DEPTH, "bytes": len(_buf), "records": records,
+            "trending": sum(1 for t in trend_from if t)}
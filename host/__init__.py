@@ -0,0 +1,98 @@
+# host — CPython harness for running the map firmware off-device
+#
+# The device modules (main, functions, argbled_lib, boot, ota_daily, ...)
+# import MicroPython-only modules at the top. install() puts drop-in fakes
+# for those on sys.path and adds the MicroPython extras that CPython's own
+# time / gc / sys lack, so the real code runs unchanged on Linux:
+#
+#   machine    Pin, RTC (offset clock), WDT, reset() → ResetRequested
+#   rp2        asm_pio no-op, StateMachine recording every pushed word
+#   network    WLAN with scriptable connect / scan / link drop
+#   urequests  real HTTP via http.client (use fixture_server.py locally)
+#   ntptime    host clock, optionally failing
+#   uasyncio   thin wrapper over asyncio
+#   phew       server / logging / dns / template shim
+#
+# Typical use (see run_host.py):
+#   import host; host.install()
+#   import main
+
+import os, sys, time, gc, traceback
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKES_DIR = os.path.join(HOST_DIR, "fakes")
+REPO_DIR = os.path.dirname(HOST_DIR)
+
+# Rough RP2040 MicroPython heap, used to derive gc.mem_free()
+HEAP_BYTES = 192 * 1024
+
+
+class StopHarness(BaseException):
+    """Raised by harness hooks to leave main.run() (not caught by `except Exception`)."""
+
+
+_T0_NS = time.monotonic_ns()
+
+def _ticks_ms():
+    return (time.monotonic_ns() - _T0_NS) // 1000000
+
+def _ticks_us():
+    return (time.monotonic_ns() - _T0_NS) // 1000
+
+def _ticks_diff(a, b):
+    return a - b
+
+def _ticks_add(a, b):
+    return a + b
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+def _sleep_us(us):
+    time.sleep(us / 1000000)
+
+def _mem_alloc():
+    import tracemalloc
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+def _mem_free():
+    return max(0, HEAP_BYTES - _mem_alloc())
+
+_gc_threshold = [-1]
+
+def _threshold(n=None):
+    if n is None:
+        return _gc_threshold[0]
+    _gc_threshold[0] = n
+
+def _print_exception(e, f=None):
+    traceback.print_exception(type(e), e, e.__traceback__, file=f or sys.stdout)
+
+
+def install(utc=True):
+    """Make the fakes importable and patch time / gc / sys. Idempotent."""
+    if FAKES_DIR not in sys.path:
+        sys.path.insert(0, FAKES_DIR)
+    if REPO_DIR not in sys.path:
+        sys.path.insert(1, REPO_DIR)
+    if utc:
+        # the firmware keeps the RTC in UTC and relies on time.mktime()
+        os.environ["TZ"] = "UTC"
+        time.tzset()
+    for name, fn in (("ticks_ms", _ticks_ms), ("ticks_us", _ticks_us),
+                     ("ticks_cpu", _ticks_us), ("ticks_diff", _ticks_diff),
+                     ("ticks_add", _ticks_add), ("sleep_ms", _sleep_ms),
+                     ("sleep_us", _sleep_us)):
+        if not hasattr(time, name):
+            setattr(time, name, fn)
+    sys.modules.setdefault("utime", time)
+    if not hasattr(gc, "mem_free"):
+        gc.mem_free = _mem_free
+        gc.mem_alloc = _mem_alloc
+        gc.threshold = _threshold
+    if not hasattr(sys, "print_exception"):
+        sys.print_exception = _print_exception
+    import machine
+    machine.install_clock()
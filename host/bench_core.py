@@ -0,0 +1,173 @@
+# bench_core.py — parse / render / show workload at several map sizes
+#
+# Runs unchanged under CPython (via host.bench_pipeline) and under the
+# MicroPython unix port (micropython host/bench_core.py 100,500 3, with
+# MICROPYPATH pointing at host/mpstubs and the repo). Prints one JSON
+# line with per-stage microseconds and memory figures.
+#
+# Memory columns:
+#   CPython      peak_bytes  tracemalloc peak above the stage baseline
+#   MicroPython  alloc_bytes heap allocated during the stage (GC disabled,
+#                so this is the total allocation, not the net)
+
+import gc, json, sys, time
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    def ticks_us():
+        return int(time.perf_counter() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+IS_MICROPYTHON = sys.implementation.name == "micropython"
+CHUNK_SIZE = 25
+CATS = ("VFR", "VFR", "VFR", "MVFR", "IFR", "LIFR")
+
+
+class _Lcg:
+    """Deterministic, dependency-free PRNG (same sequence in both interpreters)."""
+
+    def __init__(self, seed):
+        self.s = seed & 0x7FFFFFFF
+
+    def next(self, n):
+        self.s = (self.s * 1103515245 + 12345) & 0x7FFFFFFF
+        return self.s % n
+
+
+def _code(i):
+    a = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "Z" + a[(i // 676) % 26] + a[(i // 26) % 26] + a[i % 26]
+
+
+def make_stations(n):
+    return [{"led": i, "code": _code(i), "raw": None, "windSpeed": None,
+             "windGust": None, "windGustSpeed": None, "lightning": None,
+             "flightCategory": None, "airport": "Synthetic %d" % i} for i in range(n)]
+
+
+def make_metars(stations, seed=1):
+    rnd = _Lcg(seed)
+    out = []
+    for ap in stations:
+        cat = CATS[rnd.next(len(CATS))]
+        wspd = (3, 5, 8, 12, 16, 22, 34)[rnd.next(7)]
+        ts = rnd.next(100) < 6
+        out.append({
+            "icaoId": ap["code"],
+            "rawOb": "METAR %s 191050Z %03d%02dKT 9999 FEW045 12/08 Q1012" % (ap["code"], rnd.next(36) * 10, wspd),
+            "visib": 9999,
+            "clouds": [{"cover": "FEW", "base": 4500}],
+            "fltCat": cat,
+            "wspd": wspd,
+            "wgst": wspd + 10 if wspd >= 16 else None,
+            "wxString": "+TSRA" if ts else None,
+        })
+    return out
+
+
+def _tm():
+    if IS_MICROPYTHON:
+        return None
+    try:
+        import tracemalloc
+        return tracemalloc
+    except ImportError:
+        return None
+
+
+def measure(fn, repeat):
+    """Median microseconds over repeat runs, plus memory for one run."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = ticks_us()
+        fn()
+        times.append(ticks_diff(ticks_us(), t0))
+    times.sort()
+    res = {"us": times[len(times) // 2], "us_min": times[0]}
+    gc.collect()
+    tm = _tm()
+    if IS_MICROPYTHON:
+        gc.disable()
+        before = gc.mem_alloc()
+        fn()
+        res["alloc_bytes"] = gc.mem_alloc() - before
+        gc.enable()
+    elif tm is not None:
+        tm.start()
+        base = tm.get_traced_memory()[0]
+        fn()
+        res["peak_bytes"] = tm.get_traced_memory()[1] - base
+        tm.stop()
+    return res
+
+
+def run_size(n, repeat):
+    import data
+    import functions as fn
+    import history
+    from argbled_lib import Argbled
+
+    stations = make_stations(n)
+    data.leds = stations
+    history.init(n)
+    metars = make_metars(stations)
+    chunks = [metars[i:i + CHUNK_SIZE] for i in range(0, len(metars), CHUNK_SIZE)]
+    codes = [ap["code"] for ap in stations]
+
+    px = Argbled(n, 0, 0, "GRB")
+    px.brightness(20)
+    fn._pixels = px
+    fn._LED_COUNT = n
+    fn.BLINK_SPEED = 0
+    fn.SHOW_LEGEND = False
+
+    def find_all():
+        for c in codes:
+            data.find(data.leds, "code", c)
+
+    def parse_all():
+        for ch in chunks:
+            fn.parse_chunk(list(ch))
+
+    def set_all():
+        for i in range(n):
+            px.set_pixel(i, (0, 255, 0))
+
+    stages = {}
+    stages["data.find"] = measure(find_all, repeat)
+    stages["parse_chunk"] = measure(parse_all, repeat)
+    stages["render_frame"] = measure(fn.render_weather_frame, repeat)
+    stages["set_pixel"] = measure(set_all, repeat)
+    stages["fill"] = measure(lambda: px.fill((255, 255, 255)), repeat)
+    stages["show"] = measure(px.show, repeat)
+    for s in stages.values():
+        s["us_per_led"] = round(s["us"] / n, 3)
+    return stages
+
+
+def run(sizes, repeat):
+    import stats
+    stats.ENABLED = False        # measure the code, not the instrumentation
+    import log
+    log.set_levels(console=log.ERROR + 1, ring=log.ERROR + 1)
+    result = {}
+    for n in sizes:
+        result[str(n)] = run_size(n, repeat)
+    return {
+        "interpreter": sys.implementation.name,
+        "version": ".".join(str(x) for x in sys.implementation.version[:3]),
+        "repeat": repeat,
+        "sizes": result,
+    }
+
+
+if __name__ == "__main__":
+    # micropython host/bench_core.py 100,250 5
+    sizes = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(json.dumps(run(sizes, repeat)))
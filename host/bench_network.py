@@ -0,0 +1,203 @@
+# bench_network.py — fetch and OTA pipelines under simulated link conditions
+#
+#   python -m host.bench_network [--profiles good,slow,lossy] [--strategies chunks,direct,auto]
+#                                [--budget 60] [--out bench_network.json]
+#
+# Runs each registered fetch strategy against host/netsim.py with each
+# network profile and reports, per pair:
+#   fresh_s       time from the first attempt to a complete 200 fetch
+#                 (retrying RETRY_GAP_S apart, like the firmware's error path)
+#   attempts      fetch calls needed
+#   req / conn    HTTP requests and TCP connections they took
+#   bytes         body bytes the server sent (including wasted partial bodies)
+#   stall_max_s   longest single fetch call — the LEDs freeze for this long,
+#                 because the fetch blocks the animation loop
+#   stall_total_s sum of all fetch calls
+#   wdt_gap_s     longest gap between watchdog feeds during the fetches;
+#                 must stay under watchdog.TIMEOUT_MS or the device resets
+#   recovery_s    for profiles with an error window: time from the end of the
+#                 window to the first good fetch
+# Then runs ota_daily._do_update() once per profile against a bumped version
+# and reports time, bytes and whether the files on "flash" ended up
+# consistent (all new, or all old with version.txt unchanged).
+#
+# Runs in real time (no virtual clock): the latency is the point.
+# New fetch strategies register themselves in STRATEGIES.
+
+import argparse, json, os, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import host
+from host import make_manifest
+from host.netsim import Conditions, NetSimServer
+from host.run_host import Harness
+
+RETRY_GAP_S = 1.0
+
+PROFILES = {
+    "good":         dict(),
+    "slow":         dict(latency_ms=400, tls_ms=300, bandwidth_bps=8000),
+    "lossy":        dict(latency_ms=150, disconnect_after=1500, disconnect_every=3),
+    "stall":        dict(latency_ms=100, stall_after=1024, stall_ms=5000, stall_every=2),
+    "flaky_5xx":    dict(statuses=[200, 502, 200, 500, 503, 200]),
+    "rate_limited": dict(statuses=[429] * 6),
+    "outage_10s":   dict(fail_until_s=10, fail_status=503),
+}
+
+# name → callable() returning an HTTP-ish code (200 on success).
+# Filled in by _register() once the firmware is importable.
+STRATEGIES = {}
+
+
+def _register():
+    import main, upstream, functions
+    STRATEGIES["chunks"] = main.fetch_all_chunks
+    STRATEGIES["direct"] = lambda: upstream.fetch(functions.parse_chunk)
+    STRATEGIES["auto"] = lambda: upstream.refresh(functions.parse_chunk, main.fetch_all_chunks)
+
+
+class NetBench(Harness):
+    def __init__(self, **kw):
+        kw.setdefault("probe_status", False)
+        kw.setdefault("boot", False)
+        super().__init__(**kw)
+
+    def make_server(self):
+        return NetSimServer(root=self.fixtures)
+
+    def setup(self):
+        super().setup()
+        import log
+        log.set_levels(console=log.ERROR + 1)
+        _register()
+
+    def conditions(self, name, **extra):
+        spec = dict(PROFILES[name])
+        spec.update(extra)
+        self.server.set_conditions(Conditions(**spec))
+
+    # ---------- fetch ----------
+    def bench_fetch(self, strategy, profile, budget_s):
+        fetch = STRATEGIES[strategy]
+        self.conditions(profile)
+        srv = self.server
+        bytes0 = srv.bytes_sent
+        fail_s = srv.cond.fail_until_s
+        import watchdog, upstream
+        watchdog.reset_stats()
+        upstream.reset()
+        conns0 = srv.connections
+        t0 = time.monotonic()
+        calls, code, window_end = [], None, None
+        while time.monotonic() - t0 < budget_s:
+            c0 = time.monotonic()
+            code = fetch()
+            calls.append(time.monotonic() - c0)
+            if code == 200:
+                break
+            time.sleep(RETRY_GAP_S)
+        t_done = time.monotonic()
+        if fail_s:
+            window_end = srv.t_start + fail_s
+        return {
+            "ok": code == 200,
+            "last_code": code,
+            "fresh_s": round(t_done - t0, 2) if code == 200 else None,
+            "attempts": len(calls),
+            "bytes": srv.bytes_sent - bytes0,
+            "stall_max_s": round(max(calls), 2) if calls else 0,
+            "stall_total_s": round(sum(calls), 2),
+            "wdt_gap_s": round(watchdog.max_gap_ms / 1000, 2),
+            "requests": srv.requests,
+            "connections": srv.connections - conns0,
+            "recovery_s": round(t_done - window_end, 2) if window_end and code == 200 else None,
+            "disconnects": srv.disconnects,
+            "stalls": srv.stalls,
+        }
+
+    # ---------- OTA ----------
+    def _publish(self, version):
+        import ota_daily
+        files = {}
+        for fname in ota_daily.FILES_TO_UPDATE:
+            with open(os.path.join(host.REPO_DIR, fname), "rb") as f:
+                body = f.read() + ("\n# %s\n" % version).encode()
+            files[fname] = body
+            self.server.routes["/ota/" + fname] = (200, body)
+        self.server.routes["/ota/version.txt"] = (200, version)
+        self.server.routes["/ota/manifest.json"] = (200, json.dumps(make_manifest.build(version, files)))
+        return files
+
+    def bench_ota(self, profile, version):
+        import machine, ota_daily
+        files = self._publish(version)
+        # only the OTA host gets the bad link
+        self.conditions(profile, paths=["/ota/"])
+        old_ver = ota_daily._read_local_version()
+        bytes0 = self.server.bytes_sent
+        t0 = time.monotonic()
+        rebooted = False
+        try:
+            ota_daily._do_update()
+        except machine.ResetRequested:
+            rebooted = True
+        dt = time.monotonic() - t0
+        new = 0
+        for fname, body in files.items():
+            try:
+                with open(fname, "rb") as f:
+                    new += f.read() == body
+            except OSError:
+                pass
+        ver = ota_daily._read_local_version()
+        consistent = (new == len(files) and ver == version) or (new == 0 and ver == old_ver)
+        return {
+            "s": round(dt, 2),
+            "bytes": self.server.bytes_sent - bytes0,
+            "rebooted": rebooted,
+            "files_new": "%d/%d" % (new, len(files)),
+            "version": ver,
+            "consistent": consistent,
+        }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fetch / OTA benchmarks under simulated network conditions")
+    ap.add_argument("--profiles", default=",".join(PROFILES))
+    ap.add_argument("--strategies", default=None, help="comma list (default: all registered)")
+    ap.add_argument("--budget", type=float, default=60, help="seconds allowed per fetch run")
+    ap.add_argument("--no-ota", action="store_true")
+    ap.add_argument("--out", default="bench_network.json")
+    args = ap.parse_args(argv)
+
+    b = NetBench(fetches=10 ** 9)
+    b.setup()
+    profiles = args.profiles.split(",")
+    strategies = args.strategies.split(",") if args.strategies else list(STRATEGIES)
+    out = {"profiles": {p: PROFILES[p] for p in profiles}, "fetch": {}, "ota": {}}
+    try:
+        for s in strategies:
+            out["fetch"][s] = {}
+            for p in profiles:
+                r = b.bench_fetch(s, p, args.budget)
+                out["fetch"][s][p] = r
+                print("%-8s %-13s ok=%-5s fresh=%6s s  tries=%-2d req=%-3d conn=%-3d bytes=%-7d stall max=%5.2f s total=%6.2f s wdt gap=%5.2f s%s" % (
+                    s, p, r["ok"], r["fresh_s"], r["attempts"], r["requests"], r["connections"], r["bytes"], r["stall_max_s"],
+                    r["stall_total_s"], r["wdt_gap_s"], "  recovery=%s s" % r["recovery_s"] if r["recovery_s"] is not None else ""))
+        if not args.no_ota:
+            for i, p in enumerate(profiles):
+                r = b.bench_ota(p, "bench-%d" % i)
+                out["ota"][p] = r
+                print("ota      %-13s %5.2f s  bytes=%-7d files=%s rebooted=%-5s consistent=%s" % (
+                    p, r["s"], r["bytes"], r["files_new"], r["rebooted"], r["consistent"]))
+    finally:
+        b.server.stop()
+    with open(args.out, "w") as f:
+        json.dump(out, f, indent=1)
+    print("wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench_pipeline.py — reproducible parse / render / show benchmarks by map size
+#
+#   python -m host.bench_pipeline [--sizes 100,250,500,1000,2000] [--repeat 5]
+#                                 [--out bench_pipeline.json] [--micropython]
+#                                 [--compare previous.json]
+#
+# Uses synthetic station tables and METAR payloads (host/bench_core.py) so
+# results are comparable between firmware versions. Reports per-stage
+# median time, time per LED and memory under CPython; with --micropython
+# the same workload also runs on the unix port if `micropython` is on PATH.
+# Results are written as JSON; --compare flags stages that got >10% slower.
+
+import argparse, json, os, shutil, subprocess, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, REPO)
+
+DEFAULT_SIZES = (100, 250, 500, 1000, 2000)
+REGRESSION = 1.10
+
+
+def firmware_version():
+    try:
+        with open(os.path.join(REPO, "version.txt")) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def run_cpython(sizes, repeat):
+    import host
+    host.install()
+    from host import bench_core
+    return bench_core.run(sizes, repeat)
+
+
+def run_micropython(sizes, repeat, exe="micropython"):
+    path = shutil.which(exe)
+    if not path:
+        return {"skipped": "%s not found on PATH" % exe}
+    env = dict(os.environ)
+    env["MICROPYPATH"] = ":".join((os.path.join(HERE, "mpstubs"), REPO, ".frozen"))
+    proc = subprocess.run(
+        [path, os.path.join(HERE, "bench_core.py"), ",".join(str(s) for s in sizes), str(repeat)],
+        capture_output=True, text=True, env=env, cwd=REPO)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip()[-2000:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_table(res):
+    if "sizes" not in res:
+        print(" ", res)
+        return
+    print("%s %s" % (res["interpreter"], res["version"]))
+    for n, stages in res["sizes"].items():
+        print("  %5s LEDs" % n)
+        for name, s in stages.items():
+            mem = s.get("alloc_bytes", s.get("peak_bytes"))
+            print("    %-13s %9d us  %8.3f us/LED  mem %s" % (name, s["us"], s["us_per_led"], mem))
+
+
+def compare(old, new):
+    """Print stages that are more than REGRESSION× slower than in old."""
+    worse = []
+    for interp in ("cpython", "micropython"):
+        a = old.get(interp, {}).get("sizes", {})
+        b = new.get(interp, {}).get("sizes", {})
+        for n in b:
+            for stage, s in b[n].items():
+                prev = a.get(n, {}).get(stage)
+                if prev and prev["us"] and s["us"] > prev["us"] * REGRESSION:
+                    worse.append((interp, n, stage, prev["us"], s["us"]))
+    if not worse:
+        print("no regressions above %d%%" % round((REGRESSION - 1) * 100))
+    for interp, n, stage, a, b in worse:
+        print("REGRESSION %s %s LEDs %s: %d → %d us (%.2fx)" % (interp, n, stage, a, b, b / a))
+    return worse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parse / render / show benchmarks by map size")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default="bench_pipeline.json")
+    ap.add_argument("--micropython", action="store_true", help="also run on the unix port")
+    ap.add_argument("--compare", metavar="JSON", help="previous results to diff against")
+    args = ap.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    out = {"firmware": firmware_version(), "sizes": sizes}
+    out["cpython"] = run_cpython(sizes, args.repeat)
+    print_table(out["cpython"])
+    if args.micropython:
+        out["micropython"] = run_micropython(sizes, args.repeat)
+        print_table(out["micropython"])
+
+    with open(args.out, "w") as f:
+        json.dump(out, f, indent=1)
+    print("wrote", args.out)
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(json.load(f), out)
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
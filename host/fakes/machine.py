@@ -0,0 +1,127 @@
+# machine — host stand-in for the MicroPython machine module
+
+import time
+
+_real_time = time.time
+_real_gmtime = time.gmtime
+_real_localtime = time.localtime
+_rtc_offset = [0.0]       # seconds added to the host clock by RTC().datetime()
+
+resets = 0
+freq_hz = 125000000
+
+
+class ResetRequested(BaseException):
+    """machine.reset() was called. BaseException so `except Exception` can't swallow it."""
+
+
+def install_clock():
+    """Route time.time()/gmtime()/localtime() through the fake RTC offset."""
+    if getattr(time.time, "_rtc", False):
+        return
+    def _time():
+        return _real_time() + _rtc_offset[0]
+    def _gmtime(secs=None):
+        return _real_gmtime(time.time() if secs is None else secs)
+    def _localtime(secs=None):
+        return _real_localtime(time.time() if secs is None else secs)
+    _time._rtc = True
+    time.time = _time
+    time.gmtime = _gmtime
+    time.localtime = _localtime
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def toggle(self):
+        self._value ^= 1
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+
+class RTC:
+    def datetime(self, dt=None):
+        """(year, month, day, weekday, hours, minutes, seconds, subseconds)"""
+        if dt is None:
+            t = time.gmtime()
+            return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+        y, m, d, _wd, hh, mm, ss = dt[:7]
+        target = time.mktime((y, m, d, hh, mm, ss, 0, 0, 0))
+        _rtc_offset[0] = target - _real_time()
+
+
+class WDT:
+    last = None
+
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+        self.feeds = 0
+        self._last_feed = time.ticks_ms()
+        self.max_gap_ms = 0
+        WDT.last = self
+
+    def feed(self):
+        now = time.ticks_ms()
+        gap = time.ticks_diff(now, self._last_feed)
+        if gap > self.max_gap_ms:
+            self.max_gap_ms = gap
+        self._last_feed = now
+        self.feeds += 1
+
+
+def reset():
+    global resets
+    resets += 1
+    raise ResetRequested()
+
+
+def soft_reset():
+    reset()
+
+
+def reset_cause():
+    return 1
+
+
+def freq(hz=None):
+    global freq_hz
+    if hz is None:
+        return freq_hz
+    freq_hz = hz
+
+
+def lightsleep(ms=None):
+    time.sleep((ms or 0) / 1000)
+
+
+def deepsleep(ms=None):
+    reset()
+
+
+def idle():
+    pass
+
+
+def unique_id():
+    return b"\xe6\x61\x64\x08\x43\x2b\x27\x2f"
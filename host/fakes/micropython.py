@@ -0,0 +1,25 @@
+# micropython — host stand-in
+
+def const(x):
+    return x
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def mem_info(*args):
+    import gc
+    print("mem: total", gc.mem_alloc() + gc.mem_free(), "free", gc.mem_free())
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(fn, arg):
+    fn(arg)
@@ -0,0 +1,158 @@
+# network — host stand-in for the Pico W cyw43 WLAN driver
+#
+# Script it before the firmware runs, e.g.:
+#   network.configure(ssid=b"HostNet", password=b"secret", connect_delay_ms=500)
+#   network.configure(fail_connects=2)        # next 2 connects fail
+#   network.drop_link()                       # simulate a router blip
+
+import time
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+_net = {
+    "ssid": b"HostNet",
+    "password": b"password",
+    "bssid": b"\x02\x00\x00\x00\x00\x01",
+    "channel": 6,
+    "rssi": -55,
+    "connect_delay_ms": 300,
+    "fail_connects": 0,
+    "ifconfig": ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1"),
+}
+
+# per-interface state, shared by every WLAN(...) instance like the real driver
+_ifs = {}
+log = []        # (ticks_ms, event, detail)
+
+
+def configure(**kw):
+    _net.update(kw)
+
+
+def _state(itf):
+    s = _ifs.get(itf)
+    if s is None:
+        s = _ifs[itf] = {
+            "active": False, "status": STAT_IDLE, "up_at": None,
+            "ifconfig": ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0"),
+            "static": False, "config": {}, "connects": 0,
+        }
+    return s
+
+
+def _event(ev, detail=None):
+    log.append((time.ticks_ms(), ev, detail))
+
+
+def drop_link():
+    """Link loss: the STA interface stays active but disassociates."""
+    s = _state(STA_IF)
+    s["status"] = STAT_CONNECT_FAIL
+    s["up_at"] = None
+    _event("drop")
+
+
+def reset():
+    _ifs.clear()
+    del log[:]
+
+
+class WLAN:
+    def __init__(self, itf=STA_IF):
+        self.itf = itf
+        self._s = _state(itf)
+
+    def active(self, v=None):
+        if v is None:
+            return self._s["active"]
+        self._s["active"] = bool(v)
+        if not v:
+            self._s["status"] = STAT_IDLE
+            self._s["up_at"] = None
+            self._s["static"] = False
+        _event("active", bool(v))
+
+    def scan(self):
+        _event("scan")
+        time.sleep_ms(100)
+        return [
+            (_net["ssid"], _net["bssid"], _net["channel"], _net["rssi"], 3, False),
+            (b"Neighbour", b"\x02\x00\x00\x00\x00\x99", 11, -80, 3, False),
+        ]
+
+    def connect(self, ssid=None, key=None, bssid=None):
+        s = self._s
+        s["connects"] += 1
+        _event("connect", bssid is not None)
+        if not s["active"]:
+            raise OSError("STA not active")
+        if _net["fail_connects"] > 0:
+            _net["fail_connects"] -= 1
+            s["status"] = STAT_CONNECT_FAIL
+            return
+        if ssid != _net["ssid"] or (bssid is not None and bssid != _net["bssid"]):
+            s["status"] = STAT_NO_AP_FOUND
+            return
+        if key != _net["password"]:
+            s["status"] = STAT_WRONG_PASSWORD
+            return
+        s["status"] = STAT_CONNECTING
+        s["up_at"] = time.ticks_add(time.ticks_ms(), _net["connect_delay_ms"])
+
+    def disconnect(self):
+        self._s["status"] = STAT_IDLE
+        self._s["up_at"] = None
+
+    def _poll(self):
+        s = self._s
+        if s["status"] == STAT_CONNECTING and s["up_at"] is not None \
+                and time.ticks_diff(time.ticks_ms(), s["up_at"]) >= 0:
+            s["status"] = STAT_GOT_IP
+            if not s["static"]:
+                s["ifconfig"] = _net["ifconfig"]
+            _event("up")
+
+    def status(self, param=None):
+        if param == "rssi":
+            return _net["rssi"]
+        self._poll()
+        return self._s["status"]
+
+    def isconnected(self):
+        if self.itf == AP_IF:
+            return self._s["active"]
+        self._poll()
+        return self._s["status"] == STAT_GOT_IP
+
+    def ifconfig(self, cfg=None):
+        if cfg is None:
+            return self._s["ifconfig"]
+        if cfg == "dhcp":
+            # back to DHCP: the server's lease once the link is up
+            self._s["static"] = False
+            if self._s["status"] == STAT_GOT_IP:
+                self._s["ifconfig"] = _net["ifconfig"]
+            return
+        self._s["ifconfig"] = tuple(cfg)
+        self._s["static"] = True
+
+    def config(self, *args, **kw):
+        if kw:
+            self._s["config"].update(kw)
+            return
+        key = args[0]
+        if key == "mac":
+            return b"\x28\xcd\xc1\x00\x00\x01"
+        if key in ("ssid", "essid"):
+            return self._s["config"].get(key, _net["ssid"].decode())
+        if key == "channel":
+            return _net["channel"]
+        return self._s["config"].get(key)
@@ -0,0 +1,25 @@
+# ntptime — host stand-in; answers from the host clock (offline)
+
+import time as _time
+
+host = "pool.ntp.org"
+timeout = 1
+
+fail = False          # set True to simulate an unreachable NTP server
+error_s = 0.0         # added to the answer, to exercise drift tracking
+queries = 0
+
+
+def time():
+    global queries
+    queries += 1
+    if fail:
+        raise OSError(110, "ETIMEDOUT")
+    import machine
+    return int(machine._real_time() + error_s)
+
+
+def settime():
+    import machine
+    t = _time.gmtime(time())
+    machine.RTC().datetime((t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0))
@@ -0,0 +1,37 @@
+# phew — host shim of the phew! HTTP server package (same public surface)
+__version__ = "0.0.2-host"
+
+from . import logging
+
+remote_mount = False
+
+
+def is_connected_to_wifi():
+    import network
+    return network.WLAN(network.STA_IF).isconnected()
+
+
+def connect_to_wifi(ssid, password, timeout_seconds=30):
+    import network, time
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(True)
+    wlan.connect(ssid, password)
+    start = time.ticks_ms()
+    while not wlan.isconnected() and time.ticks_diff(time.ticks_ms(), start) < timeout_seconds * 1000:
+        time.sleep(0.25)
+    if wlan.isconnected():
+        return wlan.ifconfig()[0]
+    return None
+
+
+def access_point(ssid, password=None):
+    import network
+    wlan = network.WLAN(network.AP_IF)
+    wlan.config(essid=ssid)
+    if password:
+        wlan.config(password=password)
+    else:
+        wlan.config(security=0)
+    wlan.active(True)
+    wlan.ifconfig(("192.168.4.1", "255.255.255.0", "192.168.4.1", "192.168.4.1"))
+    return wlan
@@ -0,0 +1,8 @@
+# phew.dns — host shim; the captive DNS catch-all is not emulated
+
+catchall_ip = None
+
+
+def run_catchall(ip_address, port=53):
+    global catchall_ip
+    catchall_ip = ip_address
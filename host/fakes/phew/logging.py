@@ -0,0 +1,55 @@
+# phew.logging — host shim (prints only, never writes log.txt)
+
+LOG_INFO = 0b00001
+LOG_WARNING = 0b00010
+LOG_ERROR = 0b00100
+LOG_DEBUG = 0b01000
+LOG_EXCEPTION = 0b10000
+LOG_ALL = LOG_INFO | LOG_WARNING | LOG_ERROR | LOG_DEBUG | LOG_EXCEPTION
+
+_logging_types = LOG_ALL
+quiet = True          # harness default: keep phew chatter off stdout
+
+
+def enable_logging_types(types):
+    global _logging_types
+    _logging_types = _logging_types | types
+
+
+def disable_logging_types(types):
+    global _logging_types
+    _logging_types = _logging_types & ~types
+
+
+def set_truncate_thresholds(truncate_at, truncate_to):
+    pass
+
+
+def log(level, text):
+    if not quiet:
+        print("[phew %s] %s" % (level, text))
+
+
+def info(*items):
+    if _logging_types & LOG_INFO:
+        log("info", " ".join(map(str, items)))
+
+
+def warn(*items):
+    if _logging_types & LOG_WARNING:
+        log("warning", " ".join(map(str, items)))
+
+
+def error(*items):
+    if _logging_types & LOG_ERROR:
+        log("error", " ".join(map(str, items)))
+
+
+def debug(*items):
+    if _logging_types & LOG_DEBUG:
+        log("debug", " ".join(map(str, items)))
+
+
+def exception(*items):
+    if _logging_types & LOG_EXCEPTION:
+        log("exception", " ".join(map(str, items)))
@@ -0,0 +1,243 @@
+# phew.server — host shim with phew's routing and response conventions
+# Handlers may return a str/bytes body, a (body, status[, content_type])
+# tuple, a generator, a Response or a FileResponse — as on the device.
+
+import os, time
+import uasyncio
+from . import logging
+
+_routes = []
+catchall_handler = None
+requests_handled = 0
+
+
+def _urldecode(text):
+    from urllib.parse import unquote_plus
+    return unquote_plus(text)
+
+
+def _parse_query_string(qs):
+    result = {}
+    for parameter in qs.split("&"):
+        if "=" in parameter:
+            key, value = parameter.split("=", 1)
+            result[_urldecode(key)] = _urldecode(value)
+    return result
+
+
+class Request:
+    def __init__(self, method, uri, protocol):
+        self.method = method
+        self.uri = uri
+        self.protocol = protocol
+        self.form = {}
+        self.data = {}
+        self.query = {}
+        self.headers = {}
+        q = uri.find("?")
+        q = q if q != -1 else len(uri)
+        self.path = uri[:q]
+        self.query_string = uri[q + 1:]
+        if self.query_string:
+            self.query = _parse_query_string(self.query_string)
+
+
+class Response:
+    def __init__(self, body, status=200, headers=None):
+        self.status = status
+        self.headers = dict(headers or {})
+        self.body = body
+
+    def add_header(self, name, value):
+        self.headers[name] = value
+
+
+content_type_map = {
+    "html": "text/html", "json": "application/json", "css": "text/css",
+    "js": "text/javascript", "txt": "text/plain", "png": "image/png",
+}
+
+
+class FileResponse(Response):
+    def __init__(self, file, status=200, headers=None):
+        self.status = 404
+        self.headers = dict(headers or {})
+        self.file = file
+        self.body = None
+        try:
+            st = os.stat(file)
+            self.status = status
+            ext = file.split(".")[-1].lower()
+            if ext in content_type_map:
+                self.headers["Content-Type"] = content_type_map[ext]
+            self.headers["Content-Length"] = st[6]
+        except OSError:
+            pass
+
+
+class Route:
+    def __init__(self, path, handler, methods=["GET"]):
+        self.path = path
+        self.methods = methods
+        self.handler = handler
+        self.path_parts = path.split("/")
+
+    def matches(self, request):
+        if request.method not in self.methods:
+            return False
+        parts = request.path.split("/")
+        if len(parts) != len(self.path_parts):
+            return False
+        for part, compare in zip(self.path_parts, parts):
+            if not part.startswith("<") and part != compare:
+                return False
+        return True
+
+    def call_handler(self, request):
+        params = {}
+        for part, compare in zip(self.path_parts, request.path.split("/")):
+            if part.startswith("<"):
+                params[part[1:-1]] = compare
+        return self.handler(request, **params)
+
+
+async def _parse_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, value = line.decode().strip().split(": ", 1)
+        headers[name.lower()] = value
+    return headers
+
+
+def _match_route(request):
+    for route in _routes:
+        if route.matches(request):
+            return route
+    return None
+
+
+status_message_map = {200: "OK", 204: "No Content", 301: "Moved Permanently",
+                      302: "Found", 304: "Not Modified", 400: "Bad Request",
+                      404: "Not Found", 405: "Method Not Allowed",
+                      500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def _b(x):
+    return x.encode() if isinstance(x, str) else x
+
+
+async def _handle_request(reader, writer):
+    global requests_handled
+    start = time.ticks_ms()
+    line = await reader.readline()
+    try:
+        method, uri, protocol = line.decode().split()
+    except Exception as e:
+        logging.error(e)
+        writer.close()
+        return
+    request = Request(method, uri, protocol)
+    request.headers = await _parse_headers(reader)
+    if "content-length" in request.headers:
+        body = await reader.readexactly(int(request.headers["content-length"]))
+        ctype = request.headers.get("content-type", "")
+        if ctype.startswith("application/json"):
+            import json
+            request.data = json.loads(body.decode())
+        elif ctype.startswith("application/x-www-form-urlencoded"):
+            request.form = _parse_query_string(body.decode())
+
+    route = _match_route(request)
+    if route:
+        response = route.call_handler(request)
+    elif catchall_handler:
+        response = catchall_handler(request)
+    else:
+        response = ("Not found", 404)
+
+    if type(response).__name__ == "generator":
+        response = (response,)
+    if isinstance(response, (str, bytes)):
+        response = (response,)
+    if isinstance(response, tuple):
+        body = response[0]
+        status = response[1] if len(response) >= 2 else 200
+        ctype = response[2] if len(response) >= 3 else "text/html"
+        response = Response(body, status=status)
+        response.add_header("Content-Type", ctype)
+        if hasattr(body, "__len__"):
+            response.add_header("Content-Length", len(_b(body)))
+
+    msg = status_message_map.get(response.status, "Unknown")
+    writer.write(("HTTP/1.1 %d %s\r\n" % (response.status, msg)).encode("ascii"))
+    for k, v in response.headers.items():
+        writer.write(("%s: %s\r\n" % (k, v)).encode("ascii"))
+    writer.write(b"\r\n")
+    if isinstance(response, FileResponse):
+        if response.status == 200:
+            with open(response.file, "rb") as f:
+                while True:
+                    chunk = f.read(1024)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+    elif type(response.body).__name__ == "generator":
+        for chunk in response.body:
+            writer.write(_b(chunk))
+            await writer.drain()
+    elif response.body is not None:
+        writer.write(_b(response.body))
+    await writer.drain()
+    writer.close()
+    requests_handled += 1
+    logging.info("> %s %s (%d) [%dms]" % (request.method, request.path, response.status,
+                                          time.ticks_diff(time.ticks_ms(), start)))
+
+
+def add_route(path, handler, methods=["GET"]):
+    global _routes
+    _routes.append(Route(path, handler, methods))
+    _routes = sorted(_routes, key=lambda r: len(r.path_parts), reverse=True)
+
+
+def set_callback(handler):
+    global catchall_handler
+    catchall_handler = handler
+
+
+def route(path, methods=["GET"]):
+    def _route(f):
+        add_route(path, f, methods=methods)
+        return f
+    return _route
+
+
+def catchall():
+    def _catchall(f):
+        set_callback(f)
+        return f
+    return _catchall
+
+
+def redirect(url, status=301):
+    return Response("", status, {"Location": url})
+
+
+def serve_file(file):
+    return FileResponse(file)
+
+
+def reset():
+    global _routes, catchall_handler
+    _routes = []
+    catchall_handler = None
+
+
+def run(host="0.0.0.0", port=80):
+    loop = uasyncio.get_event_loop()
+    loop.create_task(uasyncio.start_server(_handle_request, host, port))
+    loop.run_forever()
@@ -0,0 +1,31 @@
+# phew.template — host shim with the same {{ expr }} substitution as phew
+
+
+def render_template(template, **kwargs):
+    with open(template, "rb") as f:
+        data = f.read()
+    caret = 0
+    while True:
+        start = data.find(b"{{", caret)
+        end = data.find(b"}}", start)
+        if start == -1 or end == -1:
+            yield data[caret:]
+            break
+        yield data[caret:start]
+        expr = data[start + 2:end].strip().decode("utf-8")
+        try:
+            if expr in kwargs:
+                result = str(kwargs[expr])
+                for a, b in (("&", "&amp;"), ('"', "&quot;"), ("'", "&apos;"),
+                             (">", "&gt;"), ("<", "&lt;")):
+                    result = result.replace(a, b)
+            else:
+                result = eval(expr, {}, dict(kwargs))
+            if type(result).__name__ == "generator":
+                for chunk in result:
+                    yield chunk
+            elif result is not None:
+                yield str(result)
+        except Exception:
+            pass
+        caret = end + 2
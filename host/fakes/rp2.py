@@ -0,0 +1,79 @@
+# rp2 — host stand-in: PIO programs are inert, state machines record words
+#
+# Timing model: each StateMachine accumulates wire_us, the time its words
+# would take on a WS2812 line (pull_thresh bits per word at 800 kHz). State
+# machines run in parallel on the chip, so a frame spread over several of
+# them costs the largest wire_us delta, not the sum.
+
+import collections
+
+RECORD_WORDS = 100000       # bounded history per state machine
+WIRE_US_PER_BIT = 1.25
+
+state_machines = {}         # id -> StateMachine (latest instance)
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    IN_LOW = 0
+    IN_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+
+
+class _Program:
+    def __init__(self, fn, kwargs):
+        self.name = fn.__name__
+        self.kwargs = kwargs
+
+
+def asm_pio(**kwargs):
+    """The body uses PIO assembler names; never execute it on the host."""
+    def _wrap(fn):
+        return _Program(fn, kwargs)
+    return _wrap
+
+
+class StateMachine:
+    def __init__(self, id, prog=None, freq=-1, **kwargs):
+        self.id = id
+        self.prog = prog
+        self.freq = freq
+        self.kwargs = kwargs
+        self.running = False
+        self.words = collections.deque(maxlen=RECORD_WORDS)
+        self.total_words = 0
+        self.wire_us = 0.0
+        bits = prog.kwargs.get("pull_thresh", 32) if isinstance(prog, _Program) else 32
+        self._word_us = bits * WIRE_US_PER_BIT
+        state_machines[id] = self
+
+    def active(self, v=None):
+        if v is None:
+            return self.running
+        self.running = bool(v)
+
+    def put(self, value, shift=0):
+        # value may be an int or an array of words (MicroPython accepts both);
+        # each word is shifted left by shift before it enters the FIFO
+        if isinstance(value, int):
+            self.words.append((value << shift) & 0xFFFFFFFF if shift else value)
+            self.total_words += 1
+            self.wire_us += self._word_us
+        else:
+            for w in value:
+                self.words.append((w << shift) & 0xFFFFFFFF if shift else w)
+            self.total_words += len(value)
+            self.wire_us += self._word_us * len(value)
+
+    def tx_fifo(self):
+        return 0
+
+    def last_words(self, n):
+        """The last n pushed words, oldest first (e.g. one frame of n LEDs)."""
+        w = list(self.words)
+        return w[-n:]
@@ -0,0 +1,29 @@
+# uasyncio — host stand-in: asyncio plus the MicroPython extras
+
+import asyncio
+from asyncio import *  # noqa: F401,F403
+
+_loop = None
+
+
+def get_event_loop():
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def new_event_loop():
+    global _loop
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    return _loop
+
+
+async def sleep_ms(ms):
+    await asyncio.sleep(ms / 1000)
+
+
+def run(coro):
+    return get_event_loop().run_until_complete(coro)
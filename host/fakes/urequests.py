@@ -0,0 +1,87 @@
+# urequests — host stand-in backed by http.client
+# Same surface the firmware uses: get/post/request, status_code, headers,
+# content, text, json(), close(). Point URLs at host/fixture_server.py.
+
+import http.client, json as _json, io, socket
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 30        # http.client needs one; MicroPython default is none
+
+requests_made = 0
+bytes_received = 0
+
+
+class Response:
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason.encode() if isinstance(reason, str) else reason
+        self.headers = headers
+        self.encoding = "utf-8"
+        self._content = content
+        self.raw = io.BytesIO(content)
+
+    @property
+    def content(self):
+        return self._content
+
+    @property
+    def text(self):
+        return self._content.decode(self.encoding)
+
+    def json(self):
+        return _json.loads(self._content)
+
+    def close(self):
+        self.raw = None
+
+
+def request(method, url, data=None, json=None, headers={}, stream=None, timeout=None,
+            parse_headers=True):
+    global requests_made, bytes_received
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parts.hostname, parts.port, timeout=timeout or DEFAULT_TIMEOUT)
+    body = data
+    hdrs = dict(headers)
+    if json is not None:
+        body = _json.dumps(json)
+        hdrs.setdefault("Content-Type", "application/json")
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    try:
+        conn.request(method, path, body=body, headers=hdrs)
+        resp = conn.getresponse()
+        content = resp.read()
+    except socket.timeout:
+        raise OSError(110, "ETIMEDOUT")
+    except (ConnectionError, http.client.HTTPException) as e:
+        raise OSError(104, str(e))
+    finally:
+        conn.close()
+    requests_made += 1
+    bytes_received += len(content)
+    resp_headers = {}
+    if parse_headers:
+        for k, v in resp.getheaders():
+            resp_headers[k] = v
+    return Response(resp.status, resp.reason, resp_headers, content)
+
+
+def head(url, **kw):
+    return request("HEAD", url, **kw)
+
+def get(url, **kw):
+    return request("GET", url, **kw)
+
+def post(url, **kw):
+    return request("POST", url, **kw)
+
+def put(url, **kw):
+    return request("PUT", url, **kw)
+
+def patch(url, **kw):
+    return request("PATCH", url, **kw)
+
+def delete(url, **kw):
+    return request("DELETE", url, **kw)
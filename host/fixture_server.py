@@ -0,0 +1,170 @@
+# fixture_server.py — local HTTP stand-in for GITHUB_BASE / GITHUB_RAW_BASE
+#
+#   srv = FixtureServer(root="host/fixtures").start()
+#   main.GITHUB_BASE = srv.url
+#   ...
+#   srv.stop()
+#
+# Serves files from root with a Date header (like the real hosts), plus
+# any in-memory overrides set via srv.routes["/path"] = (status, bytes).
+# Set srv.clock to take the Date header from a virtual clock.
+#
+# API_PATH stands in for aviationweather.gov's /api/data/metar: it answers
+# ?ids=A,B,...&format=json from the METARs in the metar_chunk_*.json
+# fixtures, padded with the extra fields the real API sends, and refuses
+# request targets longer than max_url (414). TAF_API_PATH does the same
+# for /api/data/taf from the taf_chunk_*.json payloads (routes first, so
+# the fresh TAFs run_host.py installs are the ones served). Connections
+# are HTTP/1.1 keep-alive; srv.connections counts them.
+
+import glob, json, os, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def date_time_string(self, timestamp=None):
+        clock = self.server.owner.clock
+        if timestamp is None and clock is not None:
+            timestamp = clock()
+        return BaseHTTPRequestHandler.date_time_string(self, timestamp)
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.owner.connections += 1
+        self.server.owner.on_connect(self)
+
+    def do_GET(self):
+        srv = self.server.owner
+        path, _, query = self.path.partition("?")
+        srv.hits[path] = srv.hits.get(path, 0) + 1
+        if len(self.path) > srv.max_url:
+            status, body = 414, b"URI too long"
+        else:
+            status, body = srv.lookup(path, query)
+        if isinstance(body, str):
+            body = body.encode()
+        srv.respond(self, path, status, body)
+
+
+class FixtureServer:
+    API_PATH = "/api/data/metar"
+    TAF_API_PATH = "/api/data/taf"
+
+    def __init__(self, root=None, host="127.0.0.1", port=0):
+        self.root = root or os.path.join(HERE, "fixtures")
+        self.routes = {}
+        self.clock = None        # callable → epoch for the Date header (vclock)
+        self.hits = {}
+        self.bytes_sent = 0
+        self.connections = 0
+        self.max_url = 2048
+        self.api_requests = []   # ids per API request
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread = None
+
+    # ---------- hooks (overridden by host/netsim.py) ----------
+    def on_connect(self, handler):
+        pass
+
+    def lookup(self, path, query=""):
+        """(status, body) for path: in-memory routes first, then the API, then files under root."""
+        if path in self.routes:
+            return self.routes[path]
+        if path == self.API_PATH:
+            return self.metar_api(query)
+        if path == self.TAF_API_PATH:
+            return self.taf_api(query)
+        fname = os.path.join(self.root, path.lstrip("/"))
+        if os.path.isfile(fname):
+            with open(fname, "rb") as f:
+                return 200, f.read()
+        return 404, b"not found"
+
+    @staticmethod
+    def _ids(query):
+        args = {}
+        for kv in query.split("&"):
+            k, _, v = kv.partition("=")
+            args[k] = v.replace("%2C", ",").replace("%2c", ",")
+        if args.get("format", "json") != "json":
+            return None
+        return [i.upper() for i in args.get("ids", "").split(",") if i]
+
+    def metar_api(self, query):
+        ids = self._ids(query)
+        if ids is None:
+            return 400, b"stand-in serves format=json only"
+        self.api_requests.append(ids)
+        by_id = {}
+        for fname in sorted(glob.glob(os.path.join(self.root, "metar_chunk_*.json"))):
+            with open(fname) as f:
+                for e in json.load(f):
+                    by_id[e["icaoId"]] = e
+        out = []
+        for i in ids:
+            e = by_id.get(i)
+            if e is None:
+                continue
+            e = dict(e)
+            # fields the real API adds and the device does not use
+            e.update({"receiptTime": "2025-10-19 10:56:12", "reportTime": "2025-10-19 11:00:00",
+                      "temp": 12, "dewp": 8, "wdir": 160, "altim": 1012, "slp": None,
+                      "qcField": 4, "metarType": "METAR", "lat": 50.1, "lon": -5.67, "elev": 120,
+                      "prior": 0, "name": "%s stand-in aerodrome, GB" % i})
+            out.append(e)
+        if not out:
+            return 204, b""
+        return 200, json.dumps(out).encode()
+
+    def taf_api(self, query):
+        ids = self._ids(query)
+        if ids is None:
+            return 400, b"stand-in serves format=json only"
+        by_id = {}
+        i = 1
+        while True:
+            status, body = self.lookup("/taf_chunk_%d.json" % i)
+            if status != 200:
+                break
+            for e in json.loads(body):
+                by_id[e["icaoId"]] = e
+            i += 1
+        out = [by_id[i] for i in ids if i in by_id]
+        if not out:
+            return 204, b""
+        return 200, json.dumps(out).encode()
+
+    def send_headers(self, handler, path, status, length):
+        handler.send_response(status)
+        ctype = "application/json" if path.endswith(".json") or path in (self.API_PATH, self.TAF_API_PATH) else "text/plain"
+        handler.send_header("Content-Type", ctype)
+        handler.send_header("Content-Length", str(length))
+        handler.end_headers()
+
+    def respond(self, handler, path, status, body):
+        self.send_headers(handler, path, status, len(body))
+        handler.wfile.write(body)
+        self.bytes_sent += len(body)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
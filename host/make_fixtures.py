@@ -0,0 +1,75 @@
+# make_fixtures.py — deterministic METAR chunk fixtures for the host harness
+#
+#   python -m host.make_fixtures [--out host/fixtures] [--chunks 4] [--seed 1]
+#
+# Writes metar_chunk_1..N.json in the aviationweather.gov JSON shape the
+# firmware parses (icaoId, rawOb, visib, clouds, fltCat, wspd, wgst,
+# wxString, obsTime), one entry per station in data.leds.
+
+import argparse, json, os, random, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+CATS = ("VFR", "VFR", "VFR", "MVFR", "IFR", "LIFR")
+VIS_FOR = {"VFR": 9999, "MVFR": 6000, "IFR": 3000, "LIFR": 800}
+BASE_FOR = {"VFR": 4500, "MVFR": 2500, "IFR": 800, "LIFR": 300}
+
+
+def metar_entry(icao, rnd, obs_time=1760860800):
+    cat = rnd.choice(CATS)
+    wspd = rnd.choice((3, 5, 8, 12, 16, 22, 34))
+    wgst = wspd + 10 if wspd >= 16 and rnd.random() < 0.5 else None
+    ts = rnd.random() < 0.06
+    wx = "+TSRA" if ts else ("-RA" if cat != "VFR" else None)
+    base = BASE_FOR[cat]
+    cover = "BKN" if cat != "VFR" else "FEW"
+    wind = "%03d%02d%sKT" % (rnd.randrange(0, 360, 10), wspd, ("G%02d" % wgst) if wgst else "")
+    raw = "METAR %s 191050Z %s %04d %s%03d 12/08 Q1012" % (
+        icao, wind, VIS_FOR[cat], cover, base // 100)
+    if wx:
+        raw = raw.replace(" %s" % cover, " %s %s" % (wx, cover), 1)
+    e = {
+        "icaoId": icao,
+        "obsTime": obs_time,
+        "rawOb": raw,
+        "visib": VIS_FOR[cat],
+        "clouds": [{"cover": cover, "base": base}],
+        "fltCat": cat,
+        "wspd": wspd,
+        "wgst": wgst,
+        "wxString": wx,
+    }
+    return e
+
+
+def build(chunks=4, seed=1, stations=None, obs_time=1760860800):
+    """Return a list of chunk payloads (lists of METAR dicts)."""
+    if stations is None:
+        import data
+        stations = [ap["code"] for ap in data.leds]
+    rnd = random.Random(seed)
+    entries = [metar_entry(icao, rnd, obs_time) for icao in stations]
+    size = (len(entries) + chunks - 1) // chunks
+    return [entries[i * size:(i + 1) * size] for i in range(chunks)]
+
+
+def write(out, payloads, prefix="metar_chunk_"):
+    os.makedirs(out, exist_ok=True)
+    for i, p in enumerate(payloads, 1):
+        with open(os.path.join(out, "%s%d.json" % (prefix, i)), "w") as f:
+            json.dump(p, f, separators=(",", ":"))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write METAR chunk fixtures")
+    ap.add_argument("--out", default=os.path.join(HERE, "fixtures"))
+    ap.add_argument("--chunks", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+    write(args.out, build(args.chunks, args.seed))
+    print("wrote", args.chunks, "chunks to", args.out)
+
+
+if __name__ == "__main__":
+    main()
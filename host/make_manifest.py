@@ -0,0 +1,54 @@
+# make_manifest.py — per-file hashes for ota_daily.py's partial updates
+#
+#   python -m host.make_manifest [--version 1.0.5] [--out manifest.json]
+#
+# Writes manifest.json next to version.txt:
+#   {"version": "1.0.5", "files": {"main.py": "<sha256 hex>", ...}}
+# for every ota_daily.FILES_TO_UPDATE entry. Publish it together with
+# version.txt: the device downloads only the files whose hash differs from
+# its own copy, and checks each download against it. A manifest whose
+# version is not the one in version.txt is ignored (every file is fetched),
+# so a stale one costs bandwidth, never a mixed install.
+
+import argparse, ast, hashlib, json, os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+
+def files_to_update(repo=REPO):
+    """ota_daily.FILES_TO_UPDATE, read without importing the device module."""
+    with open(os.path.join(repo, "ota_daily.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "FILES_TO_UPDATE" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError("FILES_TO_UPDATE not found in ota_daily.py")
+
+
+def build(version, bodies):
+    """Manifest dict for version from {fname: bytes}."""
+    return {"version": version,
+            "files": {fname: hashlib.sha256(body).hexdigest() for fname, body in bodies.items()}}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="hash the OTA files into manifest.json")
+    ap.add_argument("--version", help="default: the contents of version.txt")
+    ap.add_argument("--out", default=os.path.join(REPO, "manifest.json"))
+    args = ap.parse_args(argv)
+    version = args.version
+    if version is None:
+        with open(os.path.join(REPO, "version.txt")) as f:
+            version = f.read().strip()
+    bodies = {}
+    for fname in files_to_update():
+        with open(os.path.join(REPO, fname), "rb") as f:
+            bodies[fname] = f.read()
+    with open(args.out, "w") as f:
+        json.dump(build(version, bodies), f, indent=1, sort_keys=True)
+    print("%s: %s, %d files" % (os.path.relpath(args.out, REPO), version, len(bodies)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# make_portal.py — pre-compress the setup portal pages for portal.py
+#
+#   python -m host.make_portal [files ...]     (default: ap_templates/setup.html)
+#
+# Writes <file>.gz next to each page (gzip level 9, mtime 0 so the output
+# only changes when the page does). portal.py streams the .gz from flash
+# with Content-Encoding: gzip, so the Pico never compresses anything.
+# Re-run after editing a page and copy both files to the board — the .gz
+# is binary, so it is not part of the OTA file list.
+
+import argparse, gzip, io, os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+DEFAULT_PAGES = ("ap_templates/setup.html",)
+
+
+def compress(path):
+    """Write path + '.gz'; return (raw bytes, gzipped bytes)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename="", mode="wb", compresslevel=9, fileobj=buf, mtime=0) as g:
+        g.write(raw)
+    with open(path + ".gz", "wb") as f:
+        f.write(buf.getvalue())
+    return len(raw), len(buf.getvalue())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="gzip the captive portal pages")
+    ap.add_argument("files", nargs="*", default=[os.path.join(REPO, p) for p in DEFAULT_PAGES])
+    args = ap.parse_args(argv)
+    for path in args.files:
+        raw, packed = compress(path)
+        print("%s: %d -> %d bytes" % (os.path.relpath(path, REPO), raw, packed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# make_stationdb.py — compile the map definition into stations.bin for stationdb.py
+#
+#   python -m host.make_stationdb [--src host/stations.csv] [--out stations.bin] [--show]
+#
+# Source: CSV with a header row (led, icao, name, lat, lon, profile) or a
+# JSON list of objects with the same keys. profile is "*" (every map) or
+# MAPTYPE names separated by "|" ("Hugh|Archie"); lat/lon may be blank.
+# Output layout (little endian), see stationdb.py for the reader:
+#   header   MAGIC "STN2", count u16, record size u8, profiles u8,
+#            names offset u32, neighbours offset u32 (0 = none)   (16 bytes)
+#   profiles profiles x 8 bytes, ASCII, NUL padded
+#   records  count x 16 bytes: led u16, icao 4s, lat i16, lon i16
+#            (1/100 degree, NO_COORD when unknown), name offset u16,
+#            name length u8, profile mask u8 (0xff = all), reserved u16
+#   neighbours  k u8, bucket km u8, then count x k x (slot u16, bucket u8):
+#            the k nearest stations within max_km, nearest first, with
+#            distance // bucket km; slot 0xffff pads a short list
+#   names    UTF-8 airport names back to back, read lazily on the device
+
+import argparse, csv, json, math, os, struct, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, REPO)
+
+import stationdb
+
+DEFAULT_SRC = os.path.join(HERE, "stations.csv")
+DEFAULT_OUT = os.path.join(REPO, "stations.bin")
+
+
+def read_source(path):
+    """List of dicts with led, icao, name, lat, lon, profile."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    out = []
+    for r in rows:
+        lat, lon = r.get("lat"), r.get("lon")
+        out.append({
+            "led": int(r["led"]), "icao": r["icao"].strip().upper(),
+            "name": (r.get("name") or "").strip(),
+            "lat": float(lat) if lat not in (None, "") else None,
+            "lon": float(lon) if lon not in (None, "") else None,
+            "profile": (r.get("profile") or "*").strip() or "*",
+        })
+    return out
+
+
+def check(rows):
+    seen_led, seen_icao = {}, {}
+    for r in rows:
+        if len(r["icao"]) != 4:
+            raise ValueError("ICAO must be 4 letters: %r" % r["icao"])
+        if r["led"] in seen_led:
+            raise ValueError("LED %d used by %s and %s" % (r["led"], seen_led[r["led"]], r["icao"]))
+        seen_led[r["led"]] = r["icao"]
+        if r["icao"] in seen_icao:
+            # parse_chunk updates the first match only, so the later LED stays dark
+            print("warning: %s on LED %d and LED %d" % (r["icao"], seen_icao[r["icao"]], r["led"]),
+                  file=sys.stderr)
+            continue
+        seen_icao[r["icao"]] = r["led"]
+
+
+def _centi(v):
+    return stationdb.NO_COORD if v is None else int(round(v * 100))
+
+
+def distance_km(a, b):
+    """Great-circle distance between two rows (haversine, mean Earth radius)."""
+    la1, la2 = math.radians(a["lat"]), math.radians(b["lat"])
+    dla = la2 - la1
+    dlo = math.radians(b["lon"] - a["lon"])
+    h = math.sin(dla / 2) ** 2 + math.cos(la1) * math.cos(la2) * math.sin(dlo / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+def neighbours(rows, k=stationdb.NEIGHBOURS, bucket_km=stationdb.BUCKET_KM, max_km=200):
+    """Neighbour section bytes: per slot, the k nearest (slot, bucket) pairs."""
+    if len(rows) >= stationdb.NONE:
+        raise ValueError("neighbour slots are two bytes: at most %d stations" % (stationdb.NONE - 1))
+    out = bytearray([k, bucket_km])
+    for i, a in enumerate(rows):
+        near = []
+        if a["lat"] is not None and a["lon"] is not None:
+            for j, b in enumerate(rows):
+                if j != i and b["lat"] is not None and b["lon"] is not None:
+                    d = distance_km(a, b)
+                    if d <= max_km:
+                        near.append((d, j))
+            near.sort()
+        for n in range(k):
+            if n < len(near):
+                out += struct.pack("<HB", near[n][1], min(255, int(near[n][0] // bucket_km)))
+            else:
+                out += struct.pack("<HB", stationdb.NONE, 0)
+    return out
+
+
+def compile_rows(rows):
+    """stations.bin bytes for rows (in table order: slot i = row i)."""
+    check(rows)
+    profiles = []
+    for r in rows:
+        if r["profile"] != "*":
+            for p in r["profile"].split("|"):
+                if p not in profiles:
+                    profiles.append(p)
+    if len(profiles) > 8:
+        raise ValueError("at most 8 map profiles")
+    names = bytearray()
+    recs = bytearray()
+    for r in rows:
+        name = r["name"].encode("utf-8")[:255]
+        if len(names) + len(name) > 0xffff:
+            raise ValueError("names section over 64 KB")
+        if r["profile"] == "*":
+            mask = 0xff
+        else:
+            mask = 0
+            for p in r["profile"].split("|"):
+                mask |= 1 << profiles.index(p)
+        recs += struct.pack("<H4shhHBBH", r["led"], r["icao"].encode(), _centi(r["lat"]),
+                            _centi(r["lon"]), len(names), len(name), mask, 0)
+        names += name
+    nbrs = neighbours(rows)
+    nbr_off = stationdb.HEADER + 8 * len(profiles) + len(recs)
+    names_off = nbr_off + len(nbrs)
+    out = bytearray(struct.pack("<4sHBBII", stationdb.MAGIC, len(rows), stationdb.RECORD,
+                                len(profiles), names_off, nbr_off))
+    for p in profiles:
+        out += p.encode()[:8].ljust(8, b"\0")
+    return bytes(out + recs + nbrs + names)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compile the station table into stations.bin")
+    ap.add_argument("--src", default=DEFAULT_SRC)
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--show", action="store_true", help="read the output back through stationdb")
+    args = ap.parse_args(argv)
+    rows = read_source(args.src)
+    blob = compile_rows(rows)
+    with open(args.out, "wb") as f:
+        f.write(blob)
+    names_off = struct.unpack_from("<I", blob, 8)[0]
+    print("wrote %s: %d stations, %d bytes (%d loaded, %d names on flash)"
+          % (os.path.relpath(args.out), len(rows), len(blob), names_off, len(blob) - names_off))
+    if args.show:
+        leds = stationdb.load(args.out)
+        for i, ap_ in enumerate(leds):
+            near = " ".join("%s/%d" % (leds[j]["code"], b) for j, b in stationdb.near(i))
+            print("  %3d %s %-32s %-16s %s" % (ap_["led"], ap_["code"], stationdb.name(i),
+                                              stationdb.coords(i), near))
+
+
+if __name__ == "__main__":
+    main()
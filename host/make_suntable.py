@@ -0,0 +1,76 @@
+# make_suntable.py — sunrise / sunset table for dimmer.py
+#
+#   python -m host.make_suntable [--lat 54.0] [--lon -2.5] [--out suntable.py]
+#
+# Computes civil-agnostic sunrise and sunset (sun centre at -0.833°, the
+# usual refraction + disc allowance) for every day of a leap year with the
+# NOAA approximation, and writes them as minutes after 00:00 UTC into a
+# MicroPython module. The device only ever indexes the table — no trig,
+# no floats. The year-to-year drift of these times is under two minutes.
+
+import argparse, math, os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+# Rough middle of the UK map (data.leds runs Land's End to Shetland)
+DEFAULT_LAT = 54.0
+DEFAULT_LON = -2.5
+
+
+def sun_times(yday, lat, lon):
+    """(sunrise, sunset) in minutes after 00:00 UTC for day-of-year yday (1..366)."""
+    g = 2 * math.pi / 366 * (yday - 1)
+    eqtime = 229.18 * (0.000075 + 0.001868 * math.cos(g) - 0.032077 * math.sin(g)
+                       - 0.014615 * math.cos(2 * g) - 0.040849 * math.sin(2 * g))
+    decl = (0.006918 - 0.399912 * math.cos(g) + 0.070257 * math.sin(g)
+            - 0.006758 * math.cos(2 * g) + 0.000907 * math.sin(2 * g)
+            - 0.002697 * math.cos(3 * g) + 0.00148 * math.sin(3 * g))
+    la = math.radians(lat)
+    cos_ha = (math.cos(math.radians(90.833)) / (math.cos(la) * math.cos(decl))
+              - math.tan(la) * math.tan(decl))
+    noon = 720 - 4 * lon - eqtime
+    if cos_ha <= -1:            # sun never sets
+        return 0, 1440
+    if cos_ha >= 1:             # sun never rises
+        return round(noon), round(noon)
+    ha = math.degrees(math.acos(cos_ha))
+    return round(noon - 4 * ha), round(noon + 4 * ha)
+
+
+def build(lat, lon):
+    out = bytearray()
+    for yday in range(1, 367):
+        rise, sset = sun_times(yday, lat, lon)
+        rise = min(max(rise, 0), 1439)
+        sset = min(max(sset, 0), 1439)
+        out += bytes((rise >> 8, rise & 255, sset >> 8, sset & 255))
+    return bytes(out)
+
+
+def write(path, lat, lon):
+    table = build(lat, lon)
+    with open(path, "w") as f:
+        f.write("# suntable.py — generated by host/make_suntable.py, do not edit\n")
+        f.write("# Sunrise / sunset for every day of the year, minutes after 00:00 UTC.\n")
+        f.write("# Entry for day-of-year d (1..366) is TABLE[(d-1)*4 : d*4] =\n")
+        f.write("# rise_hi, rise_lo, set_hi, set_lo.\n\n")
+        f.write("LAT = %r\nLON = %r\n\n" % (lat, lon))
+        f.write("TABLE = (\n")
+        for i in range(0, len(table), 32):
+            f.write("    %r\n" % table[i:i + 32])
+        f.write(")\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write the sunrise/sunset table used by dimmer.py")
+    ap.add_argument("--lat", type=float, default=DEFAULT_LAT)
+    ap.add_argument("--lon", type=float, default=DEFAULT_LON)
+    ap.add_argument("--out", default=os.path.join(REPO, "suntable.py"))
+    args = ap.parse_args(argv)
+    write(args.out, args.lat, args.lon)
+    print("wrote", args.out, "for", args.lat, args.lon)
+
+
+if __name__ == "__main__":
+    main()
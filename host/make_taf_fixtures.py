@@ -0,0 +1,136 @@
+# make_taf_fixtures.py — deterministic TAF fixtures and the timeline encoder
+#
+#   python -m host.make_taf_fixtures [--out host/fixtures] [--chunks 4] [--seed 1]
+#                                    [--base 1760860800] [--show]
+#
+# Writes taf_chunk_1..N.json in the aviationweather.gov TAF JSON shape
+# (icaoId, validTimeFrom/To, fcsts with timeFrom/timeTo, fcstChange,
+# visib in SM, clouds, wspd, wgst, wxString), one entry per station in
+# data.leds, plus taf_timeline.bin: the same forecasts encoded by taf.py
+# into the binary timeline the device plays back (a mirror can publish
+# it and set taf.TIMELINE_FILE so the device skips the JSON decode).
+# --show prints the timeline as one row of category digits per station.
+
+import argparse, json, os, random, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+FIXTURE_BASE = 1760860800       # same obs time as make_fixtures.py (2025-10-19 08:00Z)
+
+# (visib SM, cloud cover, base ft) per category
+COND = {
+    "VFR": ("6+", "FEW", 4500),
+    "MVFR": (5, "BKN", 2500),
+    "IFR": (2, "BKN", 800),
+    "LIFR": ("1/2", "OVC", 200),
+}
+CATS = ("VFR", "VFR", "VFR", "MVFR", "MVFR", "IFR", "LIFR")
+
+
+def _group(rnd, t0, t1, change=None, cat=None, wind=True, prob=None):
+    cat = cat or rnd.choice(CATS)
+    vis, cover, base = COND[cat]
+    g = {"timeFrom": t0, "timeTo": t1, "fcstChange": change, "probability": prob,
+         "visib": vis, "clouds": [{"cover": cover, "base": base}],
+         "wspd": None, "wgst": None, "wxString": None}
+    if wind:
+        g["wspd"] = rnd.choice((5, 8, 10, 12, 15, 18, 24))
+        if g["wspd"] >= 18 and rnd.random() < 0.3:
+            g["wgst"] = g["wspd"] + 12
+    if cat != "VFR" and rnd.random() < 0.3:
+        g["wxString"] = "RA"
+    return g
+
+
+def taf_entry(icao, rnd, base):
+    """One station's TAF valid for 30 h from base: base group + FM/BECMG/TEMPO."""
+    t_end = base + 30 * 3600
+    groups = [_group(rnd, base, t_end)]
+    t = base
+    for _ in range(rnd.randrange(0, 4)):
+        t += rnd.randrange(2, 9) * 3600
+        if t >= t_end:
+            break
+        kind = rnd.choice(("FM", "BECMG", "TEMPO", "PROB"))
+        if kind == "FM":
+            groups.append(_group(rnd, t, t_end, "FM"))
+        elif kind == "BECMG":
+            g = _group(rnd, t, t + 2 * 3600, "BECMG", wind=False)
+            groups.append(g)
+        else:
+            g = _group(rnd, t, t + rnd.randrange(2, 6) * 3600, "TEMPO" if kind == "TEMPO" else "PROB",
+                       cat=rnd.choice(("IFR", "LIFR", "MVFR")), wind=False,
+                       prob=30 if kind == "PROB" else None)
+            if rnd.random() < 0.25:
+                g["wxString"] = "TSRA"
+            groups.append(g)
+    return {"icaoId": icao, "issueTime": base - 1800, "validTimeFrom": base,
+            "validTimeTo": t_end, "fcsts": groups}
+
+
+def build(chunks=4, seed=1, base=FIXTURE_BASE, stations=None):
+    """List of chunk payloads (lists of TAF dicts)."""
+    if stations is None:
+        import data
+        stations = [ap["code"] for ap in data.leds]
+    rnd = random.Random(seed)
+    entries = [taf_entry(icao, rnd, base) for icao in stations]
+    size = (len(entries) + chunks - 1) // chunks
+    return [entries[i * size:(i + 1) * size] for i in range(chunks)]
+
+
+def encode(payloads, base=FIXTURE_BASE, leds=None):
+    """Encode chunk payloads into a taf.py timeline starting at base's hour."""
+    import taf
+    if leds is None:
+        import data
+        leds = data.leds
+    index = {ap["code"]: i for i, ap in enumerate(leds)}
+    tl = taf.new(len(leds), taf.hour_start(base))
+    for p in payloads:
+        taf.decode(p, index, tl)
+    return tl
+
+
+def show(tl, leds=None, hours=None):
+    import taf
+    if leds is None:
+        import data
+        leds = data.leds
+    old = taf.timeline
+    taf.timeline = tl
+    try:
+        d = taf.dump(leds, hours)
+    finally:
+        taf.timeline = old
+    print("hour 0 = %d; 1 VFR 2 MVFR 3 IFR 4 LIFR W wind L lightning" % d.pop("start"))
+    for code, row in d.items():
+        print("  %-5s %s" % (code, row))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write TAF fixtures and the encoded timeline")
+    ap.add_argument("--out", default=os.path.join(HERE, "fixtures"))
+    ap.add_argument("--chunks", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--base", type=int, default=FIXTURE_BASE, help="Unix time the TAFs start")
+    ap.add_argument("--show", action="store_true", help="print the decoded timeline")
+    args = ap.parse_args(argv)
+    import host
+    host.install()
+    payloads = build(args.chunks, args.seed, args.base)
+    os.makedirs(args.out, exist_ok=True)
+    for i, p in enumerate(payloads, 1):
+        with open(os.path.join(args.out, "taf_chunk_%d.json" % i), "w") as f:
+            json.dump(p, f, separators=(",", ":"))
+    tl = encode(payloads, args.base)
+    with open(os.path.join(args.out, "taf_timeline.bin"), "wb") as f:
+        f.write(tl)
+    print("wrote", args.chunks, "TAF chunks and taf_timeline.bin (%d bytes) to" % len(tl), args.out)
+    if args.show:
+        show(tl)
+
+
+if __name__ == "__main__":
+    main()
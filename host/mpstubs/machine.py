@@ -0,0 +1,9 @@
+# machine — minimal stub for running firmware modules on the MicroPython unix port
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
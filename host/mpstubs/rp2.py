@@ -0,0 +1,26 @@
+# rp2 — minimal stub for the MicroPython unix port: PIO is inert, put() counts
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+
+
+def asm_pio(**kwargs):
+    def _wrap(fn):
+        return fn
+    return _wrap
+
+
+class StateMachine:
+    def __init__(self, id, prog=None, freq=-1, **kwargs):
+        self.id = id
+        self.total_words = 0
+
+    def active(self, v=None):
+        return 1
+
+    def put(self, value, shift=0):
+        self.total_words += 1
@@ -0,0 +1,5 @@
+# urequests — placeholder for the MicroPython unix port (benchmarks do no I/O)
+
+
+def get(url, **kw):
+    raise OSError("urequests stub: no network in benchmarks")
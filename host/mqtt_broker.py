@@ -0,0 +1,113 @@
+# mqtt_broker.py — minimal local MQTT 3.1.1 broker stand-in for mqtt_pub.py
+#
+#   broker = MqttBroker().start()
+#   mqtt_pub.BROKER, mqtt_pub.PORT = "127.0.0.1", broker.port
+#   ...
+#   broker.messages      [(topic, payload bytes, retain), ...]
+#   broker.stop()
+#
+# Answers CONNECT with CONNACK (return code broker.connack_rc), records
+# every PUBLISH, answers PINGREQ. broker.down = True closes new and open
+# connections at once, standing in for an unreachable broker without
+# freeing the port.
+
+import socket, threading
+
+
+class MqttBroker:
+    def __init__(self, host="127.0.0.1", port=0):
+        self._srv = socket.socket()
+        self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind((host, port))
+        self._srv.listen(4)
+        self.port = self._srv.getsockname()[1]
+        self.messages = []
+        self.connects = 0
+        self.pings = 0
+        self.client_ids = []
+        self.connack_rc = 0
+        self.down = False
+        self._conns = []
+        self._stop = False
+
+    def start(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop = True
+        for c in self._conns:
+            try:
+                c.close()
+            except OSError:
+                pass
+        self._srv.close()
+
+    def set_down(self, down):
+        self.down = down
+        if down:
+            for c in self._conns:
+                try:
+                    c.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    # ---------- internals ----------
+    def _accept(self):
+        while not self._stop:
+            try:
+                c, _ = self._srv.accept()
+            except OSError:
+                return
+            if self.down:
+                c.close()
+                continue
+            self._conns.append(c)
+            threading.Thread(target=self._serve, args=(c,), daemon=True).start()
+
+    @staticmethod
+    def _read(c, n):
+        b = b""
+        while len(b) < n:
+            x = c.recv(n - len(b))
+            if not x:
+                raise EOFError
+            b += x
+        return b
+
+    def _packet(self, c):
+        first = self._read(c, 1)[0]
+        length, mult = 0, 1
+        while True:
+            d = self._read(c, 1)[0]
+            length += (d & 127) * mult
+            mult *= 128
+            if not d & 128:
+                break
+        return first, self._read(c, length) if length else b""
+
+    def _serve(self, c):
+        try:
+            while not self._stop and not self.down:
+                first, body = self._packet(c)
+                kind = first >> 4
+                if kind == 1:                       # CONNECT
+                    n = body[10] << 8 | body[11]
+                    self.client_ids.append(body[12:12 + n].decode())
+                    self.connects += 1
+                    c.sendall(bytes((0x20, 2, 0, self.connack_rc)))
+                elif kind == 3:                     # PUBLISH (QoS 0)
+                    n = body[0] << 8 | body[1]
+                    self.messages.append((body[2:2 + n].decode(), body[2 + n:], bool(first & 1)))
+                elif kind == 12:                    # PINGREQ
+                    self.pings += 1
+                    c.sendall(b"\xd0\x00")
+                elif kind == 14:                    # DISCONNECT
+                    break
+        except (EOFError, OSError, IndexError):
+            pass
+        finally:
+            try:
+                c.close()
+            except OSError:
+                pass
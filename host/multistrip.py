@@ -0,0 +1,112 @@
+# multistrip.py — check MultiArgbled index mapping and frame timing on the host
+#
+#   python -m host.multistrip [--leds 400] [--strips 4] [--reverse 2] [--shuffle]
+#
+# Builds a MultiArgbled over the fake rp2 state machines, writes a unique
+# colour to every logical LED, shows one frame and reads the words back off
+# each state machine to confirm every logical index landed on the physical
+# (strip, offset) it should. Then compares the modelled wire time of one
+# frame against a single Argbled strip of the same length, and the CPU time
+# show() spends feeding the FIFOs.
+
+import argparse, os, random, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import host
+
+
+def build(leds, strips, reverse=(), shuffle=False, seed=1, mode="GRB"):
+    from argbled_multi import MultiArgbled
+    per = [leds // strips + (1 if i < leds % strips else 0) for i in range(strips)]
+    spec = [(10 + i, n, i in reverse) for i, n in enumerate(per)]
+    index_map = None
+    if shuffle:
+        index_map = list(range(leds))
+        random.Random(seed).shuffle(index_map)
+    return MultiArgbled(spec, mode, first_sm=0, index_map=index_map), spec, index_map
+
+
+def check_mapping(px, spec, index_map):
+    """Return a list of (logical, expected, got) mismatches."""
+    import rp2
+    px.brightness(255)
+    for i in range(px.num_leds):
+        px.set_pixel(i, (i & 0xFF, (i >> 8) & 0xFF, 1))
+    px.show()
+
+    # physical numbering: strip 0 from its data-in end, then strip 1, ...
+    expect_at = {}
+    base = 0
+    for n, (pin, count, rev) in enumerate(spec):
+        for k in range(count):
+            expect_at[base + k] = (n, count - 1 - k if rev else k)
+        base += count
+    bad = []
+    for i in range(px.num_leds):
+        p = index_map[i] if index_map else i
+        strip, off = expect_at[p]
+        if px.physical(i) != (strip, off):
+            bad.append((i, (strip, off), px.physical(i)))
+            continue
+        sm = rp2.state_machines[strip]
+        word = sm.last_words(spec[strip][1])[off]
+        # GRB, 24 bits left-aligned in the FIFO word: G in the top byte
+        g, r, b = (word >> 24) & 0xFF, (word >> 16) & 0xFF, (word >> 8) & 0xFF
+        if (r, g, b) != (i & 0xFF, (i >> 8) & 0xFF, 1):
+            bad.append((i, (strip, off), (r, g, b)))
+    return bad
+
+
+def timing(px, leds, repeat=20):
+    import rp2
+    from argbled_lib import Argbled
+    sms = [rp2.state_machines[n] for n in range(len(px.strips))]
+    before = [sm.wire_us for sm in sms]
+    px.show()
+    multi_wire = max(sm.wire_us - b for sm, b in zip(sms, before))
+
+    single = Argbled(leds, 7, 0, "GRB")
+    sm7 = rp2.state_machines[7]
+    b7 = sm7.wire_us
+    single.show()
+    single_wire = sm7.wire_us - b7
+
+    def cpu(p):
+        p.delay = 0
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            p.show()
+        return (time.perf_counter() - t0) / repeat * 1e6
+    return {
+        "multi_wire_us": round(multi_wire),
+        "multi_model_us": px.frame_us(),
+        "single_wire_us": round(single_wire),
+        "speedup": round(single_wire / multi_wire, 2) if multi_wire else None,
+        "multi_cpu_us": round(cpu(px)),
+        "single_cpu_us": round(cpu(single)),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="MultiArgbled mapping and timing check")
+    ap.add_argument("--leds", type=int, default=400)
+    ap.add_argument("--strips", type=int, default=4)
+    ap.add_argument("--reverse", default="", help="comma list of strips wired backwards")
+    ap.add_argument("--shuffle", action="store_true", help="random logical→physical map")
+    args = ap.parse_args(argv)
+    host.install()
+    reverse = {int(x) for x in args.reverse.split(",") if x}
+    px, spec, index_map = build(args.leds, args.strips, reverse, args.shuffle)
+    bad = check_mapping(px, spec, index_map)
+    print("mapping:", "ok (%d LEDs)" % px.num_leds if not bad else "%d mismatches, first %s" % (len(bad), bad[:3]))
+    t = timing(px, args.leds)
+    print("wire time / frame: %d us on %d strips vs %d us on one strip (%.2fx)" % (
+        t["multi_wire_us"], args.strips, t["single_wire_us"], t["speedup"]))
+    print("host CPU in show(): %d us multi, %d us single" % (t["multi_cpu_us"], t["single_cpu_us"]))
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
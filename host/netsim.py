@@ -0,0 +1,131 @@
+# netsim.py — local stand-in for GITHUB_BASE / GITHUB_RAW_BASE with bad-link behaviour
+#
+#   srv = NetSimServer(Conditions(latency_ms=300, bandwidth_bps=20000)).start()
+#   main.GITHUB_BASE = srv.url
+#   ota_daily.GITHUB_RAW_BASE = srv.url + "/ota/"
+#
+# Conditions (all optional, applied per request / connection):
+#   latency_ms        delay before the status line
+#   tls_ms            extra delay per new connection (slow TLS handshake)
+#   bandwidth_bps     body throughput cap, bytes per second
+#   disconnect_after  close the socket after this many body bytes
+#   disconnect_every  ... but only on every Nth request (1 = always)
+#   stall_after       pause after this many body bytes ...
+#   stall_ms          ... for this long (a hung socket if large)
+#   stall_every       ... on every Nth request
+#   statuses          schedule of status codes, consumed one per request
+#                     (e.g. [429, 500, 200]); afterwards the real status
+#   fail_until_s      return fail_status for this many seconds after start()
+#   fail_status       status used by fail_until_s (default 503)
+#   paths             only apply conditions to paths starting with one of these
+#
+# Counters: requests, disconnects, stalls, errors_sent (reset by set_conditions)
+# and bytes_sent (cumulative).
+
+import threading, time
+
+from host.fixture_server import FixtureServer
+
+
+class Conditions:
+    def __init__(self, latency_ms=0, tls_ms=0, bandwidth_bps=0, disconnect_after=None,
+                 disconnect_every=1, stall_after=None, stall_ms=0, stall_every=1,
+                 statuses=(), fail_until_s=0, fail_status=503, paths=None):
+        self.latency_ms = latency_ms
+        self.tls_ms = tls_ms
+        self.bandwidth_bps = bandwidth_bps
+        self.disconnect_after = disconnect_after
+        self.disconnect_every = max(1, disconnect_every)
+        self.stall_after = stall_after
+        self.stall_ms = stall_ms
+        self.stall_every = max(1, stall_every)
+        self.statuses = list(statuses)
+        self.fail_until_s = fail_until_s
+        self.fail_status = fail_status
+        self.paths = paths
+
+    def describe(self):
+        return {k: v for k, v in self.__dict__.items() if v not in (None, 0, [], ())}
+
+
+class NetSimServer(FixtureServer):
+    SLICE = 512           # bytes per write when throttling
+
+    def __init__(self, conditions=None, root=None, host="127.0.0.1", port=0):
+        super().__init__(root=root, host=host, port=port)
+        self.cond = conditions or Conditions()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.disconnects = 0
+        self.stalls = 0
+        self.errors_sent = 0
+        self.t_start = None
+
+    def start(self):
+        self.t_start = time.monotonic()
+        return super().start()
+
+    def set_conditions(self, cond):
+        """Swap conditions and restart the schedules and per-conditions counters."""
+        with self._lock:
+            self.cond = cond
+            self.t_start = time.monotonic()
+            self.requests = self.disconnects = self.stalls = self.errors_sent = 0
+
+    def _applies(self, path):
+        p = self.cond.paths
+        return not p or any(path.startswith(x) for x in p)
+
+    # ---------- hooks ----------
+    def on_connect(self, handler):
+        if self.cond.tls_ms:
+            time.sleep(self.cond.tls_ms / 1000)
+
+    def respond(self, handler, path, status, body):
+        c = self.cond
+        if not self._applies(path):
+            return super().respond(handler, path, status, body)
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+            if c.statuses:
+                status = c.statuses.pop(0)
+            elif c.fail_until_s and time.monotonic() - self.t_start < c.fail_until_s:
+                status = c.fail_status
+        if c.latency_ms:
+            time.sleep(c.latency_ms / 1000)
+        if status != 200:
+            self.errors_sent += 1
+            body = b'{"error": "netsim %d"}' % status
+        self.send_headers(handler, path, status, len(body))
+
+        cut = c.disconnect_after if (c.disconnect_after is not None
+                                     and n % c.disconnect_every == 0) else None
+        stall_at = c.stall_after if (c.stall_after is not None
+                                     and n % c.stall_every == 0) else None
+        sent = 0
+        step = self.SLICE if (c.bandwidth_bps or cut is not None or stall_at is not None) else len(body)
+        try:
+            while sent < len(body):
+                if stall_at is not None and sent >= stall_at:
+                    self.stalls += 1
+                    time.sleep(c.stall_ms / 1000)
+                    stall_at = None
+                end = min(len(body), sent + step)
+                if cut is not None and end > cut:
+                    end = cut
+                if stall_at is not None and sent < stall_at < end:
+                    end = stall_at
+                handler.wfile.write(body[sent:end])
+                handler.wfile.flush()
+                if c.bandwidth_bps:
+                    time.sleep((end - sent) / c.bandwidth_bps)
+                self.bytes_sent += end - sent
+                sent = end
+                if cut is not None and sent >= cut:
+                    self.disconnects += 1
+                    handler.close_connection = True
+                    handler.connection.shutdown(2)
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
@@ -0,0 +1,239 @@
+# run_host.py — run the real firmware end to end on Linux
+#
+#   python -m host.run_host [--fetches 2] [--interval 3] [--no-boot] [--json]
+#                           [--record | --replay DIR [--speed 60]]
+#
+# Boots through boot.py (fake Wi-Fi connect) into main.run(), fetching
+# METAR chunks from a local FixtureServer, rendering into the fake PIO
+# state machine and serving /status from webapp. Stops after N fetch
+# cycles and prints a report. Device-side files (caches, version, logs)
+# are written to a throwaway working directory, never the repo.
+
+import argparse, json, os, runpy, shutil, socket, sys, tempfile, threading, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, REPO)
+
+import host
+from host import StopHarness
+from host.fixture_server import FixtureServer
+
+DEVICE_FILES = ("version.txt", "settings.json", "maptype.py", "stations.bin")
+DEVICE_DIRS = ("ap_templates", "app_templates")
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def prepare_workdir(workdir=None, ssid="HostNet", password="password"):
+    workdir = workdir or tempfile.mkdtemp(prefix="mapfw-")
+    for f in DEVICE_FILES:
+        src = os.path.join(REPO, f)
+        if os.path.exists(src):
+            shutil.copy(src, workdir)
+    for d in DEVICE_DIRS:
+        src = os.path.join(REPO, d)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(workdir, d), dirs_exist_ok=True)
+    with open(os.path.join(workdir, "wifi.json"), "w") as f:
+        json.dump({"ssid": ssid, "password": password}, f)
+    return workdir
+
+
+class Harness:
+    """
+    Wires fakes, fixture server and firmware together. Use as:
+        h = Harness(fetches=3); report = h.run()
+    Subclass or set hooks (on_fetch) to script network events per cycle.
+    """
+
+    def __init__(self, fetches=2, interval_s=3, blink_s=0.05, boot=True,
+                 probe_status=True, fixtures=None, workdir=None, record=False,
+                 replay=None, speed=None):
+        self.fetches = fetches
+        self.interval_s = interval_s
+        self.blink_s = blink_s
+        self.boot = boot
+        self.probe_status = probe_status
+        self.fixtures = fixtures
+        self.workdir = workdir
+        self.record = record      # archive every fetched payload (archive.py)
+        self.replay = os.path.abspath(replay) if replay else None
+        self.speed = speed
+        self.fetch_count = 0
+        self.fetch_codes = []
+        self.status_json = None
+        self.stop_reason = None
+        self.on_fetch = None      # callable(cycle_index) before each fetch
+        self.server = None
+        self.main = None
+
+    # ---------- setup ----------
+    def make_server(self):
+        return FixtureServer(root=self.fixtures)
+
+    def setup(self):
+        host.install()
+        self.server = self.make_server().start()
+        self.workdir = prepare_workdir(self.workdir)
+        os.chdir(self.workdir)
+
+        import network
+        network.configure(ssid=b"HostNet", password=b"password")
+
+        import webapp
+        webapp.PORT = free_port()
+        self.port = webapp.PORT
+
+        import ota_daily
+        with open("version.txt") as f:
+            self.server.routes["/ota/version.txt"] = (200, f.read().strip())
+        ota_daily.GITHUB_RAW_BASE = self.server.url + "/ota/"
+        ota_daily.REMOTE_VERSION_URL = ota_daily.GITHUB_RAW_BASE + "version.txt"
+        ota_daily.MANIFEST_URL = ota_daily.GITHUB_RAW_BASE + "manifest.json"
+
+        # TAFs must be valid "now" for playback; the files in fixtures/ are
+        # pinned to a fixed date for offline decoding, so serve fresh ones
+        from host import make_taf_fixtures
+        hour = int(time.time()) - int(time.time()) % 3600
+        for i, p in enumerate(make_taf_fixtures.build(base=hour), 1):
+            self.server.routes.setdefault("/taf_chunk_%d.json" % i,
+                                          (200, json.dumps(p).encode()))
+
+        import timesvc
+        timesvc.NTP_HOST = "127.0.0.1"   # the fake ntptime answers locally: no DNS
+        import main, upstream, taf
+        main.GITHUB_BASE = self.server.url
+        # the direct upstream goes to the stand-in API on the same server
+        codes = [ap['code'] for ap in main.data.leds]
+        upstream.configure(base=self.server.url + self.server.API_PATH)
+        upstream.plan(codes)
+        taf.plan(codes, self.server.url + self.server.TAF_API_PATH)
+        import archive
+        archive.configure(record=self.record)
+        if self.replay:
+            archive.configure(directory=self.replay, speed=self.speed)
+            main.METAR_SOURCE = 'replay'
+        if self.interval_s is not None:
+            main.FETCH_INTERVAL_S = self.interval_s
+        import functions
+        if self.blink_s is not None:
+            functions.BLINK_SPEED = self.blink_s
+        self.main = main
+
+        real_fetch = main.fetch_metars
+
+        def counted_fetch():
+            if self.fetch_count >= self.fetches:
+                self.stop_reason = "fetch limit"
+                raise StopHarness()
+            if self.on_fetch:
+                self.on_fetch(self.fetch_count)
+            code = real_fetch()
+            self.fetch_count += 1
+            self.fetch_codes.append(code)
+            if self.fetch_count == 1 and self.probe_status:
+                threading.Thread(target=self._probe, daemon=True).start()
+            return code
+        main.fetch_metars = counted_fetch
+
+        # Setup mode would serve the portal forever; end the run instead
+        from phew import server
+
+        def no_forever(*a, **k):
+            self.stop_reason = "setup mode"
+            raise StopHarness()
+        server.run = no_forever
+
+    def _probe(self):
+        import urllib.request
+        # the listener only exists once main.run() first pumps the loop
+        for _ in range(50):
+            try:
+                with urllib.request.urlopen("http://127.0.0.1:%d/status" % self.port, timeout=10) as r:
+                    self.status_json = json.loads(r.read())
+                return
+            except Exception as e:
+                self.status_json = {"probe_error": str(e)}
+                time.sleep(0.1)
+
+    # ---------- run ----------
+    def run(self):
+        if self.main is None:
+            self.setup()
+        import machine
+        t0 = time.time()
+        try:
+            if self.boot:
+                runpy.run_path(os.path.join(REPO, "boot.py"), run_name="boot")
+            else:
+                self.main.run()
+        except StopHarness:
+            pass
+        except machine.ResetRequested:
+            self.stop_reason = "machine.reset()"
+        finally:
+            self.server.stop()
+        self.wall_s = time.time() - t0
+        return self.report()
+
+    def report(self):
+        import archive, rp2, stats, wifi_link
+        sm = rp2.state_machines.get(0)
+        return {
+            "stop_reason": self.stop_reason,
+            "wall_s": round(self.wall_s, 2),
+            "fetches": self.fetch_count,
+            "fetch_codes": self.fetch_codes,
+            "system_state": self.main.system_state,
+            "pio_words": sm.total_words if sm else 0,
+            "http_hits": dict(self.server.hits),
+            "wifi_connect_path": wifi_link.connect_path,
+            "archive": archive.status(),
+            "status_endpoint": self.status_json,
+            "stats": stats.snapshot(),
+            "workdir": self.workdir,
+        }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the map firmware on the host")
+    ap.add_argument("--fetches", type=int, default=2)
+    ap.add_argument("--interval", type=int, default=3, help="FETCH_INTERVAL_S override")
+    ap.add_argument("--blink", type=float, default=0.05, help="BLINK_SPEED override")
+    ap.add_argument("--no-boot", action="store_true", help="call main.run() directly")
+    ap.add_argument("--json", action="store_true", help="print the full report as JSON")
+    ap.add_argument("--record", action="store_true", help="archive the fetched payloads")
+    ap.add_argument("--replay", metavar="DIR", help="replay an archive instead of fetching")
+    ap.add_argument("--speed", type=float, help="replay speed-up (default archive.SPEED)")
+    args = ap.parse_args(argv)
+    h = Harness(fetches=args.fetches, interval_s=args.interval, blink_s=args.blink,
+                boot=not args.no_boot, record=args.record, replay=args.replay,
+                speed=args.speed)
+    rep = h.run()
+    if args.json:
+        print(json.dumps(rep, indent=2, default=str))
+    else:
+        print("stopped:", rep["stop_reason"], "after", rep["wall_s"], "s")
+        print("fetches:", rep["fetches"], "codes:", rep["fetch_codes"],
+              "state:", rep["system_state"], "PIO words:", rep["pio_words"])
+        print("/status probe:", "ok" if rep["status_endpoint"] and
+              "timers" in rep["status_endpoint"] else rep["status_endpoint"])
+        arc = rep["archive"]
+        if arc["records"]:
+            print("archive:", arc["records"], "records,", arc["bytes"], "bytes in",
+                  os.path.join(rep["workdir"], arc["dir"]))
+        if arc["replayed"]:
+            print("replayed:", arc["replayed"], "records,", arc["loops"], "wrap(s)")
+        for name, t in sorted(rep["stats"]["timers"].items()):
+            print("  %-8s n=%-4d avg=%7d us  max=%7d us" % (name, t["n"], t["avg_us"], t["max_us"]))
+
+
+if __name__ == "__main__":
+    main()
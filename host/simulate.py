@@ -0,0 +1,241 @@
+# simulate.py — days of device operation in seconds, on a virtual clock
+#
+#   python -m host.simulate --hours 24 --fail 05:00-05:45 \
+#       --rate-limit 10:00-10:40 --outage 14:00-14:03 --ota 02:30
+#
+# Runs boot.py → main.run() under host.vclock.VirtualClock against the
+# local fixture server. Scheduled events (local HH:MM windows, repeated
+# every simulated day):
+#   --fail        METAR requests return 500
+#   --rate-limit  METAR requests return 429
+#   (both hit the direct API and the mirror chunks; --fail-source direct or
+#   mirror limits them to one, so the failover is exercised)
+#   --outage      Wi-Fi link drops and reconnects fail for the window
+#   --ota         publish a new firmware version at that time (once; the
+#                 device checks 03:05 ± 7 min local, so publish before it)
+# Reports frames rendered, fetches made, time in each system_state,
+# brightness (dimming) transitions, OTA runs and reboots.
+
+import argparse, json, os, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import host
+from host import StopHarness
+from host.run_host import Harness
+from host.vclock import VirtualClock, ClockLimit
+
+STATE_NAMES = {0: "WIFI_CONNECTING", 1: "NORMAL", 2: "API_CLIENT_ERROR",
+               3: "API_RATE_LIMIT", 4: "API_SERVER_ERROR"}
+
+
+def _hhmm(s):
+    h, m = s.split(":")
+    return int(h) * 60 + int(m)
+
+
+def _window(spec):
+    a, b = spec.split("-")
+    return _hhmm(a), _hhmm(b)
+
+
+class Simulation(Harness):
+    def __init__(self, hours=24, start="2026-10-19 00:00:00", fail=(), rate_limit=(),
+                 outage=(), ota=None, render_every=1, fail_source="both", **kw):
+        kw.setdefault("fetches", 10 ** 9)
+        kw.setdefault("interval_s", None)
+        kw.setdefault("blink_s", None)
+        kw.setdefault("probe_status", False)
+        super().__init__(**kw)
+        self.hours = hours
+        self.start = start
+        self.fail = [_window(w) for w in fail]
+        self.rate_limit = [_window(w) for w in rate_limit]
+        self.outage = [_window(w) for w in outage]
+        self.fail_source = fail_source
+        self.ota_at = _hhmm(ota) if ota else None
+        self.render_every = max(1, render_every)
+        self.clock = None
+        self.frames = 0
+        self.status_frames = 0
+        self.state_s = {}
+        self.brightness_log = []
+        self.reboots = 0
+        self.ota_published = False
+        self._mode = None
+        self._in_outage = False
+
+    # ---------- setup ----------
+    def setup(self):
+        host.install()
+        self.clock = VirtualClock(self.start, until_s=self.hours * 3600).install()
+        self.clock.on_advance.append(self._tick)
+        super().setup()
+        self.server.clock = self.clock.true_time
+        import webapp
+        webapp._loop = None        # uasyncio runs on real time; serve_for → virtual sleep
+        m = self.main
+        import functions as fn
+        real_render = fn.render_weather_frame
+
+        def counted_render():
+            self.frames += 1
+            if self.frames % self.render_every == 0:
+                real_render()
+            else:
+                # skip the work, keep the timing and the blink phase
+                fn._wind_cycle = not fn._wind_cycle
+                time.sleep(fn.BLINK_SPEED)
+        fn.render_weather_frame = counted_render
+        real_show_all = m.show_all
+
+        def counted_show_all(color):
+            self.status_frames += 1
+            real_show_all(color)
+        m.show_all = counted_show_all
+        self._last_brightness = m.pixels.brightness()
+
+    # ---------- schedule ----------
+    def _local_minute(self):
+        import timesvc
+        t = timesvc.localtime(self.clock.true_time())
+        return t[3] * 60 + t[4]
+
+    @staticmethod
+    def _inside(minute, windows):
+        for a, b in windows:
+            if a <= minute < b:
+                return True
+        return False
+
+    def _set_chunks(self, status):
+        import main
+        paths = []
+        if self.fail_source != "direct":
+            paths += ["/metar_chunk_%d.json" % i for i in range(1, main.CHUNK_COUNT + 1)]
+        if self.fail_source != "mirror":
+            paths.append(self.server.API_PATH)
+        for path in paths:
+            if status is None:
+                self.server.routes.pop(path, None)
+            else:
+                self.server.routes[path] = (status, b'{"error": "simulated"}')
+
+    def _tick(self, dt):
+        m = self.main
+        if m is not None:
+            st = STATE_NAMES.get(m.system_state, str(m.system_state))
+            self.state_s[st] = self.state_s.get(st, 0) + dt
+            b = m.pixels.brightness()
+            if b != self._last_brightness:
+                self.brightness_log.append((self._stamp(), self._last_brightness, b))
+                self._last_brightness = b
+        minute = self._local_minute()
+        mode = 500 if self._inside(minute, self.fail) else (
+            429 if self._inside(minute, self.rate_limit) else None)
+        if mode != self._mode:
+            self._set_chunks(mode)
+            self._mode = mode
+        out = self._inside(minute, self.outage)
+        if out != self._in_outage:
+            import network
+            if out:
+                network.drop_link()
+                network.configure(fail_connects=10 ** 6)
+            else:
+                network.configure(fail_connects=0)
+            self._in_outage = out
+        if self.ota_at is not None and not self.ota_published and minute >= self.ota_at:
+            self._publish_ota()
+
+    def _publish_ota(self):
+        import ota_daily
+        self.server.routes["/ota/version.txt"] = (200, "sim-ota")
+        for fname in ota_daily.FILES_TO_UPDATE:
+            with open(os.path.join(host.REPO_DIR, fname), "rb") as f:
+                self.server.routes["/ota/" + fname] = (200, f.read())
+        self.ota_published = True
+
+    def _stamp(self):
+        t = time.gmtime(self.clock.true_time())
+        return "%02d %02d:%02d:%02d UTC" % (t[2], t[3], t[4], t[5])
+
+    # ---------- run ----------
+    def run(self):
+        if self.main is None:
+            self.setup()
+        import machine, runpy
+        t0 = time.perf_counter()
+        first = True
+        try:
+            while True:
+                try:
+                    if first and self.boot:
+                        first = False
+                        runpy.run_path(os.path.join(host.REPO_DIR, "boot.py"), run_name="boot")
+                    else:
+                        self.main.run()
+                except machine.ResetRequested:
+                    # simulated reboot: keep module state, re-enter the loop
+                    self.reboots += 1
+        except (ClockLimit, StopHarness):
+            self.stop_reason = "clock limit"
+        finally:
+            self.server.stop()
+            self.clock.uninstall()
+        self.wall_s = time.perf_counter() - t0
+        return self.report()
+
+    def report(self):
+        import stats, wifi_link, ota_daily
+        return {
+            "simulated_h": round(self.clock.elapsed_s() / 3600, 2),
+            "wall_s": round(self.wall_s, 2),
+            "speedup": int(self.clock.elapsed_s() / self.wall_s) if self.wall_s else None,
+            "frames_rendered": self.frames,
+            "status_frames": self.status_frames,
+            "fetches": self.fetch_count,
+            "fetch_codes": _histogram(self.fetch_codes),
+            "state_time_s": {k: round(v) for k, v in sorted(self.state_s.items())},
+            "brightness_changes": self.brightness_log,
+            "ota_last_run": ota_daily._get_last_run_date(),
+            "ota_version": ota_daily._read_local_version(),
+            "reboots": self.reboots,
+            "wifi_outages": wifi_link.outages,
+            "wifi_reconnects": wifi_link.reconnects,
+            "timers": {k: v["n"] for k, v in stats.snapshot()["timers"].items()},
+        }
+
+
+def _histogram(values):
+    out = {}
+    for v in values:
+        out[str(v)] = out.get(str(v), 0) + 1
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Simulate device operation on a virtual clock")
+    ap.add_argument("--hours", type=float, default=24)
+    ap.add_argument("--start", default="2026-10-19 00:00:00", help="UTC start time")
+    ap.add_argument("--fail", action="append", default=[], metavar="HH:MM-HH:MM")
+    ap.add_argument("--rate-limit", action="append", default=[], metavar="HH:MM-HH:MM")
+    ap.add_argument("--outage", action="append", default=[], metavar="HH:MM-HH:MM")
+    ap.add_argument("--fail-source", choices=("both", "direct", "mirror"), default="both",
+                    help="which METAR source --fail / --rate-limit apply to")
+    ap.add_argument("--ota", metavar="HH:MM", help="publish a new version at this local time")
+    ap.add_argument("--render-every", type=int, default=1,
+                    help="fully render only every Nth frame (others only advance the clock)")
+    args = ap.parse_args(argv)
+    sim = Simulation(hours=args.hours, start=args.start, fail=args.fail,
+                     rate_limit=args.rate_limit, outage=args.outage, ota=args.ota,
+                     render_every=args.render_every, fail_source=args.fail_source)
+    import log
+    log.set_levels(console=log.ERROR + 1)
+    rep = sim.run()
+    print(json.dumps(rep, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# vclock.py — deterministic virtual time for the host harness
+#
+#   clock = VirtualClock(start="2026-10-19 00:00:00").install()
+#   ... run firmware: every sleep returns instantly and advances the clock ...
+#   clock.uninstall()
+#
+# Patches time.sleep / sleep_ms / sleep_us, ticks_ms / ticks_us / ticks_cpu,
+# and the "true" clock behind the fake machine.RTC (time.time, gmtime,
+# localtime). Virtual time only moves when the firmware sleeps, so a run
+# is reproducible regardless of host speed.
+#
+# The board's RTC starts unsynced at RTC_POWER_ON (2021-01-01, as on a
+# Pico) until the firmware sets it from an HTTP Date header or NTP.
+
+import calendar, time
+
+RTC_POWER_ON = calendar.timegm((2021, 1, 1, 0, 0, 0, 0, 0, 0))
+
+
+class ClockLimit(BaseException):
+    """Raised from a sleep once the clock reaches its configured end."""
+
+
+def _parse(start):
+    if isinstance(start, (int, float)):
+        return float(start)
+    return float(calendar.timegm(time.strptime(start, "%Y-%m-%d %H:%M:%S")))
+
+
+class VirtualClock:
+    def __init__(self, start="2026-10-19 00:00:00", until_s=None, rtc_synced=False):
+        self.start_epoch = _parse(start)
+        self.until_s = until_s            # stop after this many virtual seconds
+        self.rtc_synced = rtc_synced
+        self.ns = 0                       # virtual nanoseconds since start
+        self.sleeps = 0
+        self.slept_s = 0.0
+        self.on_advance = []              # callables(dt_s) after every advance
+        self._saved = None
+
+    # ---------- clock sources ----------
+    def elapsed_s(self):
+        return self.ns / 1e9
+
+    def true_time(self):
+        """Real-world UTC epoch seconds in the simulation."""
+        return self.start_epoch + self.ns / 1e9
+
+    def ticks_ms(self):
+        return self.ns // 1000000
+
+    def ticks_us(self):
+        return self.ns // 1000
+
+    # ---------- advancing ----------
+    def advance(self, seconds):
+        if seconds <= 0:
+            return
+        if self.until_s is not None and self.elapsed_s() >= self.until_s:
+            raise ClockLimit()
+        self.ns += int(seconds * 1e9)
+        self.sleeps += 1
+        self.slept_s += seconds
+        for cb in self.on_advance:
+            cb(seconds)
+
+    def sleep(self, s):
+        self.advance(s)
+
+    def sleep_ms(self, ms):
+        self.advance(ms / 1000)
+
+    def sleep_us(self, us):
+        self.advance(us / 1000000)
+
+    # ---------- install ----------
+    def install(self):
+        import machine
+        self._saved = (time.sleep, time.sleep_ms, time.sleep_us, time.ticks_ms,
+                       time.ticks_us, time.ticks_cpu, machine._real_time,
+                       machine._rtc_offset[0])
+        time.sleep = self.sleep
+        time.sleep_ms = self.sleep_ms
+        time.sleep_us = self.sleep_us
+        time.ticks_ms = self.ticks_ms
+        time.ticks_us = self.ticks_us
+        time.ticks_cpu = self.ticks_us
+        machine._real_time = self.true_time
+        machine.install_clock()
+        # an unsynced Pico RTC reads 2021-01-01 00:00 at power-on
+        machine._rtc_offset[0] = 0 if self.rtc_synced else RTC_POWER_ON - self.start_epoch
+        return self
+
+    def uninstall(self):
+        if not self._saved:
+            return
+        import machine
+        (time.sleep, time.sleep_ms, time.sleep_us, time.ticks_ms, time.ticks_us,
+         time.ticks_cpu, machine._real_time, machine._rtc_offset[0]) = self._saved
+        self._saved = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
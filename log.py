@@ -0,0 +1,107 @@
+# log.py — shared leveled logger with an in-RAM ring buffer (MicroPython)
+# - Calls below both thresholds return before any formatting happens.
+#   On hot paths guard the call so the arguments aren't even built:
+#       if log.level <= log.DEBUG: log.debug("Update:", icao, cat)
+# - Messages at/above RING_LEVEL go into a fixed-size bytearray ring
+#   (no per-message heap growth); dump() on demand, flush() on a crash.
+# - Messages at/above CONSOLE_LEVEL are also printed (USB/UART).
+
+import time
+
+DEBUG = 10
+INFO  = 20
+WARN  = 30
+ERROR = 40
+_NAMES = {DEBUG: "D", INFO: "I", WARN: "W", ERROR: "E"}
+
+CONSOLE_LEVEL = WARN       # printing blocks on USB/UART; keep it quiet
+RING_LEVEL    = INFO
+RING_BYTES    = 4096
+CRASH_FILE    = "crash.log"
+
+level = min(CONSOLE_LEVEL, RING_LEVEL)   # cheapest gate for call sites
+
+_ring = bytearray(RING_BYTES)
+_pos = 0
+_wrapped = False
+
+def set_levels(console=None, ring=None):
+    global CONSOLE_LEVEL, RING_LEVEL, level
+    if console is not None:
+        CONSOLE_LEVEL = console
+    if ring is not None:
+        RING_LEVEL = ring
+    level = min(CONSOLE_LEVEL, RING_LEVEL)
+
+def _put(b):
+    global _pos, _wrapped
+    n = len(b)
+    if n >= RING_BYTES:
+        b = b[-(RING_BYTES - 1):]
+        n = len(b)
+    end = _pos + n
+    if end <= RING_BYTES:
+        _ring[_pos:end] = b
+    else:
+        first = RING_BYTES - _pos
+        _ring[_pos:] = b[:first]
+        _ring[:n - first] = b[first:]
+        _wrapped = True
+    _pos = end % RING_BYTES
+    if end == RING_BYTES:
+        _wrapped = True
+
+def log(lvl, *args):
+    if lvl < level:
+        return
+    msg = " ".join(str(a) for a in args)
+    if lvl >= RING_LEVEL:
+        _put(("%d %s %s\n" % (time.ticks_ms(), _NAMES.get(lvl, "?"), msg)).encode())
+    if lvl >= CONSOLE_LEVEL:
+        print("[%s]" % _NAMES.get(lvl, "?"), msg)
+
+def debug(*args):
+    if DEBUG >= level:
+        log(DEBUG, *args)
+
+def info(*args):
+    if INFO >= level:
+        log(INFO, *args)
+
+def warn(*args):
+    if WARN >= level:
+        log(WARN, *args)
+
+def error(*args):
+    if ERROR >= level:
+        log(ERROR, *args)
+
+def exception(e, *args):
+    """Log an exception with its traceback into the ring."""
+    try:
+        import sys, io
+        buf = io.StringIO()
+        sys.print_exception(e, buf)
+        tb = buf.getvalue()
+    except Exception:
+        tb = repr(e)
+    log(ERROR, *(args + (tb,)))
+
+def dump():
+    """Ring contents, oldest first, as bytes."""
+    if not _wrapped:
+        return bytes(_ring[:_pos])
+    # oldest data starts after the write position; drop the partial line
+    out = bytes(_ring[_pos:]) + bytes(_ring[:_pos])
+    nl = out.find(b"\n")
+    return out[nl + 1:] if nl != -1 else out
+
+def flush(path=CRASH_FILE):
+    """Write the ring to flash (call on crash / before reset)."""
+    try:
+        with open(path, "wb") as f:
+            f.write(dump())
+        return True
+    except Exception as e:
+        print("log: flush failed:", e)
+        return False
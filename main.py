@@ -1,21 +1,35 @@
 
-# main.py — RESTORED (no math breathing, WDT disabled, Hugh=GRB, correct colors)
+# main.py — RESTORED (no math breathing, WDT enabled, Hugh=GRB, correct colors)
 # Requires: functions.py, data.py, argbled_lib
 
 import network
 import time
 import gc
 from argbled_lib import Argbled
+from argbled_multi import MultiArgbled
 import data
 import functions as fn
-from machine import WDT
+import wifi_link
+import stats
+import webapp
 import ota_daily
-ota_daily.ota_init_time()
-# ------------------------- DEBUG -------------------------
-DEBUG = True
-def debug(*args):
-    if DEBUG:
-        print('[DEBUG]', *args)
+import timesvc   # clock is set from the first HTTP Date header, NTP refines later
+import dimmer
+import history
+import mirror
+import effects
+import watchdog
+import power
+import upstream
+import heap
+import mqtt_pub
+import archive
+import taf
+import settings
+# ------------------------- LOGGING -------------------------
+# Levels / ring size live in log.py; DEBUG is off unless log.set_levels()
+import log
+debug = log.info    # state changes are worth keeping for post-mortems
 
 # ------------------------- USER CONFIG -------------------------
 
@@ -34,8 +48,22 @@ else:
     LED_BRIGHTNESS = 35
     LED_ORDER      = 'RGB'
 
+# Larger maps: split the LEDs over several pins, one PIO state machine each,
+# e.g. [(1, 100), (2, 100), (3, 100), (4, 100)] with LED_COUNT = 400.
+# Strip entries are (pin, count) or (pin, count, reversed). None = one strip.
+LED_STRIPS = None
+
+# Supply budget for the LEDs in mA (estimated from the pixel buffer).
+# Frames that would draw more are dimmed for that frame only. None = no cap.
+LED_MAX_MA = 1500
+
 # METAR fetch settings
-#API_BASE = 'https://aviationweather.gov/api/data/metar?ids={ids}&format=json'
+# 'direct' = aviationweather.gov, batched by station list (upstream.py)
+# 'mirror' = the pre-split chunks at GITHUB_BASE
+# 'auto'   = direct, failing over to the mirror
+# 'replay' = the recorded archive, no network (archive.py; also set by a demo.json)
+METAR_SOURCE = 'auto'
+API_BASE = 'https://aviationweather.gov/api/data/metar'
 #GITHUB_BASE = "http://hughgoodbody.github.io/pico-metar-data"
 GITHUB_BASE = "http://www.goodbodyeffects.com/metarMap"
 CHUNK_COUNT = 4  # you have 4 chunks hosted
@@ -44,6 +72,25 @@ CHUNK_COUNT = 4  # you have 4 chunks hosted
 CHUNK_SIZE = 25
 FETCH_INTERVAL_S = 900
 
+# Feed archive (archive.py): keep every fetched payload in rotating files
+# for repros and demos; replay plays them back ARCHIVE_SPEED times faster
+ARCHIVE_RECORD = False
+ARCHIVE_SPEED  = 60
+
+# Power between fetches: power.MODE_ON, MODE_SAVE (radio power-save),
+# MODE_OFF (radio off + CPU lightsleep, no web UI), MODE_NIGHT (off at night)
+POWER_MODE = power.MODE_ON
+
+# Station-change events to a local MQTT broker (mqtt_pub.py). None = off;
+# use an IP address so a connection attempt never waits on DNS.
+MQTT_BROKER = None
+MQTT_PORT   = 1883
+MQTT_TOPIC  = 'metar-map'
+
+# Hardware watchdog (the RP2040 maximum is ~8.3 s; cannot be stopped once on)
+WATCHDOG_ENABLED    = True
+WATCHDOG_TIMEOUT_MS = 8000
+
 # Wind/LTG animation
 ACTIVATE_WIND_ANIM      = True
 ACTIVATE_LIGHTNING_ANIM = True
@@ -53,8 +100,23 @@ HIGH_WINDS_THRESHOLD    = 30
 ALWAYS_BLINK_FOR_GUSTS  = False
 BLINK_SPEED_S           = 0.3
 BLINK_TOTAL_TIME_S      = 900
+ACTIVATE_TREND_ANIM     = True   # pulse toward the previous category after a change
+HISTORY_DEPTH           = 8      # reports kept per station (8 bytes each)
+ACTIVATE_GEO_EFFECTS    = True   # lightning / category changes ripple to nearby stations
 
-# Dimming (time-window only; no sun calc)
+# Forecast playback: every TAF_PLAY_EVERY_S the map steps through the next
+# taf.PLAY_HOURS hours of TAF categories, TAF_FRAME_S per hour. TAFs come
+# from TAF_API_BASE (batched like METARs), falling back to taf_chunk_N.json
+# at GITHUB_BASE; METAR_SOURCE 'direct' / 'mirror' applies to both.
+TAF_PLAYBACK     = True
+TAF_API_BASE     = 'https://aviationweather.gov/api/data/taf'
+TAF_PLAY_EVERY_S = 300
+TAF_FRAME_S      = 1.0
+
+# Dimming: full brightness between the fixed local times below, or from
+# sunrise to sunset when USE_SUNRISE_SUNSET is True (suntable.py, regenerate
+# with host/make_suntable.py for another location). Changes ramp over
+# dimmer.RAMP_S. LED_BRIGHTNESS_DIM <= 1 is a fraction of LED_BRIGHTNESS.
 ACTIVATE_DAYTIME_DIMMING = True
 BRIGHT_TIME_START = (7, 0)
 DIM_TIME_START    = (21, 0)
@@ -76,6 +138,7 @@ STATE_API_SERVER_ERROR  = 4   # 5xx + unknown
 
 system_state = STATE_WIFI_CONNECTING
 backoff_seconds = 30
+have_data = False   # True once any fetch succeeded; keeps the map lit through outages
 
 # ------------------------- COLORS (Correct RGB) -------------------------
 COLOR_VFR         = (0, 255, 0)     # Green
@@ -102,15 +165,28 @@ gc.enable()
 wlan = network.WLAN(network.STA_IF)
 wlan.active(True)
 
-pixels = Argbled(LED_COUNT, 0, LED_PIN, LED_ORDER)
+if LED_STRIPS:
+    pixels = MultiArgbled(LED_STRIPS, LED_ORDER, max_ma=LED_MAX_MA)
+    LED_COUNT = pixels.num_leds
+else:
+    pixels = Argbled(LED_COUNT, 0, LED_PIN, LED_ORDER, max_ma=LED_MAX_MA)
 pixels.brightness(LED_BRIGHTNESS)
 pixels.fill(COLOR_CLEAR)
 pixels.show()
 
-# Watchdog DISABLED for development
-class DummyWDT:
-    def feed(self): pass
-wdt = DummyWDT()
+dimmer.configure(pixels=pixels, day=LED_BRIGHTNESS, dim=LED_BRIGHTNESS_DIM,
+                 use_sun_times=USE_SUNRISE_SUNSET, bright=BRIGHT_TIME_START,
+                 dim_at=DIM_TIME_START, active=ACTIVATE_DAYTIME_DIMMING)
+
+# Hardware watchdog: every blocking call has a timeout and long waits are
+# sliced (watchdog.py), so a hung socket costs one reset, not a frozen map.
+# DNS has no timeout: look the hosts up while the WDT is still off.
+if wlan.isconnected():
+    watchdog.prefetch((API_BASE, TAF_API_BASE, GITHUB_BASE, ota_daily.GITHUB_RAW_BASE,
+                       'ntp://%s:123' % timesvc.NTP_HOST,
+                       MQTT_BROKER and 'mqtt://%s:%d' % (MQTT_BROKER, MQTT_PORT)))
+if WATCHDOG_ENABLED:
+    watchdog.start(WATCHDOG_TIMEOUT_MS)
 
 # Provide colors to functions module
 fn.init_globals(
@@ -125,14 +201,72 @@ fn.init_globals(
     wind_threshold=WIND_BLINK_THRESHOLD, high_wind_threshold=HIGH_WINDS_THRESHOLD,
     gusts_always=ALWAYS_BLINK_FOR_GUSTS, fade_instead=FADE_INSTEAD_OF_BLINK,
     wind_anim=ACTIVATE_WIND_ANIM, ltg_anim=ACTIVATE_LIGHTNING_ANIM,
-    blink_speed=BLINK_SPEED_S, blink_total=BLINK_TOTAL_TIME_S
+    blink_speed=BLINK_SPEED_S, blink_total=BLINK_TOTAL_TIME_S,
+    trend_anim=ACTIVATE_TREND_ANIM, geo_effects=ACTIVATE_GEO_EFFECTS
 )
+# Long-lived buffers from here to heap.settle(), before any fetch garbage
+heap.begin()
+history.init(len(data.leds), HISTORY_DEPTH)
+mirror.init(LED_COUNT)
+effects.init(len(data.leds))
+taf.reserve(len(data.leds), pixels.num_leds)
+mqtt_pub.BROKER, mqtt_pub.PORT, mqtt_pub.TOPIC = MQTT_BROKER, MQTT_PORT, MQTT_TOPIC
+mqtt_pub.init(len(data.leds))
+archive.configure(record=ARCHIVE_RECORD, speed=ARCHIVE_SPEED)
+if archive.demo_requested():
+    METAR_SOURCE = 'replay'
+upstream.configure(base=API_BASE, source=METAR_SOURCE)
+upstream.plan([ap['code'] for ap in data.leds])
+taf.plan([ap['code'] for ap in data.leds], TAF_API_BASE)
+taf.WIND_THRESHOLD = HIGH_WINDS_THRESHOLD
+TAF_COLORS = (COLOR_CLEAR, COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR)
+
+# ------------------------- INSTRUMENTATION -------------------------
+def _firmware_version():
+    try:
+        with open(ota_daily.LOCAL_VERSION_FILE) as f:
+            return f.read().strip()
+    except:
+        return None
+
+FIRMWARE_VERSION = _firmware_version()
+
+stats.providers['device'] = lambda: {
+    'firmware': FIRMWARE_VERSION, 'map': MAPTYPE, 'leds': LED_COUNT,
+    'state': system_state, 'have_data': have_data,
+}
+stats.providers['wifi'] = lambda: {
+    'connected': wlan.isconnected(), 'boot_connect_ms': wifi_link.connect_ms,
+    'connect_path': wifi_link.connect_path, 'outages': wifi_link.outages,
+    'reconnects': wifi_link.reconnects, 'last_outage_ms': wifi_link.last_outage_ms,
+}
+stats.providers['time'] = timesvc.status
+stats.providers['power'] = pixels.power_status
+stats.providers['dimmer'] = dimmer.status
+stats.providers['history'] = history.status
+stats.providers['taf'] = taf.status
+stats.providers['mirror'] = mirror.status
+stats.providers['settings'] = settings.status
+stats.providers['effects'] = effects.status
+stats.providers['watchdog'] = watchdog.status
+stats.providers['energy'] = power.status
+stats.providers['upstream'] = upstream.status
+stats.providers['heap'] = heap.status
+stats.providers['mqtt'] = mqtt_pub.status
+stats.providers['archive'] = archive.status
+
+webapp.start()
 
 # ------------------------- STATUS HELPERS -------------------------
+def show():
+    t0 = stats.start()
+    pixels.show()
+    stats.stop('show', t0)
+
 def show_all(color):
     for i in range(LED_COUNT):
         pixels.set_pixel(i, color)
-    pixels.show()
+    show()
 
 def blink_all(color, interval=0.6):
     show_all(color)
@@ -145,12 +279,12 @@ def pulse_all(color, steps=40, delay=0.01):
     for i in range(steps):
         level = i / steps
         pixels.fill((int(r*level), int(g*level), int(b*level)))
-        pixels.show()
+        show()
         time.sleep(delay)
     for i in range(steps, -1, -1):
         level = i / steps
         pixels.fill((int(r*level), int(g*level), int(b*level)))
-        pixels.show()
+        show()
         time.sleep(delay)
 
 def update_display():
@@ -169,73 +303,212 @@ def update_display():
     else:
         show_all(COLOR_WARMWHITE)
 
-# ------------------------- DIMMING -------------------------
-def maybe_dim():
-    if not USE_SUNRISE_SUNSET:
-        if not ACTIVATE_DAYTIME_DIMMING:
-            return
-        hh = time.localtime()[3]
-        mm = time.localtime()[4]
-        debug('Hour:', hh, 'Minutes:', mm)
-        bright_h, bright_m = BRIGHT_TIME_START
-        dim_h, dim_m = DIM_TIME_START
-        after_bright = (hh, mm) >= (bright_h, bright_m)
-        after_dim = (hh, mm) >= (dim_h, dim_m)
-        if after_dim or not after_bright:
-            pixels.brightness(LED_BRIGHTNESS_DIM)
-        else:
-            pixels.brightness(LED_BRIGHTNESS)
-        return
-    # If sun-based dimming was enabled earlier, it's now disabled per request.
+def play_forecast():
+    """Step through the next hours of TAF categories, then back to METARs."""
+    n = taf.build_frames(pixels, data.leds, TAF_COLORS, COLOR_HIGH_WINDS, COLOR_LIGHTNING)
+    if n:
+        taf.play(pixels, n, show, lambda: wait_s(TAF_FRAME_S, 'taf_play', render=False))
+
+def wait_s(seconds, site='wait', render=True):
+    """
+    Wait in slices of at most a second: animate (unless render is False),
+    answer the web UI and feed the watchdog between slices.
+    """
+    end = time.ticks_add(time.ticks_ms(), int(seconds * 1000))
+    while True:
+        left = time.ticks_diff(end, time.ticks_ms())
+        if left <= 0:
+            break
+        if render:
+            dimmer.tick()
+            update_display()
+            heap.slack()
+            left = time.ticks_diff(end, time.ticks_ms())
+        power.pause(max(0, min(1000, left)), webapp.serve_for)
+        watchdog.feed(site)
+        if power.radio_up():
+            mqtt_pub.tick()
 
 # ------------------------- FETCH -------------------------
 def fetch_all_chunks():
     """Fetch METAR JSONs from GitHub Pages instead of aviationweather.gov"""
-    import urequests, gc
     return_code = 200
+    t_fetch = stats.start()
 
     for i in range(1, CHUNK_COUNT + 1):
         url = f"{GITHUB_BASE}/metar_chunk_{i}.json"
-        print("Fetching", url)
+        if log.level <= log.DEBUG:
+            log.debug("Fetching", url)
+        payload = []
         try:
-            r = urequests.get(url)
-            if r.status_code == 200:
-                code = fn.parse_chunk(r.json())  # call new parse function
+            t0 = stats.start()
+            # streamed and split per report, through the cached DNS address
+            status, headers = upstream.download(url, upstream.objects(payload.append), 'chunk')
+            if status == 200:
+                stats.stop('chunk', t0)
+                archive.record('mirror', payload, headers)
+                code = fn.parse_chunk(payload)  # call new parse function
                 if code != 200 and return_code == 200:
                     return_code = code
             else:
-                print("[DEBUG] HTTP", r.status_code, "for chunk", i)
-                return_code = r.status_code
+                log.warn("HTTP", status, "for chunk", i)
+                stats.count('http_' + str(status))
+                return_code = status
         except Exception as e:
-            print("[DEBUG] Chunk", i, "failed:", e)
+            log.warn("Chunk", i, "failed:", e)
+            stats.count('chunk_errors')
             return_code = 500
         finally:
-            try:
-                r.close()
-            except:
-                pass
-            gc.collect()
+            payload = None
+            stats.collect()
+            watchdog.feed('chunk')
 
+    stats.stop('fetch', t_fetch)
     return return_code
 
+def parse_direct(entries):
+    archive.record('direct', entries, upstream.validators)
+    return fn.parse_chunk(entries)
+
+def fetch_metars():
+    """One refresh from METAR_SOURCE: direct upstream, mirror chunks, both with failover, or the archive."""
+    if METAR_SOURCE == 'replay':
+        return archive.replay(fn.parse_chunk)
+    archive.begin()
+    return upstream.refresh(parse_direct, fetch_all_chunks)
+
+def publish():
+    """Push the station table and state to the web mirror and MQTT (per fetch, not per frame)."""
+    mirror.update(data.leds, system_state, WIND_BLINK_THRESHOLD, ACTIVATE_LIGHTNING_ANIM)
+    if have_data:
+        mqtt_pub.publish(data.leds, WIND_BLINK_THRESHOLD)   # queued; sent by mqtt_pub.tick()
+
+# ------------------------- RUNTIME SETTINGS -------------------------
+# The constants above are defaults; settings.json (edited from /settings)
+# overrides them. Each applier rebuilds only what its group feeds.
+def apply_dimmer(cfg):
+    global LED_BRIGHTNESS, LED_BRIGHTNESS_DIM, ACTIVATE_DAYTIME_DIMMING
+    global USE_SUNRISE_SUNSET, BRIGHT_TIME_START, DIM_TIME_START
+    LED_BRIGHTNESS = cfg['brightness']
+    LED_BRIGHTNESS_DIM = cfg['dim_brightness']
+    ACTIVATE_DAYTIME_DIMMING = cfg['dimming_active']
+    USE_SUNRISE_SUNSET = cfg['use_sun_times']
+    BRIGHT_TIME_START = (cfg['bright_start_hour'], BRIGHT_TIME_START[1])
+    DIM_TIME_START = (cfg['dim_start_hour'], DIM_TIME_START[1])
+    # rebuilds the ramp tables; the next tick goes straight to the new level
+    dimmer.configure(day=LED_BRIGHTNESS, dim=LED_BRIGHTNESS_DIM,
+                     use_sun_times=USE_SUNRISE_SUNSET, bright=BRIGHT_TIME_START,
+                     dim_at=DIM_TIME_START, active=ACTIVATE_DAYTIME_DIMMING)
+
+def apply_wind(cfg):
+    global WIND_BLINK_THRESHOLD, HIGH_WINDS_THRESHOLD, ALWAYS_BLINK_FOR_GUSTS
+    global ACTIVATE_WIND_ANIM, ACTIVATE_LIGHTNING_ANIM
+    WIND_BLINK_THRESHOLD = cfg['wind_threshold']
+    HIGH_WINDS_THRESHOLD = cfg['high_wind_threshold']
+    ALWAYS_BLINK_FOR_GUSTS = cfg['gusts_always']
+    ACTIVATE_WIND_ANIM = cfg['wind_anim']
+    ACTIVATE_LIGHTNING_ANIM = cfg['ltg_anim']
+    fn.configure(wind_threshold=WIND_BLINK_THRESHOLD, high_wind_threshold=HIGH_WINDS_THRESHOLD,
+                 gusts_always=ALWAYS_BLINK_FOR_GUSTS, wind_anim=ACTIVATE_WIND_ANIM,
+                 ltg_anim=ACTIVATE_LIGHTNING_ANIM)
+    if taf.WIND_THRESHOLD != HIGH_WINDS_THRESHOLD:
+        taf.WIND_THRESHOLD = HIGH_WINDS_THRESHOLD
+        taf.invalidate(refetch=True)   # wind flags are baked into the timeline
+    publish()                          # per-station wind flags in the mirror
+
+def apply_anim(cfg):
+    global ACTIVATE_TREND_ANIM, BLINK_SPEED_S, ACTIVATE_GEO_EFFECTS
+    ACTIVATE_TREND_ANIM = cfg['trend_anim']
+    BLINK_SPEED_S = cfg['blink_speed']
+    ACTIVATE_GEO_EFFECTS = cfg['geo_effects']
+    fn.configure(trend_anim=ACTIVATE_TREND_ANIM, blink_speed=BLINK_SPEED_S,
+                 geo_effects=ACTIVATE_GEO_EFFECTS)
+
+def apply_palette(cfg):
+    global COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR, COLOR_LIGHTNING, COLOR_HIGH_WINDS
+    global COLOR_VFR_FADE, COLOR_MVFR_FADE, COLOR_IFR_FADE, COLOR_LIFR_FADE, TAF_COLORS
+    COLOR_VFR, COLOR_MVFR = cfg['color_vfr'], cfg['color_mvfr']
+    COLOR_IFR, COLOR_LIFR = cfg['color_ifr'], cfg['color_lifr']
+    COLOR_LIGHTNING, COLOR_HIGH_WINDS = cfg['color_lightning'], cfg['color_high_winds']
+    fn.configure(color_vfr=COLOR_VFR, color_mvfr=COLOR_MVFR, color_ifr=COLOR_IFR,
+                 color_lifr=COLOR_LIFR, color_lightning=COLOR_LIGHTNING,
+                 color_high_winds=COLOR_HIGH_WINDS)
+    COLOR_VFR_FADE, COLOR_MVFR_FADE = fn.COLOR_VFR_FADE, fn.COLOR_MVFR_FADE
+    COLOR_IFR_FADE, COLOR_LIFR_FADE = fn.COLOR_IFR_FADE, fn.COLOR_LIFR_FADE
+    TAF_COLORS = (COLOR_CLEAR, COLOR_VFR, COLOR_MVFR, COLOR_IFR, COLOR_LIFR)
+    taf.invalidate()                   # cached forecast frames use the old colours
+
+def apply_power(cfg):
+    global POWER_MODE
+    POWER_MODE = cfg['power_mode']
+    # takes effect when the radio next goes idle, after the coming fetch
+    power.configure(POWER_MODE)
+
+settings.appliers['dimmer'] = apply_dimmer
+settings.appliers['wind'] = apply_wind
+settings.appliers['anim'] = apply_anim
+settings.appliers['palette'] = apply_palette
+settings.appliers['power'] = apply_power
+
+_cfg = settings.load({
+    'brightness': LED_BRIGHTNESS, 'dim_brightness': LED_BRIGHTNESS_DIM,
+    'dimming_active': ACTIVATE_DAYTIME_DIMMING, 'use_sun_times': USE_SUNRISE_SUNSET,
+    'bright_start_hour': BRIGHT_TIME_START[0], 'dim_start_hour': DIM_TIME_START[0],
+    'wind_threshold': WIND_BLINK_THRESHOLD, 'high_wind_threshold': HIGH_WINDS_THRESHOLD,
+    'gusts_always': ALWAYS_BLINK_FOR_GUSTS, 'wind_anim': ACTIVATE_WIND_ANIM,
+    'ltg_anim': ACTIVATE_LIGHTNING_ANIM, 'trend_anim': ACTIVATE_TREND_ANIM,
+    'blink_speed': BLINK_SPEED_S, 'geo_effects': ACTIVATE_GEO_EFFECTS,
+    'color_vfr': COLOR_VFR, 'color_mvfr': COLOR_MVFR, 'color_ifr': COLOR_IFR,
+    'color_lifr': COLOR_LIFR, 'color_lightning': COLOR_LIGHTNING,
+    'color_high_winds': COLOR_HIGH_WINDS, 'power_mode': POWER_MODE,
+})
+power.configure(leds=lambda: pixels.frame_ma)
+for _apply in (apply_dimmer, apply_wind, apply_anim, apply_palette, apply_power):
+    _apply(_cfg)
+heap.settle()
+
 # ------------------------- MAIN -------------------------
 def main():
-    ota_daily.ota_tick() #OTA update tick
-    global system_state, backoff_seconds
-    maybe_dim()
-    code = fetch_all_chunks()
+    """One fetch cycle. Returns False if skipped because the link is down."""
+    global system_state, backoff_seconds, have_data
+    replaying = METAR_SOURCE == 'replay'   # no network needed
+    if not replaying and not wifi_link.supervise():
+        # Link down: keep showing the last known data while the supervisor
+        # reconnects in the background.
+        if not have_data:
+            system_state = STATE_WIFI_CONNECTING
+        publish()
+        update_display()
+        return False
+    code = fetch_metars()
+    if code != 200 and not replaying:
+        wifi_link.drop_lease()   # a reused lease may have been handed to another host
+    if not replaying:
+        if TAF_PLAYBACK and code == 200 and taf.due():
+            taf.fetch(GITHUB_BASE, data.leds)
+        timesvc.ntp_tick()   # single short attempt, only when due
+    dimmer.tick()        # after the fetch so a first Date header can set the clock
+    if not replaying:
+        ota_daily.ota_tick() #OTA update tick
     debug('Fetch result code:', code)
+    if code != 200 and have_data and not replaying and not wlan.isconnected():
+        # Link dropped mid-fetch — not a server problem, keep the old map
+        debug('Fetch lost link — keeping last data')
+        publish()
+        update_display()
+        return False
     if code == 200:
         system_state = STATE_NORMAL
         debug('STATE → NORMAL (data OK)')
         backoff_seconds = 30
+        have_data = True
     elif code in (400, 404):
         system_state = STATE_API_CLIENT_ERROR
         debug('STATE → CLIENT ERROR (400/404)')
     elif code == 429:
         system_state = STATE_API_RATE_LIMIT
         debug('STATE → RATE LIMIT (429), backoff:', backoff_seconds)
-        time.sleep(backoff_seconds)
+        wait_s(backoff_seconds, 'backoff')   # sliced: the map keeps pulsing amber
         backoff_seconds = backoff_seconds * 2 if backoff_seconds < 900 else 900
     elif code in (500, 502, 504):
         system_state = STATE_API_SERVER_ERROR
@@ -244,7 +517,9 @@ def main():
         system_state = STATE_API_SERVER_ERROR
         debug('STATE → SERVER ERROR (5xx or unknown)')
 
+    publish()
     update_display()
+    return True
 
 # ------------------------- LOOP -------------------------
 def run():
@@ -252,26 +527,49 @@ def run():
     global system_state
     while True:        
         try:
-            main()
-            if system_state == STATE_NORMAL:
+            power.radio_wake(wlan)   # no-op unless parked / power-saving
+            fetched = main()
+            if fetched and system_state == STATE_NORMAL:
+                # keep the radio fully up through the OTA window (an older
+                # ota_daily.py has no window_open until fetch_missing() runs)
+                window_open = getattr(ota_daily, 'window_open', None)
+                power.radio_idle(wlan, hold=window_open(FETCH_INTERVAL_S // 60) if window_open else False)
+                interval = FETCH_INTERVAL_S
+                if METAR_SOURCE == 'replay':
+                    interval = archive.wait_s(FETCH_INTERVAL_S)   # recorded gap / speed
+                wake_at = interval - power.WAKE_LEAD_S
                 # keep animation going while waiting
-                for _ in range(FETCH_INTERVAL_S):
+                for i in range(interval):
+                    if i == wake_at:
+                        power.radio_wake(wlan)   # rejoin before the fetch is due
+                    dimmer.tick()
                     update_display()
-                    time.sleep(1)
-                    wdt.feed()
+                    heap.slack()                          # frame is out: GC here if due
+                    power.pause(1000, webapp.serve_for)   # answers /status while waiting
+                    watchdog.feed('loop')
+                    wifi_link.supervise()
+                    if power.radio_up():
+                        mqtt_pub.tick()               # non-blocking, one step
+                    if i % 60 == 59 and power.radio_up():
+                        # the OTA window is shorter than a fetch cycle
+                        ota_daily.ota_tick()
+                    if TAF_PLAYBACK and i % TAF_PLAY_EVERY_S == TAF_PLAY_EVERY_S - 1:
+                        play_forecast()
             else:
                 time.sleep(1)
-                wdt.feed()
+                watchdog.feed('idle')
         except Exception as e:
-            system_state = STATE_API_SERVER_ERROR
-            debug('STATE → SERVER ERROR (exception)')
+            log.exception(e, 'Loop exception:')
+            if wlan.isconnected() or not have_data:
+                system_state = STATE_API_SERVER_ERROR
+                debug('STATE → SERVER ERROR (exception)')
+            # Link loss is handled by wifi_link.supervise(), which only
+            # resets the board after a long outage.
+            wifi_link.supervise()
+            publish()
             update_display()
             time.sleep(2)
-            if not wlan.isconnected():
-                import machine
-                machine.reset()
-                #return
-            wdt.feed()
-            gc.collect()
+            watchdog.feed('error')
+            stats.collect()
 
 
@@ -0,0 +1,115 @@
+# mirror.py — map state for remote viewers, served as compact deltas
+#
+# Each LED has a palette index (the weather state the map is showing, not
+# the animation phase — viewers animate locally):
+#   bits 0-2  category (history.CAT_CODES: 0 none, 1 VFR .. 4 LIFR)
+#   bit  3    FLAG_WIND (blinks / high winds)
+#   bit  4    FLAG_LTG  (lightning)
+#   bit  5    FLAG_TREND (category changed in the last report)
+# update() runs after a fetch or a state change — never per frame — and
+# stamps each LED whose index changed with a new sequence number. A
+# client asks for /map/delta?since=<seq it last saw> and gets only those
+# LEDs, written into one preallocated buffer:
+#   bytes 0-3  seq, little endian     byte 4  main.system_state
+#   byte  5    reserved               bytes 6-7 count, little endian
+#   bytes 8-11 boot id, little endian
+#   then count x (led lo, led hi, palette index)
+# since=0 returns every LED (a full frame), and so does a since ahead of
+# seq. seq restarts at every boot, so a since from a previous boot can
+# also fall behind seq: the boot id (random, drawn by init()) tells the
+# client its picture is stale — it drops it and asks for since=0.
+
+import array, os
+import history
+
+FLAG_WIND = 0x08
+FLAG_LTG = 0x10
+FLAG_TREND = 0x20
+HEADER = 12
+
+seq = 0
+state = 0
+boot = 0                    # random per init(), never 0
+_pal = bytearray(0)         # palette index per LED
+_stamp = array.array("I")   # seq at which each LED last changed
+_out = bytearray(0)         # response buffer, HEADER + 3 bytes per LED
+
+
+def init(led_count):
+    global _pal, _stamp, _out, seq, boot
+    _pal = bytearray(led_count)
+    _stamp = array.array("I", [0] * led_count)
+    _out = bytearray(HEADER + 3 * led_count)
+    seq = 0
+    boot = int.from_bytes(os.urandom(4), "little") or 1
+    for k in range(4):
+        _out[8 + k] = (boot >> (8 * k)) & 255
+
+
+def palette_index(ap, slot, wind_threshold, ltg_anim=True):
+    c = history.CAT_CODES.get(ap.get("flightCategory"), 0)
+    ws = ap.get("windSpeed") or 0
+    gs = ap.get("windGustSpeed") or 0
+    if ws >= wind_threshold or gs >= wind_threshold or ap.get("windGust") is True:
+        c |= FLAG_WIND
+    if ltg_anim and ap.get("lightning"):
+        c |= FLAG_LTG
+    tf = history.trend_from
+    if slot < len(tf) and tf[slot]:
+        c |= FLAG_TREND
+    return c
+
+
+def update(leds, system_state, wind_threshold, ltg_anim=True):
+    """Recompute palette indexes from the station table. Returns LEDs changed."""
+    global seq, state
+    n = 0
+    nxt = seq + 1
+    pal = _pal
+    stamp = _stamp
+    size = len(pal)
+    for slot, ap in enumerate(leds):
+        i = ap["led"]
+        if i >= size:
+            continue
+        p = palette_index(ap, slot, wind_threshold, ltg_anim)
+        if pal[i] != p:
+            pal[i] = p
+            stamp[i] = nxt
+            n += 1
+    if n or system_state != state:
+        seq = nxt
+        state = system_state
+    return n
+
+
+def delta(since):
+    """Changes after since, packed into the shared buffer. Returns a memoryview."""
+    out = _out
+    pal = _pal
+    stamp = _stamp
+    o = HEADER
+    count = 0
+    if since > seq:
+        since = 0               # a seq from a previous boot
+    for i in range(len(pal)):
+        if stamp[i] > since or since == 0:
+            out[o] = i & 255
+            out[o + 1] = i >> 8
+            out[o + 2] = pal[i]
+            o += 3
+            count += 1
+    s = seq
+    out[0] = s & 255
+    out[1] = (s >> 8) & 255
+    out[2] = (s >> 16) & 255
+    out[3] = (s >> 24) & 255
+    out[4] = state
+    out[5] = 0
+    out[6] = count & 255
+    out[7] = count >> 8
+    return memoryview(out)[:o]
+
+
+def status():
+    return {"seq": seq, "leds": len(_pal), "boot": boot}
@@ -0,0 +1,343 @@
+# mqtt_pub.py — station-change events to a local MQTT broker, never blocking
+#
+# publish() runs once per refresh (from main.publish()). It diffs every
+# station's shown state — mirror.palette_index() without the trend bit:
+# category, wind blink / high winds, lightning — against what was last
+# published, and writes only the changed stations as one MQTT PUBLISH
+# (QoS 0) to TOPIC + "/changes":
+#   {"seq": 12, "full": 0, "t": <epoch>, "fields": ["cat", "wspd", "wgst", "ltg"],
+#    "stations": {"EGLL": ["IFR", 12, 25, 0], ...}}
+# "full": 1 carries every station: the first message after boot, and the
+# one after a queue overflow so subscribers can resynchronise. Stations
+# that do not fit in PACKET_MAX stay unpublished and go in the next one.
+#
+# Packets are built in place in a ring of QUEUE_SLOTS preallocated slots
+# (the offline queue); tick() — called from the main loop — drives a
+# non-blocking socket through connect / CONNACK / send / keepalive, one
+# step per call, with exponential backoff while the broker is away. The
+# only call that can wait is getaddrinfo(), which watchdog.resolve() makes
+# once (main.py does it before arming the watchdog): still, give BROKER as
+# an IP address (or a name the local resolver answers).
+
+import array, select, socket, time
+import log
+import mirror
+import timesvc
+import watchdog
+
+BROKER = None               # "192.168.1.10"; None = disabled
+PORT = 1883
+TOPIC = "metar-map"
+USER = None
+PASSWORD = None
+CLIENT_ID = None            # default: "metar-map-" + machine.unique_id()
+
+PACKET_MAX = 2560
+QUEUE_SLOTS = 4
+KEEPALIVE_S = 60
+CONNECT_TIMEOUT_S = 5
+BACKOFF_MIN_S = 2
+BACKOFF_MAX_S = 120
+
+S_DOWN, S_CONNECTING, S_WAIT_ACK, S_UP = 0, 1, 2, 3
+STATE_NAMES = ("down", "connecting", "wait_ack", "up")
+_UNSENT = 0xFF
+_STATE_MASK = 0xFF & ~mirror.FLAG_TREND
+_EAGAIN = (11, 115, 119)    # EAGAIN, EINPROGRESS, EALREADY
+
+_buf = bytearray(0)         # QUEUE_SLOTS x PACKET_MAX
+_start = array.array("H")   # packet start offset within its slot
+_end = array.array("H")     # packet end offset within its slot
+_head = 0                   # oldest queued slot
+_count = 0                  # queued packets
+_sent = 0                   # bytes of the head packet already sent
+_last = bytearray(0)        # published state per station (_UNSENT = never)
+_resync = True
+_connect_pkt = b""
+
+_sock = None
+_poll = None
+_state = S_DOWN
+_since = 0                  # ticks_ms the current state began
+_next_try = 0
+_backoff = BACKOFF_MIN_S
+_last_tx = 0
+_last_rx = 0
+
+seq = 0
+published = 0
+dropped = 0
+connects = 0
+failures = 0
+deferred = 0
+bytes_out = 0
+last_error = None
+
+
+def _str(s):
+    b = s.encode() if isinstance(s, str) else s
+    return bytes((len(b) >> 8, len(b) & 255)) + b
+
+
+def _varlen(n):
+    out = bytearray()
+    while True:
+        d = n & 127
+        n >>= 7
+        out.append(d | 128 if n else d)
+        if not n:
+            return out
+
+
+def init(stations):
+    """Allocate the queue and per-station state (heap.py startup phase)."""
+    global _buf, _start, _end, _last, _connect_pkt, CLIENT_ID
+    if not BROKER:
+        return False
+    _buf = bytearray(QUEUE_SLOTS * PACKET_MAX)
+    _start = array.array("H", [0] * QUEUE_SLOTS)
+    _end = array.array("H", [0] * QUEUE_SLOTS)
+    _last = bytearray([_UNSENT]) * stations
+    if CLIENT_ID is None:
+        try:
+            import machine
+            CLIENT_ID = "metar-map-" + "".join("%02x" % b for b in machine.unique_id())
+        except Exception:
+            CLIENT_ID = "metar-map"
+    flags = 0x02                        # clean session
+    body = _str("MQTT") + bytes((4, 0, KEEPALIVE_S >> 8, KEEPALIVE_S & 255)) + _str(CLIENT_ID)
+    if USER:
+        flags |= 0x80
+        body += _str(USER)
+        if PASSWORD:
+            flags |= 0x40
+            body += _str(PASSWORD)
+    body = body[:7] + bytes((flags,)) + body[8:]
+    _connect_pkt = b"\x10" + _varlen(len(body)) + body
+    log.info("MQTT: publishing to", BROKER, "topic", TOPIC)
+    return True
+
+
+# ---------- building ----------
+class _Writer:
+    """Appends text into _buf up to limit; put() returns False if it does not fit."""
+
+    def __init__(self, pos, limit):
+        self.pos = pos
+        self.limit = limit
+
+    def put(self, s):
+        b = s.encode()
+        end = self.pos + len(b)
+        if end > self.limit:
+            return False
+        _buf[self.pos:end] = b
+        self.pos = end
+        return True
+
+
+def publish(leds, wind_threshold, now=None):
+    """Queue one message with the stations whose shown state changed. Returns how many."""
+    global _head, _count, _resync, seq, dropped, deferred
+    if not BROKER or not _buf:
+        return 0
+    full = _resync
+    if _count == QUEUE_SLOTS:
+        dropped += 1
+        if _sent:
+            # the oldest is half on the wire: skip this one, send everything next time
+            _resync = True
+            return 0
+        # offline queue full: drop the oldest and send everything this time
+        _head = (_head + 1) % QUEUE_SLOTS
+        _count -= 1
+        full = True
+    if full:
+        # everything is pending again; what does not fit goes next time
+        for i in range(len(_last)):
+            _last[i] = _UNSENT
+        _resync = False
+    states = []
+    for i, ap in enumerate(leds):
+        if i >= len(_last):
+            break
+        st = mirror.palette_index(ap, i, wind_threshold) & _STATE_MASK
+        if st != _last[i]:
+            states.append((i, st))
+    if not states:
+        return 0
+    slot = (_head + _count) % QUEUE_SLOTS
+    base = slot * PACKET_MAX
+    topic = _str(TOPIC + "/changes")
+    # leave room for the fixed header (1 + up to 3 length bytes) and topic
+    body0 = base + 4 + len(topic)
+    w = _Writer(body0, base + PACKET_MAX - 2)     # 2 left for the closing "}}"
+    seq += 1
+    w.put('{"seq":%d,"full":%d,"t":%d,"fields":["cat","wspd","wgst","ltg"],"stations":{'
+          % (seq, 1 if full else 0, now if now is not None else timesvc.unix()))
+    n = 0
+    for i, st in states:
+        ap = leds[i]
+        entry = '%s"%s":["%s",%d,%d,%d]' % (
+            "," if n else "", ap["code"], ap.get("flightCategory") or "",
+            ap.get("windSpeed") or 0, ap.get("windGustSpeed") or 0,
+            1 if ap.get("lightning") else 0)
+        if not w.put(entry):
+            deferred += len(states) - n
+            break
+        _last[i] = st
+        n += 1
+    w.limit = base + PACKET_MAX
+    w.put("}}")
+    # fixed header written backwards in front of the topic
+    remaining = len(topic) + (w.pos - body0)
+    hdr = b"\x30" + _varlen(remaining)
+    t0 = body0 - len(topic)
+    _buf[t0:body0] = topic
+    s0 = t0 - len(hdr)
+    _buf[s0:t0] = hdr
+    _start[slot] = s0 - base
+    _end[slot] = w.pos - base
+    _count += 1
+    return n
+
+
+# ---------- connection ----------
+def _fail(why):
+    global _sock, _poll, _state, _next_try, _backoff, failures, last_error, _sent
+    failures += 1
+    last_error = str(why)
+    if _state == S_CONNECTING:
+        watchdog.unreachable(BROKER, PORT)  # the name may have moved (DNS_RETRY_S)
+    if _sock is not None:
+        try:
+            _sock.close()
+        except Exception:
+            pass
+    _sock = _poll = None
+    _state = S_DOWN
+    _sent = 0                           # resend the head packet whole
+    _next_try = time.ticks_add(time.ticks_ms(), _backoff * 1000)
+    log.warn("MQTT:", last_error, "- retry in %ds" % _backoff)
+    _backoff = min(_backoff * 2, BACKOFF_MAX_S)
+
+
+def _set(state):
+    global _state, _since
+    _state = state
+    _since = time.ticks_ms()
+
+
+def _send(data):
+    """Non-blocking send; returns bytes written (0 if the socket is full)."""
+    global bytes_out, _last_tx
+    try:
+        n = _sock.send(data)
+    except OSError as e:
+        if e.args and e.args[0] in _EAGAIN:
+            return 0
+        raise
+    bytes_out += n or 0
+    _last_tx = time.ticks_ms()
+    return n or 0
+
+
+def _recv():
+    """Non-blocking read; None if nothing is waiting, b"" if the broker closed."""
+    global _last_rx
+    try:
+        b = _sock.recv(64)
+    except OSError as e:
+        if e.args and e.args[0] in _EAGAIN:
+            return None
+        raise
+    _last_rx = time.ticks_ms()
+    return b
+
+
+def _connect():
+    global _sock, _poll, connects
+    ai = watchdog.resolve(BROKER, PORT)
+    _sock = socket.socket(ai[0], socket.SOCK_STREAM, ai[2])
+    _sock.setblocking(False)
+    try:
+        _sock.connect(ai[-1])
+    except OSError as e:
+        if not (e.args and e.args[0] in _EAGAIN):
+            raise
+    _poll = select.poll()
+    _poll.register(_sock, select.POLLOUT)
+    connects += 1
+    _set(S_CONNECTING)
+
+
+def tick():
+    """One non-blocking step of the connection; call every loop iteration."""
+    global _sent, _head, _count, _backoff, published
+    if not BROKER or not _buf:
+        return
+    now = time.ticks_ms()
+    try:
+        # each stage falls through to the next as soon as it completes
+        if _state == S_DOWN:
+            if time.ticks_diff(now, _next_try) < 0:
+                return
+            _connect()
+        if _state == S_CONNECTING:
+            ev = _poll.poll(0)
+            if not ev:
+                if time.ticks_diff(now, _since) > CONNECT_TIMEOUT_S * 1000:
+                    raise OSError("connect timeout")
+                return
+            if ev[0][1] & (select.POLLERR | select.POLLHUP):
+                raise OSError("connect refused")
+            if _send(_connect_pkt) != len(_connect_pkt):
+                raise OSError("short CONNECT write")
+            _set(S_WAIT_ACK)
+            return                      # the CONNACK needs a round trip
+        if _state == S_WAIT_ACK:
+            b = _recv()
+            if b is None:
+                if time.ticks_diff(now, _since) > CONNECT_TIMEOUT_S * 1000:
+                    raise OSError("no CONNACK")
+                return
+            if not b:
+                raise OSError("broker closed")
+            if len(b) < 4 or b[0] != 0x20 or b[3] != 0:
+                raise OSError("CONNACK refused %s" % (b[3] if len(b) > 3 else "?"))
+            _backoff = BACKOFF_MIN_S
+            _set(S_UP)
+            log.info("MQTT: connected to", BROKER)
+        # S_UP: drain whatever the broker sent (PINGRESP), then send
+        while True:
+            b = _recv()
+            if b is None:
+                break
+            if not b:
+                raise OSError("broker closed")
+        while _count:
+            s = _head * PACKET_MAX
+            mv = memoryview(_buf)[s + _start[_head] + _sent:s + _end[_head]]
+            n = _send(mv)
+            if not n:
+                return
+            _sent += n
+            if _sent < _end[_head] - _start[_head]:
+                return
+            _sent = 0
+            _head = (_head + 1) % QUEUE_SLOTS
+            _count -= 1
+            published += 1
+        if time.ticks_diff(now, _last_tx) > KEEPALIVE_S * 500:
+            _send(b"\xc0\x00")          # PINGREQ
+        if time.ticks_diff(now, _last_rx) > KEEPALIVE_S * 1500:
+            raise OSError("broker silent")
+    except OSError as e:
+        _fail(e)
+
+
+def status():
+    return {"broker": BROKER, "state": STATE_NAMES[_state], "seq": seq, "queued": _count,
+            "published": published, "dropped": dropped, "deferred": deferred,
+            "connects": connects, "failures": failures, "bytes": bytes_out,
+            "last_error": last_error}
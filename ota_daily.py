@@ -1,12 +1,17 @@
 # ota_daily.py  —  Simple once-per-day OTA updater for Pico W (MicroPython)
-import time, os, machine
-import urequests as requests
+import time, os, sys, json, machine, hashlib, binascii
+import upstream   # streamed GETs through the cached DNS address (watchdog.resolve)
+import timesvc
+import stats
+import log
+import watchdog
 
 # ---------- CONFIG ----------
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/hughgoodbody/supreme-guacamole-map/refs/heads/main/"
-FILES_TO_UPDATE = ["boot.py", "main.py", "functions.py", "data.py"]  # adjust as you like
+FILES_TO_UPDATE = ["boot.py", "main.py", "ota_daily.py", "functions.py", "data.py", "wifi_link.py", "timesvc.py", "stats.py", "webapp.py", "log.py", "argbled_lib.py", "argbled_multi.py", "dimmer.py", "suntable.py", "history.py", "taf.py", "mirror.py", "app_templates/index.html", "settings.py", "app_templates/settings.html", "portal.py", "ap_templates/setup.html", "ap_templates/setup.html.gz", "stationdb.py", "stations.bin", "effects.py", "watchdog.py", "power.py", "upstream.py", "heap.py", "mqtt_pub.py", "archive.py"]  # adjust as you like
 LOCAL_VERSION_FILE = "version.txt"          # stored on Pico
 REMOTE_VERSION_URL = GITHUB_RAW_BASE + "version.txt"
+MANIFEST_URL = GITHUB_RAW_BASE + "manifest.json"   # per-file sha256, host/make_manifest.py
 
 # When to check each day (24h)
 CHECK_HOUR   = 3         # 03:05 local time
@@ -14,36 +19,11 @@ CHECK_MINUTE = 5
 # Acceptable window in minutes (helps if your loop timing is irregular)
 WINDOW_MIN   = 7
 
-# If you want an offset from UTC (because Pico has no RTC battery),
-# set TZ offset in hours. e.g., UK winter = 0, summer (BST) = +1.
-TZ_OFFSET_HOURS = 0
-
-# NTP (optional but recommended). If you already sync time elsewhere, set to False.
-USE_NTP = True
+# Local time (GMT/BST) and clock sync are handled by timesvc.py
 
 # ---------- TIME HELPERS ----------
-def _sync_time_ntp():
-    if not USE_NTP:
-        return
-    try:
-        import ntptime
-        # ntptime sets RTC to UTC
-        for _ in range(3):
-            try:
-                ntptime.settime()
-                break
-            except:
-                time.sleep(1)
-    except:
-        pass
-
 def _localtime():
-    t = time.localtime()  # returns tuple in current RTC (UTC if not offset)
-    if TZ_OFFSET_HOURS:
-        # apply fixed offset
-        secs = time.mktime(t) + TZ_OFFSET_HOURS * 3600
-        t = time.localtime(secs)
-    return t
+    return timesvc.localtime()
 
 def _today_str():
     y, m, d, *_ = _localtime()
@@ -70,30 +50,27 @@ def _write_local_version(ver):
     except:
         pass
 
-def _fetch_remote_text(url):
-    r = None
+def _fetch_remote(url):
+    parts = []
     try:
-        r = requests.get(url)
-        if r.status_code == 200:
-            return r.text
+        status, _ = upstream.download(url, parts.append, 'ota')
+        if status == 200:
+            return b"".join(parts)
+        log.warn("OTA: HTTP", status, "for", url)
     except Exception as e:
-        print("OTA: fetch error:", e)
-    finally:
-        try: r.close()
-        except: pass
+        log.warn("OTA: fetch error:", e)
     return None
 
+def _fetch_remote_text(url):
+    body = _fetch_remote(url)
+    return body.decode() if body is not None else None
+
 def _fetch_remote_json(url):
-    r = None
+    body = _fetch_remote(url)
     try:
-        r = requests.get(url)
-        if r.status_code == 200:
-            return r.json()
-    except Exception as e:
-        print("OTA: fetch error:", e)
-    finally:
-        try: r.close()
-        except: pass
+        return json.loads(body) if body is not None else None
+    except ValueError as e:
+        log.warn("OTA: bad JSON:", e)
     return None
 
 # ---------- STATE (runs-once-per-day guard) ----------
@@ -114,63 +91,193 @@ def _set_last_run_date(s):
         pass
 
 # ---------- UPDATER ----------
-def _download_and_replace(fname):
+# An update is staged: every file is streamed into fname + ".new" first
+# (the watchdog fed per piece, so a trickling download cannot trip it) and
+# nothing is replaced unless all of them arrived. The list of staged files
+# and the version then go into _PENDING_FILE before the renames, so a
+# reset part-way through the renames is finished by finish_pending() on
+# the next boot instead of leaving old and new files mixed.
+#
+# With a manifest.json for the same version (host/make_manifest.py) only
+# the files whose sha256 differs from the copy on flash are downloaded,
+# and each download must hash to the manifest's value before it counts —
+# raw.githubusercontent.com caches per file, so a file can lag behind the
+# manifest for a few minutes. Without one, every file is fetched.
+_PENDING_FILE = ".ota_pending.txt"
+
+def _remove(fname):
+    try:
+        os.remove(fname)
+    except OSError:
+        pass
+
+def _sha256(fname):
+    """Hex sha256 of a file on flash, read in pieces; None if it is not there."""
+    h = hashlib.sha256()
+    try:
+        with open(fname, "rb") as f:
+            while True:
+                b = f.read(1024)
+                if not b:
+                    break
+                h.update(b)
+    except OSError:
+        return None
+    return binascii.hexlify(h.digest()).decode()
+
+def _manifest(remote_ver):
+    """{fname: sha256 hex} published for remote_ver, or None (fetch every file)."""
+    m = _fetch_remote_json(MANIFEST_URL)
+    if not isinstance(m, dict) or str(m.get("version", "")).strip() != remote_ver.strip():
+        log.info("OTA: no manifest for", remote_ver, "- fetching every file")
+        return None
+    return m.get("files") or None
+
+def _changed(hashes):
+    """FILES_TO_UPDATE entries that differ from hashes (all of them without one)."""
+    if hashes is None:
+        return list(FILES_TO_UPDATE)
+    out = []
+    for fname in FILES_TO_UPDATE:
+        want = hashes.get(fname)
+        if want is None or _sha256(fname) != want:
+            out.append(fname)
+        watchdog.feed('ota')
+    return out
+
+def _download(fname, want=None):
+    """Stream fname into fname + ".new". True if it arrived whole (and hashes to want)."""
     url = GITHUB_RAW_BASE + fname
-    print("OTA: downloading", fname)
-    r = None
+    log.info("OTA: downloading", fname)
+    tmpname = fname + ".new"
     try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            print("OTA: HTTP", r.status_code, "for", fname)
-            return False
-        # write atomically (tmp then rename) to avoid partial file if power drops
-        tmpname = fname + ".tmp"
-        with open(tmpname, "w") as f:
-            f.write(r.text)
-        try:
-            os.remove(fname)
-        except:
-            pass
-        os.rename(tmpname, fname)
-        print("OTA: wrote", fname)
-        return True
+        # bytes as served: sources, stations.bin and the .gz pages alike
+        with open(tmpname, "wb") as f:
+            status, _ = upstream.download(url, f.write, 'ota')
+        if status == 200:
+            if want is None or _sha256(tmpname) == want:
+                return True
+            log.warn("OTA:", fname, "does not match the manifest (stale cache?)")
+        else:
+            log.warn("OTA: HTTP", status, "for", fname)
     except Exception as e:
-        print("OTA: error writing", fname, e)
-        return False
+        log.warn("OTA: error downloading", fname, e)
     finally:
-        try: r.close()
-        except: pass
         time.sleep(0.2)
+    _remove(tmpname)
+    return False
+
+def _install(fname):
+    _remove(fname)
+    os.rename(fname + ".new", fname)
+    log.info("OTA: wrote", fname)
+
+def _download_and_replace(fname):
+    if not _download(fname):
+        return False
+    try:
+        _install(fname)
+        return True
+    except Exception as e:
+        log.warn("OTA: error writing", fname, e)
+        return False
+
+def finish_pending():
+    """Complete the renames of an update interrupted after staging. Returns how many."""
+    try:
+        with open(_PENDING_FILE) as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return 0
+    n = 0
+    for fname in lines[1:]:
+        if fname and _present(fname + ".new"):
+            _install(fname)
+            n += 1
+    _write_local_version(lines[0])
+    _remove(_PENDING_FILE)
+    log.info("OTA: finished update", lines[0], "-", n, "file(s)")
+    return n
 
 def _do_update():
     remote_ver = _fetch_remote_text(REMOTE_VERSION_URL)
     if not remote_ver:
-        print("OTA: could not read remote version")
+        log.warn("OTA: could not read remote version")
         return False
 
     local_ver = _read_local_version()
     if local_ver == remote_ver:
-        print("OTA: already latest version", local_ver)
+        log.info("OTA: already latest version", local_ver)
         return False
 
-    print("OTA: new version available:", remote_ver, "(local:", local_ver or "none", ")")
-    ok_all = True
-    for fname in FILES_TO_UPDATE:
-        if not _download_and_replace(fname):
-            ok_all = False
-    if ok_all:
-        _write_local_version(remote_ver)
-        print("OTA: update complete → rebooting")
-        time.sleep(1)
-        machine.reset()
-    else:
-        print("OTA: update incomplete (kept old version)")
-    return ok_all
+    log.info("OTA: new version available:", remote_ver, "(local:", local_ver or "none", ")")
+    hashes = _manifest(remote_ver)
+    todo = _changed(hashes)
+    log.info("OTA:", len(todo), "of", len(FILES_TO_UPDATE), "file(s) changed")
+    staged = []
+    for fname in todo:
+        watchdog.feed('ota')
+        if not _download(fname, hashes and hashes.get(fname)):
+            break
+        staged.append(fname)
+    if len(staged) < len(todo):
+        for fname in staged:
+            _remove(fname + ".new")
+        log.warn("OTA: update incomplete (kept old version)")
+        return False
+    with open(_PENDING_FILE, "w") as f:
+        f.write("\n".join([remote_ver.strip()] + staged))
+    finish_pending()
+    if not staged:
+        return False                    # same files, new version number: nothing to restart
+    log.info("OTA: update complete → rebooting")
+    time.sleep(1)
+    machine.reset()
+    return True
 
 # ---------- PUBLIC API ----------
 def ota_init_time():
-    """Call once after Wi-Fi is up, to ensure the clock is sane."""
-    _sync_time_ntp()
+    """Kept for compatibility: force one NTP attempt via timesvc."""
+    timesvc.ntp_tick()
+
+def _present(fname):
+    """On flash, or (modules) anywhere on sys.path."""
+    dirs = [""]
+    if fname.endswith(".py"):
+        dirs += [d for d in sys.path if d and d != "."]
+    for d in dirs:
+        try:
+            os.stat(d + "/" + fname if d else fname)
+            return True
+        except OSError:
+            pass
+    return False
+
+def fetch_missing():
+    """
+    Download every FILES_TO_UPDATE entry that is not on the device. An
+    update runs with the list of the updater that started it, so files new
+    in that release only arrive here, on the next boot (boot.py).
+    Finishes an interrupted update first (finish_pending()). Returns how
+    many files were fetched or installed.
+    """
+    n = finish_pending()
+    for fname in FILES_TO_UPDATE:
+        if _present(fname):
+            continue
+        if _download_and_replace(fname):
+            n += 1
+        watchdog.feed('ota')
+    return n
+
+def window_open(ahead_min=0):
+    """True if today's check is still to come within ahead_min minutes (or is open now)."""
+    if not timesvc.synced or _get_last_run_date() == _today_str():
+        return False
+    y,m,d, hh, mm, *_ = _localtime()
+    target = CHECK_HOUR * 60 + CHECK_MINUTE
+    now    = hh * 60 + mm
+    return target - WINDOW_MIN - ahead_min <= now <= target + WINDOW_MIN
 
 def ota_tick():
     """
@@ -179,6 +286,10 @@ def ota_tick():
       - run at most once per calendar day,
       - only within the configured HH:MM ± WINDOW_MIN window.
     """
+    # never trust the window before the clock has been set
+    if not timesvc.synced:
+        return
+
     today = _today_str()
 
     # if already ran today, skip
@@ -189,7 +300,9 @@ def ota_tick():
     if not _in_window():
         return
 
-    print("OTA: daily window open — checking…")
+    log.info("OTA: daily window open — checking…")
     # mark the day first so we don't keep hammering within the window
     _set_last_run_date(today)
+    t0 = stats.start()
     _do_update()
+    stats.stop('ota', t0)
@@ -0,0 +1,148 @@
+# portal.py — captive Wi-Fi setup portal (AP mode), started by boot.setup_mode()
+#
+# Everything a request can hit is prepared before the AP comes up:
+#   /               ap_templates/setup.html(.gz), streamed from flash by phew
+#                   in 1 KB chunks; the .gz (host/make_portal.py) is sent
+#                   as-is with Content-Encoding: gzip when present
+#   /networks.json  SSID list as cached JSON bytes; the page fetches it
+#   probe URLs      one prebuilt 302 to the setup page (also the catch-all)
+# The Wi-Fi scan runs in its own uasyncio task, never in a handler: once at
+# start, then every SCAN_INTERVAL_S while a client has asked for the list
+# in the last DEMAND_S, so an idle portal does not keep the radio busy.
+
+import json, time
+import network
+import log
+
+PAGE = "ap_templates/setup.html"
+REDIRECT_PAGE = "ap_templates/redirect.html"
+SCAN_INTERVAL_S = 30
+DEMAND_S = 90
+PROBES = ("/generate_204", "/gen_204", "/hotspot-detect.html", "/library/test/success.html",
+          "/connecttest.txt", "/ncsi.txt", "/redirect", "/canonical.html", "/success.txt")
+
+scans = 0
+probes = 0
+_nets = b"[]"               # cached /networks.json body
+_scanned_at = None          # ticks_ms of the last scan
+_wanted_at = None           # ticks_ms of the last /networks.json request
+_page = None                # (file, headers) for /
+_nets_headers = None
+_redirect = None            # prebuilt probe / catch-all response
+
+
+def scan(wlan=None):
+    """Scan once and rebuild the cached JSON: [[ssid, rssi, secured], ...] strongest first."""
+    global _nets, _scanned_at, scans
+    wlan = wlan or network.WLAN(network.STA_IF)
+    best = {}
+    try:
+        found = wlan.scan()
+    except Exception as e:
+        log.warn("portal: scan failed:", e)
+        found = ()
+    for n in found:
+        try:
+            name = n[0].decode("utf-8").strip()
+        except:
+            name = ""
+        if name and (name not in best or n[3] > best[name][1]):
+            best[name] = (name, n[3], 1 if n[4] else 0)
+    nets = sorted(best.values(), key=lambda r: -r[1])
+    _nets = json.dumps([list(r) for r in nets]).encode()
+    _scanned_at = time.ticks_ms()
+    scans += 1
+    return [r[0] for r in nets]
+
+
+async def _feeder():
+    # main.py may have armed the watchdog before falling back to setup mode
+    import uasyncio, watchdog
+    while True:
+        watchdog.feed('portal')
+        await uasyncio.sleep_ms(1000)
+
+
+async def _scanner(wlan):
+    import uasyncio
+    while True:
+        await uasyncio.sleep_ms(1000)
+        now = time.ticks_ms()
+        if _wanted_at is None or time.ticks_diff(now, _wanted_at) > DEMAND_S * 1000:
+            continue
+        if time.ticks_diff(now, _scanned_at) >= SCAN_INTERVAL_S * 1000:
+            scan(wlan)
+
+
+def _exists(path):
+    import os
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def prepare(domain):
+    """Build the cached responses. Call before the AP starts."""
+    global _page, _nets_headers, _redirect
+    from phew import server
+    headers = {"Content-Type": "text/html", "Cache-Control": "max-age=300"}
+    if _exists(PAGE + ".gz"):
+        headers["Content-Encoding"] = "gzip"
+        _page = (PAGE + ".gz", headers)
+    else:
+        _page = (PAGE, headers)
+    _nets_headers = {"Content-Type": "application/json", "Cache-Control": "no-store"}
+    url = "http://%s/" % domain
+    try:
+        with open(REDIRECT_PAGE) as f:
+            body = f.read().replace("{{domain}}", domain).encode()
+    except OSError:
+        body = b""
+    _redirect = server.Response(body, 302, {
+        "Location": url, "Content-Type": "text/html",
+        "Content-Length": len(body), "Cache-Control": "no-store",
+    })
+
+
+def _index(request):
+    from phew import server
+    f, headers = _page
+    # FileResponse fills in Content-Length (and Content-Type from the
+    # extension, which .gz lacks — hence the copy of our headers)
+    return server.FileResponse(f, headers=dict(headers))
+
+
+def _networks(request):
+    global _wanted_at
+    from phew import server
+    _wanted_at = time.ticks_ms()
+    h = dict(_nets_headers)
+    h["Content-Length"] = len(_nets)
+    return server.Response(_nets, 200, h)
+
+
+def _probe(request):
+    global probes
+    probes += 1
+    return _redirect
+
+
+def start(configure, domain):
+    """Register the portal routes; configure(request) handles /configure."""
+    import uasyncio
+    from phew import server
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(True)
+    log.info("portal: found networks:", scan(wlan))
+    prepare(domain)
+    server.add_route("/", _index)
+    server.add_route("/networks.json", _networks)
+    server.add_route("/configure", configure, methods=["GET", "POST"])
+    for path in PROBES:
+        server.add_route(path, _probe)
+    server.set_callback(_probe)
+    loop = uasyncio.get_event_loop()
+    loop.create_task(_scanner(wlan))
+    loop.create_task(_feeder())
@@ -0,0 +1,169 @@
+# power.py — radio and CPU power management between scheduled fetches
+#
+# Modes (POWER_MODE in main.py, power_mode on /settings):
+#   MODE_ON     radio in the CYW43 default (performance) mode, CPU always
+#               running — the original behaviour
+#   MODE_SAVE   radio in PM_POWERSAVE between fetches; the web UI still
+#               answers, just with a little more latency
+#   MODE_OFF    radio switched off between fetches and the CPU lightsleeps
+#               between frames; no web UI / mirror while parked
+#   MODE_NIGHT  MODE_OFF while dimmer.py says night, MODE_SAVE by day
+# main.py calls radio_idle() after a fetch cycle and radio_wake()
+# WAKE_LEAD_S before the next one; wake rejoins the cached BSSID on the
+# last lease while it is fresh (wifi_link.resume()) without blocking, so
+# the link is normally up again by the time the fetch is due.
+#
+# pause() replaces webapp.serve_for() in the waits and accounts every
+# millisecond to the radio state, CPU run/sleep and the LED estimate, so
+# /status shows an estimated current draw (mA, i.e. mAh per hour) for
+# sizing battery packs. The figures in CPU_*_MA / RADIO_MA are typical
+# Pico W numbers at 5 V, not measurements — adjust for your board.
+#
+# The CPU clock is left alone: the LED state machines derive their bit
+# timing from the system clock when they are created.
+
+import time
+import log
+import wifi_link
+
+MODE_ON, MODE_SAVE, MODE_OFF, MODE_NIGHT = 0, 1, 2, 3
+R_ON, R_SAVE, R_OFF = 0, 1, 2
+RADIO_NAMES = ("on", "save", "off")
+
+WAKE_LEAD_S = 10            # rejoin this long before a fetch is due
+LIGHTSLEEP = True           # MODE_OFF: lightsleep between frames
+
+CPU_RUN_MA = 22             # RP2040 at 125 MHz, board regulator included
+CPU_SLEEP_MA = 2            # in machine.lightsleep()
+RADIO_MA = (30, 10, 0)      # CYW43 on top of the CPU: performance, powersave, off
+SUPPLY_V = 5.0
+
+mode = MODE_ON
+led_ma = None               # callable returning the LED estimate (pixels.frame_ma)
+
+_radio = R_ON
+_t_last = time.ticks_ms()
+_ms = [0, 0, 0]             # time per radio state
+_sleep_ms = 0
+_cpu_mams = 0.0             # mA·ms per component
+_radio_mams = 0.0
+_led_mams = 0.0
+parks = 0
+wakes = 0
+
+
+def configure(m=None, leds=None):
+    global mode, led_ma
+    if m is not None:
+        mode = m
+    if leds is not None:
+        led_ma = leds
+
+
+def _target():
+    """Radio state to use between fetches in the current mode."""
+    m = mode
+    if m == MODE_NIGHT:
+        import dimmer
+        m = MODE_OFF if dimmer.phase == "night" else MODE_SAVE
+    if m == MODE_OFF:
+        return R_OFF
+    if m == MODE_SAVE:
+        return R_SAVE
+    return R_ON
+
+
+def _pm(wlan, name):
+    import network
+    pm = getattr(network.WLAN, name, None)
+    if pm is None:
+        return False
+    try:
+        wlan.config(pm=pm)
+        return True
+    except Exception as e:
+        log.warn("Power: pm config failed:", e)
+        return False
+
+
+def radio_up():
+    return _radio != R_OFF
+
+
+def radio_idle(wlan, hold=False):
+    """Drop the radio to the mode's idle state. hold=True keeps it fully on."""
+    global _radio, parks
+    want = R_ON if hold else _target()
+    if want == _radio:
+        return
+    if want == R_OFF:
+        wifi_link.park()
+        parks += 1
+    elif want == R_SAVE:
+        if not _pm(wlan, "PM_POWERSAVE"):
+            return
+    _radio = want
+    log.debug("Power: radio", RADIO_NAMES[want])
+
+
+def radio_wake(wlan):
+    """Back to full radio before a fetch. Never blocks on association."""
+    global _radio, wakes
+    if _radio == R_ON:
+        return
+    if _radio == R_OFF:
+        wifi_link.resume()
+        wakes += 1
+    else:
+        _pm(wlan, "PM_PERFORMANCE")
+    _radio = R_ON
+    log.debug("Power: radio on")
+
+
+def _account(ms, asleep):
+    global _sleep_ms, _cpu_mams, _radio_mams, _led_mams
+    if ms <= 0:
+        return
+    _ms[_radio] += ms
+    if asleep:
+        _sleep_ms += ms
+    _cpu_mams += ms * (CPU_SLEEP_MA if asleep else CPU_RUN_MA)
+    _radio_mams += ms * RADIO_MA[_radio]
+    if led_ma is not None:
+        try:
+            _led_mams += ms * (led_ma() or 0)
+        except Exception:
+            pass
+
+
+def pause(ms, serve):
+    """Wait ms: serve(ms) while the radio is up, lightsleep while it is off."""
+    global _t_last
+    t0 = time.ticks_ms()
+    _account(time.ticks_diff(t0, _t_last), False)   # work since the last pause
+    asleep = _radio == R_OFF and LIGHTSLEEP and ms > 2
+    if asleep:
+        import machine
+        time.sleep_ms(1)            # let the LED FIFO drain before the clocks stop
+        machine.lightsleep(ms - 1)
+    else:
+        serve(ms)
+    _t_last = time.ticks_ms()
+    _account(time.ticks_diff(_t_last, t0), asleep)
+
+
+def status():
+    total = _ms[0] + _ms[1] + _ms[2]
+    out = {"mode": mode, "radio": RADIO_NAMES[_radio], "parks": parks, "wakes": wakes,
+           "wake_ms": wifi_link.last_resume_ms, "hours": round(total / 3600000, 3)}
+    if total:
+        out["radio_pct"] = [round(100 * t / total, 1) for t in _ms]
+        out["sleep_pct"] = round(100 * _sleep_ms / total, 1)
+        # average current in mA is also mAh per hour of running
+        out["cpu_ma"] = round(_cpu_mams / total, 1)
+        out["radio_ma"] = round(_radio_mams / total, 1)
+        out["led_ma"] = round(_led_mams / total, 1)
+        ma = (_cpu_mams + _radio_mams + _led_mams) / total
+        out["mah_per_h"] = round(ma, 1)
+        out["mwh_per_h"] = round(ma * SUPPLY_V, 0)
+    return out
@@ -0,0 +1,195 @@
+# settings.py — runtime settings: validated, persisted, applied without a reboot
+#
+# main.py hands load() its constants as defaults; settings.json (written
+# by the /settings page) overrides them. update() validates a change set,
+# saves it and calls the applier of each affected group once — appliers
+# (registered by main.py in `appliers`) rebuild only the precomputed state
+# that group feeds (dimmer step tables, colour palette, blink thresholds),
+# so a change shows on the next frame instead of after an OTA or reboot.
+#
+# Handlers run inside webapp.serve_for(), between frames, so appliers never
+# race the render loop.
+
+import json, os
+import log
+
+FILE = "settings.json"
+
+# key, kind, min, max, group. kinds: int, float, bool, color ("#rrggbb")
+SCHEMA = (
+    ("brightness",          "int",   1, 255, "dimmer"),
+    ("dim_brightness",      "float", 0, 255, "dimmer"),   # <= 1 is a fraction of brightness
+    ("dimming_active",      "bool",  0, 1,   "dimmer"),
+    ("use_sun_times",       "bool",  0, 1,   "dimmer"),
+    ("bright_start_hour",   "int",   0, 23,  "dimmer"),
+    ("dim_start_hour",      "int",   0, 23,  "dimmer"),
+    ("wind_threshold",      "int",   0, 99,  "wind"),
+    ("high_wind_threshold", "int",  -1, 199, "wind"),     # -1 = off
+    ("gusts_always",        "bool",  0, 1,   "wind"),
+    ("wind_anim",           "bool",  0, 1,   "wind"),
+    ("ltg_anim",            "bool",  0, 1,   "wind"),
+    ("trend_anim",          "bool",  0, 1,   "anim"),
+    ("blink_speed",         "float", 0.05, 5, "anim"),
+    ("geo_effects",         "bool",  0, 1,   "anim"),
+    ("color_vfr",           "color", 0, 0,   "palette"),
+    ("color_mvfr",          "color", 0, 0,   "palette"),
+    ("color_ifr",           "color", 0, 0,   "palette"),
+    ("color_lifr",          "color", 0, 0,   "palette"),
+    ("color_lightning",     "color", 0, 0,   "palette"),
+    ("color_high_winds",    "color", 0, 0,   "palette"),
+    ("power_mode",          "int",   0, 3,   "power"),    # power.MODE_*
+)
+
+values = {}
+appliers = {}               # group -> callable(values)
+saved = 0
+applied = 0
+_spec = {}
+
+
+def _index():
+    if not _spec:
+        for row in SCHEMA:
+            _spec[row[0]] = row
+    return _spec
+
+
+def to_color(v):
+    """(r, g, b) from "#rrggbb" or a 3-item list."""
+    if isinstance(v, str):
+        v = v.strip().lstrip("#")
+        if len(v) != 6:
+            raise ValueError("want #rrggbb")
+        return (int(v[0:2], 16), int(v[2:4], 16), int(v[4:6], 16))
+    r, g, b = v
+    c = (int(r), int(g), int(b))
+    for x in c:
+        if x < 0 or x > 255:
+            raise ValueError("channel out of range")
+    return c
+
+
+def hex_color(c):
+    return "#%02x%02x%02x" % tuple(c)
+
+
+def _coerce(row, v):
+    _, kind, lo, hi, _ = row
+    if kind == "color":
+        return to_color(v)
+    if kind == "bool":
+        if isinstance(v, str):
+            v = v.lower()
+            if v in ("1", "true", "on", "yes"):
+                return True
+            if v in ("0", "false", "off", "no", ""):
+                return False
+            raise ValueError("want true/false")
+        return bool(v)
+    v = int(v) if kind == "int" else float(v)
+    if v < lo or v > hi:
+        raise ValueError("want %s..%s" % (lo, hi))
+    return v
+
+
+def validate(changes):
+    """(clean, errors): coerced values for known keys, {key: message} for the rest."""
+    spec = _index()
+    clean = {}
+    errors = {}
+    for k, v in changes.items():
+        row = spec.get(k)
+        if row is None:
+            errors[k] = "unknown setting"
+            continue
+        try:
+            clean[k] = _coerce(row, v)
+        except Exception as e:
+            errors[k] = str(e) or "invalid"
+    return clean, errors
+
+
+def load(defaults):
+    """Start from defaults, overlay settings.json. Bad entries are logged and skipped."""
+    global values
+    values = dict(defaults)
+    try:
+        with open(FILE) as f:
+            stored = json.load(f)
+    except OSError:
+        stored = {}
+    except ValueError as e:
+        log.warn("Settings: bad", FILE, e)
+        stored = {}
+    clean, errors = validate(stored)
+    for k, msg in errors.items():
+        log.warn("Settings: ignoring", k, msg)
+    values.update(clean)
+    return values
+
+
+def save():
+    """Write the current values (tmp then rename, like ota_daily)."""
+    global saved
+    out = {}
+    for row in SCHEMA:
+        k = row[0]
+        if k in values:
+            out[k] = hex_color(values[k]) if row[1] == "color" else values[k]
+    tmp = FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(out, f)
+    try:
+        os.remove(FILE)
+    except OSError:
+        pass
+    os.rename(tmp, FILE)
+    saved += 1
+
+
+def update(changes, persist=True):
+    """Validate, store, persist and apply. Returns (changed keys, errors)."""
+    global applied
+    clean, errors = validate(changes)
+    if errors:
+        return [], errors
+    spec = _index()
+    changed = [k for k, v in clean.items() if values.get(k) != v]
+    if not changed:
+        return [], {}
+    values.update(clean)
+    if persist:
+        try:
+            save()
+        except Exception as e:
+            log.warn("Settings: save failed:", e)
+    groups = []
+    for k in changed:
+        g = spec[k][4]
+        if g not in groups:
+            groups.append(g)
+    for g in groups:
+        fn = appliers.get(g)
+        if fn is None:
+            continue
+        try:
+            fn(values)
+        except Exception as e:
+            log.exception(e, "Settings: applying " + g)
+    applied += 1
+    log.info("Settings: changed", ",".join(changed))
+    return changed, {}
+
+
+def export():
+    """Values and schema for the /settings page (colours as #rrggbb)."""
+    out = {}
+    for row in SCHEMA:
+        k = row[0]
+        if k in values:
+            out[k] = hex_color(values[k]) if row[1] == "color" else values[k]
+    return {"values": out, "schema": [list(r) for r in SCHEMA]}
+
+
+def status():
+    return {"saved": saved, "applied": applied, "keys": len(values)}
@@ -0,0 +1,135 @@
+# stationdb.py — compiled station table (stations.bin, built by host/make_stationdb.py)
+#
+# load() reads the header and the fixed 16-byte records (~1.5 KB for the
+# UK map) and builds data.leds, the per-station dicts the parse / render
+# code updates in place. Airport names stay on flash: name(i) seeks to
+# the names section and reads just that one, for the web UI. Record layout
+# is documented in host/make_stationdb.py.
+
+import array, struct
+
+PATH = "stations.bin"
+MAGIC = b"STN2"
+HEADER = 16
+RECORD = 16
+NO_COORD = -32768           # lat / lon not known
+NEIGHBOURS = 8              # nearest stations kept per station
+BUCKET_KM = 25              # neighbour distance unit
+NONE = 0xffff              # no neighbour (pads a short list)
+_FMT = "<H4shhHBBH"
+
+path = None
+_recs = None                # header + profiles + records (names excluded)
+_rec0 = 0                   # offset of the first record in _recs
+_names = 0                  # offset of the names section in the file
+_slots = None               # table slot of each loaded station (profile filter)
+neighbours = array.array("H")   # k loaded indices per station, nearest first
+buckets = bytearray(0)      # distance // bucket_km, parallel to neighbours
+k = 0                       # neighbours per station
+bucket_km = BUCKET_KM
+
+
+def new_station(led, code):
+    """The runtime dict parse_chunk / render_weather_frame work on."""
+    return {"led": led, "code": code, "raw": None, "windSpeed": None, "windGust": None,
+            "windGustSpeed": None, "lightning": None, "flightCategory": None}
+
+
+def load(file=PATH, profile=None):
+    """List of station dicts from file; profile (a MAPTYPE) drops other maps' LEDs."""
+    global path, _recs, _rec0, _names, _slots
+    with open(file, "rb") as f:
+        hdr = f.read(HEADER)
+        magic, count, size, nprof, names_off, nbr_off = struct.unpack("<4sHBBII", hdr)
+        if magic != MAGIC or size != RECORD:
+            raise ValueError("not a station db: " + file)
+        _recs = hdr + f.read(names_off - HEADER)
+    path = file
+    _names = names_off
+    _rec0 = HEADER + 8 * nprof
+    bit = 0xff
+    for p in range(nprof):
+        o = HEADER + 8 * p
+        if profile and bytes(_recs[o:o + 8]).rstrip(b"\0").decode() == profile:
+            bit = 1 << p
+    leds = []
+    _slots = []
+    for s in range(count):
+        led, code, _, _, _, _, mask, _ = struct.unpack_from(_FMT, _recs, _rec0 + s * RECORD)
+        if mask & bit:
+            leds.append(new_station(led, code.decode()))
+            _slots.append(s)
+    _load_neighbours(nbr_off, count)
+    return leds
+
+
+def _load_neighbours(off, count):
+    # table slots -> loaded indices; neighbours on other maps are dropped
+    global neighbours, buckets, k, bucket_km
+    if not off:
+        neighbours = array.array("H")
+        buckets = bytearray(0)
+        k = 0
+        return
+    k, bucket_km = _recs[off], _recs[off + 1]
+    index = array.array("H", [NONE] * count)
+    for i, slot in enumerate(_slots):
+        index[slot] = i
+    nb = array.array("H", [NONE] * (len(_slots) * k))
+    bk = bytearray(len(_slots) * k)
+    for i, slot in enumerate(_slots):
+        src = off + 2 + slot * k * 3
+        dst = i * k
+        for n in range(k):
+            p = src + 3 * n
+            j = _recs[p] | _recs[p + 1] << 8
+            if j != NONE and index[j] != NONE:
+                nb[dst] = index[j]
+                bk[dst] = _recs[p + 2]
+                dst += 1
+    neighbours = nb
+    buckets = bk
+
+
+def near(i):
+    """[(index, bucket), ...] nearest first for loaded station i."""
+    out = []
+    o = i * k
+    for n in range(k):
+        j = neighbours[o + n]
+        if j == NONE:
+            break
+        out.append((j, buckets[o + n]))
+    return out
+
+
+def _rec(i):
+    return struct.unpack_from(_FMT, _recs, _rec0 + _slots[i] * RECORD)
+
+
+def coords(i):
+    """(lat, lon) in degrees of loaded station i, or None if not in the table."""
+    r = _rec(i)
+    if r[2] == NO_COORD or r[3] == NO_COORD:
+        return None
+    return r[2] / 100, r[3] / 100
+
+
+def name(i):
+    """Airport name of loaded station i, read from flash (None if unavailable)."""
+    if _recs is None or i >= len(_slots):
+        return None
+    r = _rec(i)
+    if not r[5]:
+        return None
+    try:
+        with open(path, "rb") as f:
+            f.seek(_names + r[4])
+            return f.read(r[5]).decode()
+    except OSError:
+        return None
+
+
+def status():
+    return {"path": path, "stations": len(_slots) if _slots else 0,
+            "bytes": len(_recs) if _recs else 0}
@@ -0,0 +1,91 @@
+# stats.py — lightweight on-device hot-path instrumentation (MicroPython)
+# - ticks_us timers (count / total / max / last) per named stage
+# - plain counters
+# - gc.mem_free() low-watermark and explicit GC count
+# - snapshot() → dict, served as JSON by webapp.py at /status
+#
+# Usage:
+#   t0 = stats.start()
+#   ...work...
+#   stats.stop('parse', t0)
+
+import time, gc
+
+ENABLED = True
+
+_timers = {}      # name -> [count, total_us, max_us, last_us]
+_counters = {}    # name -> int
+providers = {}    # name -> callable returning a dict, merged into snapshot()
+
+mem_low = None    # lowest gc.mem_free() seen
+gc_count = 0      # explicit collections via stats.collect()
+alloc_mark = 0    # gc.mem_alloc() right after the last explicit collection
+_boot_ms = time.ticks_ms()
+
+def start():
+    return time.ticks_us()
+
+def stop(name, t0):
+    """Record elapsed microseconds since t0 under name. Returns elapsed."""
+    dt = time.ticks_diff(time.ticks_us(), t0)
+    if not ENABLED:
+        return dt
+    s = _timers.get(name)
+    if s is None:
+        s = _timers[name] = [0, 0, 0, 0]
+    s[0] += 1
+    s[1] += dt
+    if dt > s[2]:
+        s[2] = dt
+    s[3] = dt
+    return dt
+
+def count(name, n=1):
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+def mem():
+    """Sample free heap and update the low-watermark. Returns free bytes."""
+    global mem_low
+    free = gc.mem_free()
+    if mem_low is None or free < mem_low:
+        mem_low = free
+    return free
+
+def collect():
+    """gc.collect() that is counted and samples the heap just before."""
+    global gc_count, alloc_mark
+    mem()
+    gc.collect()
+    gc_count += 1
+    alloc_mark = gc.mem_alloc()
+
+def reset():
+    global mem_low, gc_count
+    _timers.clear()
+    _counters.clear()
+    mem_low = None
+    gc_count = 0
+
+def snapshot():
+    timers = {}
+    for name, s in _timers.items():
+        timers[name] = {
+            "n": s[0], "total_us": s[1], "max_us": s[2], "last_us": s[3],
+            "avg_us": s[1] // s[0] if s[0] else 0,
+        }
+    out = {
+        "uptime_s": time.ticks_diff(time.ticks_ms(), _boot_ms) // 1000,
+        "mem_free": mem(),
+        "mem_alloc": gc.mem_alloc(),
+        "mem_low": mem_low,
+        "gc_count": gc_count,
+        "timers": timers,
+        "counters": dict(_counters),
+    }
+    for name, fn in providers.items():
+        try:
+            out[name] = fn()
+        except Exception as e:
+            out[name] = {"error": str(e)}
+    return out
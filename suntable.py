@@ -0,0 +1,56 @@
+# suntable.py — generated by host/make_suntable.py, do not edit
+# Sunrise / sunset for every day of the year, minutes after 00:00 UTC.
+# Entry for day-of-year d (1..366) is TABLE[(d-1)*4 : d*4] =
+# rise_hi, rise_lo, set_hi, set_lo.
+
+LAT = 54.0
+LON = -2.5
+
+TABLE = (
+    b'\x01\xfd\x03\xbd\x01\xfd\x03\xbe\x01\xfc\x03\xbf\x01\xfc\x03\xc0\x01\xfc\x03\xc2\x01\xfb\x03\xc3\x01\xfb\x03\xc4\x01\xfa\x03\xc5'
+    b'\x01\xfa\x03\xc7\x01\xf9\x03\xc8\x01\xf8\x03\xca\x01\xf8\x03\xcb\x01\xf7\x03\xcd\x01\xf6\x03\xce\x01\xf5\x03\xd0\x01\xf4\x03\xd2'
+    b'\x01\xf3\x03\xd3\x01\xf2\x03\xd5\x01\xf1\x03\xd7\x01\xf0\x03\xd9\x01\xef\x03\xdb\x01\xed\x03\xdc\x01\xec\x03\xde\x01\xeb\x03\xe0'
+    b'\x01\xe9\x03\xe2\x01\xe8\x03\xe4\x01\xe6\x03\xe6\x01\xe5\x03\xe8\x01\xe3\x03\xea\x01\xe2\x03\xec\x01\xe0\x03\xee\x01\xdf\x03\xf0'
+    b'\x01\xdd\x03\xf2\x01\xdb\x03\xf4\x01\xd9\x03\xf6\x01\xd8\x03\xf8\x01\xd6\x03\xfa\x01\xd4\x03\xfc\x01\xd2\x03\xfe\x01\xd0\x04\x00'
+    b'\x01\xce\x04\x02\x01\xcc\x04\x04\x01\xca\x04\x06\x01\xc8\x04\x08\x01\xc6\x04\n\x01\xc4\x04\x0c\x01\xc2\x04\x0e\x01\xc0\x04\x10'
+    b'\x01\xbe\x04\x12\x01\xbc\x04\x14\x01\xba\x04\x16\x01\xb7\x04\x18\x01\xb5\x04\x1b\x01\xb3\x04\x1d\x01\xb1\x04\x1f\x01\xaf\x04!'
+    b'\x01\xac\x04#\x01\xaa\x04%\x01\xa8\x04&\x01\xa5\x04(\x01\xa3\x04*\x01\xa1\x04,\x01\x9e\x04.\x01\x9c\x040'
+    b'\x01\x9a\x042\x01\x97\x044\x01\x95\x046\x01\x92\x048\x01\x90\x04:\x01\x8e\x04<\x01\x8b\x04>\x01\x89\x04@'
+    b'\x01\x86\x04B\x01\x84\x04D\x01\x81\x04E\x01\x7f\x04G\x01}\x04I\x01z\x04K\x01x\x04M\x01u\x04O'
+    b'\x01s\x04Q\x01p\x04R\x01n\x04T\x01k\x04V\x01i\x04X\x01f\x04Z\x01d\x04\\\x01a\x04^'
+    b'\x01_\x04_\x01\\\x04a\x01Z\x04c\x01W\x04e\x01U\x04g\x01R\x04i\x01P\x04j\x01N\x04l'
+    b'\x01K\x04n\x01I\x04p\x01F\x04r\x01D\x04t\x01A\x04u\x01?\x04w\x01=\x04y\x01:\x04{'
+    b'\x018\x04}\x015\x04\x7f\x013\x04\x80\x011\x04\x82\x01.\x04\x84\x01,\x04\x86\x01*\x04\x88\x01(\x04\x8a'
+    b'\x01%\x04\x8c\x01#\x04\x8d\x01!\x04\x8f\x01\x1f\x04\x91\x01\x1c\x04\x93\x01\x1a\x04\x95\x01\x18\x04\x97\x01\x16\x04\x98'
+    b'\x01\x14\x04\x9a\x01\x12\x04\x9c\x01\x10\x04\x9e\x01\x0e\x04\xa0\x01\x0c\x04\xa1\x01\n\x04\xa3\x01\x08\x04\xa5\x01\x06\x04\xa7'
+    b'\x01\x04\x04\xa9\x01\x02\x04\xaa\x01\x00\x04\xac\x00\xfe\x04\xae\x00\xfc\x04\xb0\x00\xfb\x04\xb1\x00\xf9\x04\xb3\x00\xf7\x04\xb5'
+    b'\x00\xf6\x04\xb7\x00\xf4\x04\xb8\x00\xf2\x04\xba\x00\xf1\x04\xbb\x00\xef\x04\xbd\x00\xee\x04\xbf\x00\xec\x04\xc0\x00\xeb\x04\xc2'
+    b'\x00\xea\x04\xc3\x00\xe8\x04\xc5\x00\xe7\x04\xc6\x00\xe6\x04\xc8\x00\xe5\x04\xc9\x00\xe4\x04\xca\x00\xe3\x04\xcc\x00\xe2\x04\xcd'
+    b'\x00\xe1\x04\xce\x00\xe0\x04\xd0\x00\xdf\x04\xd1\x00\xde\x04\xd2\x00\xdd\x04\xd3\x00\xdd\x04\xd4\x00\xdc\x04\xd5\x00\xdb\x04\xd6'
+    b'\x00\xdb\x04\xd7\x00\xda\x04\xd8\x00\xda\x04\xd9\x00\xda\x04\xd9\x00\xd9\x04\xda\x00\xd9\x04\xdb\x00\xd9\x04\xdb\x00\xd9\x04\xdc'
+    b'\x00\xd9\x04\xdc\x00\xd9\x04\xdd\x00\xd9\x04\xdd\x00\xd9\x04\xde\x00\xd9\x04\xde\x00\xd9\x04\xde\x00\xd9\x04\xde\x00\xda\x04\xde'
+    b'\x00\xda\x04\xde\x00\xdb\x04\xde\x00\xdb\x04\xde\x00\xdc\x04\xde\x00\xdc\x04\xde\x00\xdd\x04\xde\x00\xde\x04\xdd\x00\xde\x04\xdd'
+    b'\x00\xdf\x04\xdd\x00\xe0\x04\xdc\x00\xe1\x04\xdc\x00\xe2\x04\xdb\x00\xe3\x04\xda\x00\xe4\x04\xda\x00\xe5\x04\xd9\x00\xe6\x04\xd8'
+    b'\x00\xe7\x04\xd7\x00\xe9\x04\xd6\x00\xea\x04\xd5\x00\xeb\x04\xd4\x00\xec\x04\xd3\x00\xee\x04\xd2\x00\xef\x04\xd1\x00\xf1\x04\xd0'
+    b'\x00\xf2\x04\xce\x00\xf3\x04\xcd\x00\xf5\x04\xcc\x00\xf6\x04\xca\x00\xf8\x04\xc9\x00\xfa\x04\xc7\x00\xfb\x04\xc6\x00\xfd\x04\xc4'
+    b'\x00\xfe\x04\xc3\x01\x00\x04\xc1\x01\x02\x04\xbf\x01\x03\x04\xbe\x01\x05\x04\xbc\x01\x07\x04\xba\x01\x08\x04\xb8\x01\n\x04\xb7'
+    b'\x01\x0c\x04\xb5\x01\x0e\x04\xb3\x01\x0f\x04\xb1\x01\x11\x04\xaf\x01\x13\x04\xad\x01\x15\x04\xab\x01\x16\x04\xa9\x01\x18\x04\xa7'
+    b'\x01\x1a\x04\xa5\x01\x1c\x04\xa3\x01\x1d\x04\xa1\x01\x1f\x04\x9e\x01!\x04\x9c\x01#\x04\x9a\x01$\x04\x98\x01&\x04\x96'
+    b'\x01(\x04\x93\x01*\x04\x91\x01,\x04\x8f\x01-\x04\x8d\x01/\x04\x8a\x011\x04\x88\x013\x04\x86\x014\x04\x83'
+    b'\x016\x04\x81\x018\x04\x7f\x01:\x04|\x01;\x04z\x01=\x04w\x01?\x04u\x01A\x04r\x01B\x04p'
+    b'\x01D\x04n\x01F\x04k\x01H\x04i\x01I\x04f\x01K\x04d\x01M\x04a\x01O\x04_\x01P\x04\\'
+    b'\x01R\x04Z\x01T\x04W\x01V\x04U\x01W\x04R\x01Y\x04P\x01[\x04M\x01]\x04K\x01_\x04H'
+    b'\x01`\x04F\x01b\x04C\x01d\x04A\x01f\x04>\x01g\x04<\x01i\x049\x01k\x047\x01m\x044'
+    b'\x01o\x042\x01p\x04/\x01r\x04-\x01t\x04*\x01v\x04(\x01x\x04%\x01y\x04#\x01{\x04!'
+    b'\x01}\x04\x1e\x01\x7f\x04\x1c\x01\x81\x04\x19\x01\x83\x04\x17\x01\x84\x04\x14\x01\x86\x04\x12\x01\x88\x04\x10\x01\x8a\x04\r'
+    b'\x01\x8c\x04\x0b\x01\x8e\x04\t\x01\x90\x04\x06\x01\x92\x04\x04\x01\x94\x04\x02\x01\x96\x04\x00\x01\x98\x03\xfd\x01\x9a\x03\xfb'
+    b'\x01\x9b\x03\xf9\x01\x9d\x03\xf7\x01\x9f\x03\xf5\x01\xa1\x03\xf2\x01\xa3\x03\xf0\x01\xa5\x03\xee\x01\xa7\x03\xec\x01\xa9\x03\xea'
+    b'\x01\xab\x03\xe8\x01\xad\x03\xe6\x01\xaf\x03\xe4\x01\xb1\x03\xe2\x01\xb3\x03\xe0\x01\xb5\x03\xde\x01\xb7\x03\xdc\x01\xb9\x03\xdb'
+    b'\x01\xbb\x03\xd9\x01\xbd\x03\xd7\x01\xbf\x03\xd5\x01\xc1\x03\xd3\x01\xc3\x03\xd2\x01\xc5\x03\xd0\x01\xc7\x03\xcf\x01\xc9\x03\xcd'
+    b'\x01\xcb\x03\xcb\x01\xcd\x03\xca\x01\xce\x03\xc8\x01\xd0\x03\xc7\x01\xd2\x03\xc6\x01\xd4\x03\xc4\x01\xd6\x03\xc3\x01\xd8\x03\xc2'
+    b'\x01\xd9\x03\xc1\x01\xdb\x03\xc0\x01\xdd\x03\xbe\x01\xdf\x03\xbd\x01\xe0\x03\xbc\x01\xe2\x03\xbb\x01\xe3\x03\xbb\x01\xe5\x03\xba'
+    b'\x01\xe7\x03\xb9\x01\xe8\x03\xb8\x01\xe9\x03\xb7\x01\xeb\x03\xb7\x01\xec\x03\xb6\x01\xee\x03\xb6\x01\xef\x03\xb5\x01\xf0\x03\xb5'
+    b'\x01\xf1\x03\xb5\x01\xf2\x03\xb4\x01\xf3\x03\xb4\x01\xf4\x03\xb4\x01\xf5\x03\xb4\x01\xf6\x03\xb4\x01\xf7\x03\xb4\x01\xf8\x03\xb4'
+    b'\x01\xf9\x03\xb4\x01\xf9\x03\xb4\x01\xfa\x03\xb5\x01\xfb\x03\xb5\x01\xfb\x03\xb5\x01\xfc\x03\xb6\x01\xfc\x03\xb6\x01\xfc\x03\xb7'
+    b'\x01\xfd\x03\xb8\x01\xfd\x03\xb8\x01\xfd\x03\xb9\x01\xfd\x03\xba\x01\xfd\x03\xbb\x01\xfd\x03\xbc'
+)
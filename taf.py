@@ -0,0 +1,466 @@
+# taf.py — TAF forecast playback from a precomputed per-hour timeline
+#
+# Fetching (every FETCH_INTERVAL_S) decodes each station's TAF once into
+# `timeline`, one bytearray:
+#   bytes 0-3    MAGIC
+#   bytes 4-7    start, epoch seconds of hour 0 (little endian)
+#   byte  8      hours
+#   bytes 9-10   stations (little endian, = len(data.leds))
+#   byte  11     reserved
+#   then hours x stations bytes, hour-major: one byte per station per hour,
+#   CAT_MASK = category code (history.CAT_CODES), FLAG_WIND / FLAG_LTG.
+# The same layout is written by host/make_taf_fixtures.py, so a mirror can
+# serve the pre-encoded timeline instead of the TAF JSON (TIMELINE_FILE).
+#
+# TAFs come straight from aviationweather.gov (API_BASE, ?ids=...&format=json)
+# through upstream.py's batched, streamed path: plan() builds the requests
+# once and each TAF object is decoded into the timeline as it arrives. If
+# that fails the mirror is tried (taf_chunk_N.json or TIMELINE_FILE at
+# the base URL given to fetch()); upstream.SOURCE "direct" / "mirror"
+# limits it to one source, as for METARs.
+#
+# Playback never touches the timeline per frame: build_frames() renders
+# the hours to play into raw pixel words once (again only if brightness
+# or the hour changes) and play() blits one frame per step.
+#
+# reserve() (called by main.py in the heap.py startup phase) allocates the
+# frame store and two timeline buffers up front; fetches then decode into
+# whichever timeline buffer is not current instead of allocating a new one.
+
+import array, time
+import timesvc
+import stats
+import log
+import watchdog
+import upstream
+
+MAGIC = b"TAF1"
+HEADER = 12
+HOURS = 24                  # decoded per fetch
+PLAY_HOURS = 12             # shown per playback
+CAT_MASK = 0x07
+FLAG_WIND = 0x08
+FLAG_LTG = 0x10
+
+API_BASE = "https://aviationweather.gov/api/data/taf"
+KEEP = ("icaoId", "validTimeTo", "fcsts")   # everything decode_entry() reads
+FETCH_INTERVAL_S = 3 * 3600
+RETRY_MIN_S = 300           # after a failed fetch; doubles up to FETCH_INTERVAL_S
+CHUNK_COUNT = 4
+TIMELINE_FILE = None        # e.g. "taf_timeline.bin" to fetch pre-encoded data
+TEMPO_WORSE = True          # TEMPO / PROB groups show only if worse than prevailing
+WIND_THRESHOLD = 30         # kt, sustained or gust → FLAG_WIND (main sets HIGH_WINDS_THRESHOLD)
+
+timeline = None
+fetched_at = None           # ticks_ms of the last good fetch
+failures = 0                # failed fetches in a row
+source_used = None          # "direct" | "mirror", last good fetch
+_plan = None                # upstream.batches() for API_BASE (plan())
+_retry_at = None            # ticks_ms before which due() stays False after a failure
+_frames = None              # array('I') of PLAY_HOURS x LED_COUNT raw words
+_sums = None                # power estimate per frame
+_built = None               # (hour0, brightness, frames) the frames were built for
+_words = 0                  # raw words per frame (physical LEDs)
+_tl_bufs = None             # two preallocated timelines (reserve())
+_saved = None               # pixels saved across build_frames()
+
+
+# ---------- decode ----------
+def new(stations, start, hours=HOURS, out=None):
+    """An empty timeline; out (same size) is reused and cleared instead of allocating."""
+    if out is None:
+        tl = bytearray(HEADER + hours * stations)
+    else:
+        tl = out
+        tl[HEADER:] = bytes(len(tl) - HEADER)
+    tl[0:4] = MAGIC
+    for k in range(4):
+        tl[4 + k] = (start >> (8 * k)) & 255
+    tl[8] = hours
+    tl[9] = stations & 255
+    tl[10] = stations >> 8
+    return tl
+
+
+def header(tl):
+    """(start, hours, stations) or None if tl is not a timeline."""
+    if tl is None or len(tl) < HEADER or bytes(tl[0:4]) != MAGIC:
+        return None
+    start = tl[4] | tl[5] << 8 | tl[6] << 16 | tl[7] << 24
+    hours, stations = tl[8], tl[9] | tl[10] << 8
+    if len(tl) < HEADER + hours * stations:
+        return None
+    return start, hours, stations
+
+
+def _vis_sm(v):
+    # TAF JSON visibility is statute miles: 6, "6+", "1/2", "1 1/2", "P6SM"
+    if v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return v
+    v = str(v).replace("SM", "").replace("P", "").replace("+", "").strip()
+    try:
+        total = 0
+        for part in v.split():
+            if "/" in part:
+                a, b = part.split("/")
+                total += int(a) / int(b)
+            else:
+                total += float(part)
+        return total
+    except:
+        return None
+
+
+def category(vis, ceiling):
+    """FAA flight category code from visibility (SM) and ceiling (ft)."""
+    if (ceiling is not None and ceiling < 500) or (vis is not None and vis < 1):
+        return 4
+    if (ceiling is not None and ceiling < 1000) or (vis is not None and vis < 3):
+        return 3
+    if (ceiling is not None and ceiling <= 3000) or (vis is not None and vis <= 5):
+        return 2
+    return 1
+
+
+def _ceiling(clouds):
+    low = None
+    for c in clouds or ():
+        if c.get("cover") in ("BKN", "OVC", "OVX") and c.get("base") is not None:
+            if low is None or c["base"] < low:
+                low = c["base"]
+    return low
+
+
+def _code(f):
+    # timeline byte for a (vis, ceiling, wind, ltg) field set
+    vis, ceil, wind, ltg = f
+    c = category(vis, ceil)
+    if wind is not None and wind >= WIND_THRESHOLD:
+        c |= FLAG_WIND
+    if ltg:
+        c |= FLAG_LTG
+    return c
+
+
+def _fields(p, prev=None):
+    # merge one forecast group's fields over prev (BECMG only changes what it states)
+    vis = _vis_sm(p.get("visib"))
+    clouds = p.get("clouds")
+    ceil = _ceiling(clouds) if clouds else None
+    wind = max(p.get("wspd") or 0, p.get("wgst") or 0) if (p.get("wspd") is not None or p.get("wgst") is not None) else None
+    wx = p.get("wxString")
+    ltg = None if wx is None else (("TS" in wx and "TSNO" not in wx) or "LTG" in wx)
+    if prev is None:
+        return (vis, ceil, wind, bool(ltg))
+    return (vis if vis is not None else prev[0],
+            ceil if clouds else prev[1],
+            wind if wind is not None else prev[2],
+            ltg if ltg is not None else prev[3])
+
+
+def decode_entry(entry, tl, slot, start, hours, stations):
+    """Write one station's TAF (aviationweather JSON) into column slot of tl."""
+    groups = entry.get("fcsts") or ()
+    for h in range(hours):
+        t = start + h * 3600 + 1800          # middle of the hour
+        prevailing = None
+        tcat = tflags = 0
+        for p in groups:
+            t0 = p.get("timeFrom") or 0
+            t1 = p.get("timeTo") or 0
+            change = p.get("fcstChange")
+            if change in ("TEMPO", "PROB") or p.get("probability"):
+                if t0 <= t < t1 and prevailing is not None:
+                    c = _code(_fields(p, prevailing))
+                    if (c & CAT_MASK) > tcat:
+                        tcat = c & CAT_MASK
+                    tflags |= c & (FLAG_WIND | FLAG_LTG)
+                continue
+            if t0 <= t:
+                if change == "BECMG":
+                    prevailing = _fields(p, prevailing)
+                else:                      # base group or FM
+                    prevailing = _fields(p)
+        if prevailing is None:
+            code = 0
+        else:
+            code = _code(prevailing)
+            if tcat:
+                if TEMPO_WORSE:
+                    if tcat > (code & CAT_MASK):
+                        code = (code & ~CAT_MASK) | tcat
+                    code |= tflags
+                else:
+                    code = tcat | tflags
+        valid_to = entry.get("validTimeTo")
+        if valid_to and t >= valid_to:
+            code = 0
+        tl[HEADER + h * stations + slot] = code
+
+
+def decode(entries, index, tl):
+    """Decode a list of TAF entries into tl. index: {icao: slot}. Returns count."""
+    start, hours, stations = header(tl)
+    n = 0
+    for e in entries:
+        slot = index.get(e.get("icaoId"))
+        if slot is None:
+            continue
+        decode_entry(e, tl, slot, start, hours, stations)
+        n += 1
+    return n
+
+
+def hour_start(now=None):
+    """Start of the current hour, Unix seconds (the TAF feed's epoch)."""
+    if now is None:
+        now = timesvc.unix()
+    now = int(now)
+    return now - now % 3600
+
+
+# ---------- fetch ----------
+def reserve(stations, words):
+    """Allocate the long-lived buffers now (timelines, frames) rather than on first use."""
+    global _tl_bufs, _frames, _sums, _saved, _words
+    size = HEADER + HOURS * stations
+    _tl_bufs = (bytearray(size), bytearray(size))
+    _words = words
+    _frames = array.array("I", [0] * (PLAY_HOURS * words))
+    _sums = array.array("I", [0] * PLAY_HOURS)
+    _saved = array.array("I", [0] * words)
+
+
+def _spare(size):
+    """The reserved timeline buffer that is not current, if it fits."""
+    if _tl_bufs is None or len(_tl_bufs[0]) != size:
+        return None
+    return _tl_bufs[1] if timeline is _tl_bufs[0] else _tl_bufs[0]
+
+
+def due():
+    now = time.ticks_ms()
+    if _retry_at is not None and time.ticks_diff(now, _retry_at) < 0:
+        return False
+    return fetched_at is None or time.ticks_diff(now, fetched_at) >= FETCH_INTERVAL_S * 1000
+
+
+def plan(codes, base=None):
+    """Build the batched TAF requests for codes (once, like upstream.plan())."""
+    global API_BASE, _plan
+    if base is not None:
+        API_BASE = base
+    _plan = upstream.batches(API_BASE, codes)
+    return len(_plan[3])
+
+
+def fetch(base_url, leds):
+    """Fetch and decode TAFs for leds, direct first, then from the mirror at base_url. True on success."""
+    global failures, _retry_at, source_used
+    ok = False
+    if _plan is not None and upstream.SOURCE != "mirror":
+        ok = _fetch_direct(leds)
+        if ok:
+            source_used = "direct"
+    if not ok and upstream.SOURCE != "direct":
+        ok = _fetch_mirror(base_url, leds)
+        if ok:
+            source_used = "mirror"
+    if ok:
+        failures = 0
+        _retry_at = None
+        return True
+    # back off so an unreachable source is not asked on every refresh
+    wait = min(RETRY_MIN_S << min(failures, 8), FETCH_INTERVAL_S)
+    failures += 1
+    _retry_at = time.ticks_add(time.ticks_ms(), wait * 1000)
+    log.warn("TAF: fetch failed, next try in", wait, "s")
+    return False
+
+
+def _index(leds):
+    index = {}
+    for i, ap in enumerate(leds):
+        index[ap["code"]] = i
+    return index
+
+
+def _done(tl, t0):
+    global timeline, fetched_at, _built
+    timeline = tl
+    fetched_at = time.ticks_ms()
+    _built = None
+    stats.stop('taf', t0)
+
+
+def _fetch_direct(leds):
+    t0 = stats.start()
+    index = _index(leds)
+    tl = new(len(leds), hour_start(), out=_spare(HEADER + HOURS * len(leds)))
+    start, hours, stations = header(tl)
+    got = [0]
+
+    def each(e):
+        # decoded as it arrives: the TAF JSON is never held whole
+        slot = index.get(e.get("icaoId"))
+        if slot is not None:
+            decode_entry(e, tl, slot, start, hours, stations)
+            got[0] += 1
+
+    code, _ = upstream.get(_plan, KEEP, each, 'taf')
+    if code != 200 or not got[0]:
+        log.warn("TAF: direct fetch failed:", code, got[0], "stations")
+        return False
+    _done(tl, t0)
+    return True
+
+
+def _fetch_mirror(base_url, leds):
+    t0 = stats.start()
+    size = HEADER + HOURS * len(leds)
+    if TIMELINE_FILE:
+        tl = _spare(size) or bytearray(size)
+        got = [0]
+
+        def out(b):
+            # straight into the spare timeline; a longer body is a mismatch
+            n = min(len(b), size - got[0])
+            tl[got[0]:got[0] + n] = b[:n]
+            got[0] += len(b)
+
+        try:
+            status, _ = upstream.download(base_url + "/" + TIMELINE_FILE, out, 'taf')
+        except Exception as e:
+            log.warn("TAF: fetch failed:", e)
+            return False
+        hdr = header(tl) if status == 200 and got[0] == size else None
+        if hdr and hdr[2] == len(leds):
+            _done(tl, t0)
+            return True
+        log.warn("TAF: bad timeline", status, got[0], "bytes")
+        return False
+    index = _index(leds)
+    tl = new(len(leds), hour_start(), out=_spare(size))
+    start, hours, stations = header(tl)
+
+    def each(e):
+        slot = index.get(e.get("icaoId"))
+        if slot is not None:
+            decode_entry(e, tl, slot, start, hours, stations)
+
+    ok = 0
+    for i in range(1, CHUNK_COUNT + 1):
+        try:
+            status, _ = upstream.download("%s/taf_chunk_%d.json" % (base_url, i),
+                                          upstream.objects(each, KEEP), 'taf')
+            if status == 200:
+                ok += 1
+            else:
+                log.warn("TAF: HTTP", status, "for chunk", i)
+        except Exception as e:
+            log.warn("TAF: chunk", i, "failed:", e)
+        finally:
+            stats.collect()
+            watchdog.feed('taf')
+    if ok:
+        _done(tl, t0)
+    return ok > 0
+
+
+# ---------- playback ----------
+def build_frames(pixels, leds, colors, wind_color, ltg_color, extra=None):
+    """
+    Render PLAY_HOURS frames from the current hour into raw pixel words.
+    Each frame starts from the pixels on show (legend and other
+    non-station LEDs stay lit) with only the station LEDs redrawn.
+    colors[code] is the colour for category code; extra(pixels) may draw
+    more fixed LEDs on every frame. Returns the number of frames.
+    """
+    global _frames, _sums, _built, _words
+    hdr = header(timeline)
+    if hdr is None:
+        return 0
+    start, hours, stations = hdr
+    h0 = max(0, (hour_start() - start) // 3600)
+    n = min(PLAY_HOURS, hours - h0)
+    if n <= 0:
+        return 0
+    key = (h0, pixels.brightness(), n)
+    if _built == key:
+        return n
+    if _saved is None or len(_saved) != pixels.num_leds:
+        saved = pixels.snapshot()
+    else:
+        saved = pixels.snapshot(_saved)
+    saved_sum = pixels.level_sum
+    words = _words = len(saved)
+    if _frames is None or len(_frames) != PLAY_HOURS * words:
+        _frames = array.array("I", [0] * (PLAY_HOURS * words))
+        _sums = array.array("I", [0] * PLAY_HOURS)
+    tl = timeline
+    count = min(stations, len(leds))
+    for f in range(n):
+        row = HEADER + (h0 + f) * stations
+        pixels.blit(saved, 0, saved_sum)
+        for i in range(count):
+            c = tl[row + i]
+            if c & FLAG_LTG:
+                color = ltg_color
+            elif c & FLAG_WIND:
+                color = wind_color
+            else:
+                color = colors[c & CAT_MASK]
+            pixels.set_pixel(leds[i]["led"], color)
+        if extra:
+            extra(pixels)
+        pixels.snapshot(_frames, f * words)
+        _sums[f] = pixels.level_sum
+    pixels.blit(saved, 0, saved_sum)
+    _built = key
+    return n
+
+
+def play(pixels, frames, show, wait):
+    """Show frames built by build_frames: blit, show(), wait() per hour."""
+    for f in range(frames):
+        pixels.blit(_frames, f * _words, _sums[f])
+        show()
+        wait()
+
+
+def invalidate(refetch=False):
+    """Drop cached frames (colours changed); refetch also re-decodes on the next fetch."""
+    global _built, fetched_at, _retry_at
+    _built = None
+    if refetch:
+        fetched_at = None
+        _retry_at = None
+
+
+def status():
+    hdr = header(timeline)
+    return {
+        "start": hdr[0] if hdr else None, "hours": hdr[1] if hdr else 0,
+        "stations": hdr[2] if hdr else 0,
+        "age_s": time.ticks_diff(time.ticks_ms(), fetched_at) // 1000 if fetched_at is not None else None,
+        "source": source_used, "failures": failures,
+    }
+
+
+def dump(leds, hours=None):
+    """{icao: "1123..."} category digits per hour (W/L for wind/lightning), for /taf."""
+    hdr = header(timeline)
+    if hdr is None:
+        return {}
+    start, nh, stations = hdr
+    nh = min(nh, hours or nh)
+    out = {"start": start}
+    for i in range(min(stations, len(leds))):
+        s = ""
+        for h in range(nh):
+            c = timeline[HEADER + h * stations + i]
+            s += "L" if c & FLAG_LTG else ("W" if c & FLAG_WIND else str(c & CAT_MASK))
+        out[leds[i]["code"]] = s
+    return out
@@ -0,0 +1,174 @@
+# timesvc.py — one time source for the whole map (MicroPython)
+# - First sync from the HTTP Date header of any fetch (no blocking NTP at boot)
+# - NTP as a periodic, single-shot refinement from the main loop
+# - Drift tracking between syncs
+# - UK local time (GMT/BST, last-Sunday rule) for dimming and OTA
+
+import time
+import log
+import watchdog
+
+NTP_INTERVAL_S   = 6 * 3600   # refine with NTP this often once synced
+NTP_RETRY_S      = 300        # after a failed NTP attempt
+NTP_TIMEOUT_S    = 1          # single attempt, never the old 3 × 1 s loop
+NTP_HOST         = "pool.ntp.org"
+HTTP_RESYNC_S    = 12 * 3600  # accept Date headers again if NTP has gone stale
+
+USE_UK_DST       = True       # GMT/BST; False → fixed BASE_OFFSET_HOURS
+BASE_OFFSET_HOURS = 0
+
+# ---------- STATE ----------
+synced        = False
+source        = None          # "http" | "ntp"
+last_sync     = 0             # RTC seconds at last sync
+last_offset_s = 0             # correction applied at last sync
+drift_ppm     = 0             # estimated RTC drift between syncs
+syncs         = 0
+_next_ntp     = 0             # RTC seconds; 0 = as soon as possible
+
+# Feeds (METAR obsTime, TAF timeFrom...) use Unix time; the Pico's epoch is 2000
+UNIX_OFFSET = 946684800 if time.gmtime(0)[0] == 2000 else 0
+
+_MONTHS = {"Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+           "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12}
+
+# ---------- RTC ----------
+def _mktime(y, m, d, hh=0, mm=0, ss=0):
+    return time.mktime((y, m, d, hh, mm, ss, 0, 0, 0))
+
+def _set_rtc(secs):
+    y, m, d, hh, mm, ss, wd, _ = time.gmtime(secs)[:8]
+    try:
+        import machine
+        machine.RTC().datetime((y, m, d, wd, hh, mm, ss, 0))
+    except Exception as e:
+        log.warn("TIME: RTC set failed:", e)
+        return False
+    return True
+
+def _apply(true_secs, src):
+    """Step the RTC to true_secs and update drift statistics."""
+    global synced, source, last_sync, last_offset_s, drift_ppm, syncs
+    now = time.time()
+    offset = true_secs - now
+    # Only NTP is precise enough to estimate drift (Date is 1 s resolution)
+    if synced and src == "ntp" and source == "ntp":
+        elapsed = now - last_sync
+        if elapsed > 0:
+            drift_ppm = int(offset * 1000000 / elapsed)
+    if not _set_rtc(true_secs):
+        return False
+    last_offset_s = offset
+    last_sync = true_secs
+    source = src
+    synced = True
+    syncs += 1
+    log.info("TIME: synced from", src, "offset", offset, "s, drift", drift_ppm, "ppm")
+    return True
+
+# ---------- HTTP DATE ----------
+def parse_http_date(s):
+    """'Tue, 15 Nov 1994 08:12:31 GMT' → RTC seconds, or None."""
+    try:
+        parts = s.split()
+        d = int(parts[1])
+        m = _MONTHS[parts[2]]
+        y = int(parts[3])
+        hh, mm, ss = parts[4].split(":")
+        return _mktime(y, m, d, int(hh), int(mm), int(ss))
+    except Exception:
+        return None
+
+def from_http(headers):
+    """
+    Feed the headers of any HTTP response. Sets the clock on first use, or
+    when NTP has not refreshed it for HTTP_RESYNC_S. Cheap otherwise.
+    """
+    global _next_ntp
+    if synced and time.time() - last_sync < HTTP_RESYNC_S:
+        return False
+    if not headers:
+        return False
+    date = headers.get("Date") or headers.get("date")
+    if not date:
+        return False
+    secs = parse_http_date(date)
+    if secs is None:
+        return False
+    if not _next_ntp:
+        # first frame matters more than sub-second accuracy; refine shortly
+        _next_ntp = secs + 60
+    return _apply(secs, "http")
+
+# ---------- NTP ----------
+def ntp_tick():
+    """
+    Call from the main loop. Makes at most one short NTP attempt when due;
+    returns immediately otherwise.
+    """
+    global _next_ntp
+    now = time.time()
+    if _next_ntp and now < _next_ntp:
+        return False
+    try:
+        import ntptime
+        ntptime.timeout = NTP_TIMEOUT_S
+        # cached address (watchdog.resolve): ntptime would look the name up every time
+        addr = watchdog.resolve(NTP_HOST, 123)[-1]
+        ntptime.host = addr[0] if isinstance(addr, tuple) else NTP_HOST
+        t = ntptime.time()
+    except Exception as e:
+        _next_ntp = now + NTP_RETRY_S
+        log.warn("TIME: NTP failed:", e)
+        return False
+    ok = _apply(t, "ntp")
+    _next_ntp = time.time() + (NTP_INTERVAL_S if ok else NTP_RETRY_S)
+    return ok
+
+# ---------- LOCAL TIME ----------
+_dst_year = None
+_dst_start = 0
+_dst_end = 0
+
+def _last_sunday(y, m):
+    """Day of month of the last Sunday (March and October have 31 days)."""
+    wd = time.gmtime(_mktime(y, m, 31))[6]   # 0 = Monday
+    return 31 - ((wd + 1) % 7)
+
+def _dst_window(y):
+    global _dst_year, _dst_start, _dst_end
+    if _dst_year != y:
+        # BST: 01:00 UTC last Sunday of March → 01:00 UTC last Sunday of October
+        _dst_start = _mktime(y, 3, _last_sunday(y, 3), 1)
+        _dst_end = _mktime(y, 10, _last_sunday(y, 10), 1)
+        _dst_year = y
+    return _dst_start, _dst_end
+
+def utc_offset_s(secs=None):
+    if secs is None:
+        secs = time.time()
+    off = BASE_OFFSET_HOURS * 3600
+    if USE_UK_DST:
+        start, end = _dst_window(time.gmtime(secs)[0])
+        if start <= secs < end:
+            off += 3600
+    return off
+
+def unix(secs=None):
+    """RTC seconds → Unix epoch seconds."""
+    if secs is None:
+        secs = time.time()
+    return int(secs) + UNIX_OFFSET
+
+def localtime(secs=None):
+    """Local time tuple (RTC is kept in UTC)."""
+    if secs is None:
+        secs = time.time()
+    return time.gmtime(secs + utc_offset_s(secs))
+
+def status():
+    return {
+        "synced": synced, "source": source, "syncs": syncs,
+        "last_sync": last_sync, "last_offset_s": last_offset_s,
+        "drift_ppm": drift_ppm, "utc_offset_s": utc_offset_s(),
+    }
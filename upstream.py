@@ -0,0 +1,397 @@
+# upstream.py — METARs straight from aviationweather.gov, batched and streamed
+#
+# plan() packs the station table into the fewest ?ids=A,B,...&format=json
+# request targets that stay under MAX_URL (one for a typical map), once,
+# at startup. fetch() sends them over a single HTTP/1.1 keep-alive
+# connection (plain or TLS) with Accept: application/json; a reply that is
+# not JSON counts as a failure. The body is never held whole: _Splitter
+# cuts the top-level array into one object at a time as it arrives, each
+# object is json-decoded on its own and trimmed to KEEP, and the trimmed
+# list goes to the parser in one call — the same shape as a mirror chunk.
+#
+# refresh() is the failover: SOURCE "auto" tries the direct upstream and
+# falls back to the mirror (main.fetch_all_chunks) in the same refresh,
+# then stays on the mirror for RETRY_EVERY refreshes before trying direct
+# again, so a dead upstream does not cost a timeout every cycle.
+#
+# batches() and get() are the same path for any other endpoint of the API
+# taking ?ids= (taf.py fetches /api/data/taf through them). download() is
+# a single streamed GET for any URL (mirror chunks, OTA files); objects()
+# turns a JSON array body into per-object calls for either.
+#
+# Every connection takes its address from watchdog.resolve() (one DNS
+# lookup per host per boot) and feeds the watchdog after the connect and
+# after the TLS handshake, so neither can add up with the lookup.
+
+import json, socket
+import log
+import stats
+import timesvc
+import watchdog
+
+API_BASE = "https://aviationweather.gov/api/data/metar"
+SOURCE = "auto"             # "auto" | "direct" | "mirror"
+MAX_URL = 1024              # request-target bytes per batch
+RETRY_EVERY = 4             # refreshes on the mirror after a direct failure
+READ = 512
+KEEP = ("icaoId", "obsTime", "rawOb", "visib", "clouds", "fltCat", "wspd", "wgst", "wxString")
+
+_plan = None                # (host, port, tls, heads): prebuilt request heads, one per batch
+_skip = 0
+
+source_used = None          # "direct" | "mirror", last refresh
+requests = 0
+connections = 0
+failovers = 0
+bytes_in = 0
+last_code = None
+validators = {}             # Date / ETag / Last-Modified of the last response
+
+
+def configure(base=None, source=None, max_url=None):
+    global API_BASE, SOURCE, MAX_URL
+    if base is not None:
+        API_BASE = base
+    if source is not None:
+        SOURCE = source
+    if max_url is not None:
+        MAX_URL = max_url
+
+
+def _split(url):
+    proto, _, rest = url.partition("://")
+    hostport, _, path = rest.partition("/")
+    host, _, port = hostport.partition(":")
+    tls = proto == "https"
+    return host, int(port) if port else (443 if tls else 80), tls, "/" + path
+
+
+def _name(host, port):
+    return host if port in (80, 443) else "%s:%d" % (host, port)
+
+
+def batches(base, codes):
+    """Batched request heads for codes against base → (host, port, tls, heads)."""
+    host, port, tls, path = _split(base)
+    head = path + "?format=json&ids="
+    seen = []
+    for c in codes:
+        if c and c not in seen:
+            seen.append(c)
+    targets = []
+    cur = head
+    for c in seen:
+        if cur != head and len(cur) + 1 + len(c) > MAX_URL:
+            targets.append(cur)
+            cur = head
+        cur += ("," if cur != head else "") + c
+    if cur != head:
+        targets.append(cur)
+    name = _name(host, port)
+    heads = tuple(("GET %s HTTP/1.1\r\nHost: %s\r\nAccept: application/json\r\n"
+                   "Connection: keep-alive\r\nUser-Agent: metar-map\r\n\r\n" % (t, name)).encode()
+                  for t in targets)
+    return host, port, tls, heads
+
+
+def plan(codes):
+    """Build the batched METAR request heads for codes; returns the number of batches."""
+    global _plan
+    _plan = batches(API_BASE, codes)
+    log.info("Upstream:", len(set(c for c in codes if c)), "stations in", len(_plan[3]), "request(s)")
+    return len(_plan[3])
+
+
+def _open(host, port, tls):
+    global connections
+    ai = watchdog.resolve(host, port)
+    s = socket.socket(ai[0], socket.SOCK_STREAM, ai[2])
+    s.settimeout(watchdog.HTTP_TIMEOUT_S)
+    try:
+        s.connect(ai[-1])
+        watchdog.feed('connect')
+        if tls:
+            import ssl
+            s = ssl.wrap_socket(s, server_hostname=host)
+            watchdog.feed('tls')
+    except:
+        s.close()
+        watchdog.unreachable(host, port)
+        raise
+    connections += 1
+    # MicroPython sockets are streams already; CPython's need a file
+    return s, (s if hasattr(s, "readline") else s.makefile("rwb"))
+
+
+def _head(f):
+    """Status line and headers → (status, length, chunked, close, json, validators)."""
+    line = f.readline()
+    if not line:
+        raise OSError("connection closed")
+    status = int(line.split(None, 2)[1])
+    length, chunked, close, is_json, kept = None, False, False, False, {}
+    while True:
+        h = f.readline()
+        if not h or h == b"\r\n":
+            break
+        k, _, v = h.partition(b":")
+        k = k.strip().lower()
+        v = v.strip()
+        if k == b"content-length":
+            length = int(v)
+        elif k == b"transfer-encoding":
+            chunked = b"chunked" in v.lower()
+        elif k == b"connection":
+            close = v.lower() == b"close"
+        elif k == b"content-type":
+            is_json = b"json" in v.lower()
+        elif k in (b"date", b"etag", b"last-modified"):
+            kept[k.decode()] = v.decode()
+    return status, length, chunked, close, is_json, kept
+
+
+def _read(f, n, eof_ok=False):
+    global bytes_in
+    b = f.read(n)
+    if not b and not eof_ok:
+        raise OSError("body truncated")
+    bytes_in += len(b)
+    return b
+
+
+def _body(f, length, chunked, out):
+    """Feed the body to out(bytes) in pieces of at most READ bytes."""
+    if chunked:
+        while True:
+            size = int(f.readline().split(b";")[0].strip(), 16)
+            if size == 0:
+                while f.readline() not in (b"\r\n", b""):
+                    pass
+                return
+            while size:
+                b = _read(f, min(READ, size))
+                size -= len(b)
+                out(b)
+            f.readline()
+    elif length is not None:
+        while length:
+            b = _read(f, min(READ, length))
+            length -= len(b)
+            out(b)
+    else:
+        # delimited by the close (the caller drops the connection)
+        while True:
+            b = _read(f, READ, True)
+            if not b:
+                return
+            out(b)
+
+
+class _Splitter:
+    """Cut a JSON array into its top-level objects as the bytes arrive."""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.buf = b""
+        self.pos = 0            # scan position in buf
+        self.depth = 0
+        self.start = -1         # buf index of the current object's "{"
+
+    def feed(self, data):
+        buf = self.buf + data if self.buf else bytes(data)
+        i = self.pos
+        n = len(buf)
+        while i < n:
+            # jump between the only bytes that matter: { } and "
+            a = buf.find(b"{", i)
+            z = buf.find(b"}", i)
+            q = buf.find(b'"', i)
+            j = n
+            for x in (a, z, q):
+                if 0 <= x < j:
+                    j = x
+            if j == n:
+                i = n
+                break
+            c = buf[j]
+            if c == 34:         # '"': skip the string, honouring escapes
+                k = j + 1
+                while True:
+                    k = buf.find(b'"', k)
+                    if k < 0:
+                        break
+                    b = k - 1
+                    while buf[b] == 92:
+                        b -= 1
+                    if (k - 1 - b) % 2 == 0:
+                        break
+                    k += 1
+                if k < 0:
+                    i = j       # string continues in the next piece
+                    break
+                i = k + 1
+            elif c == 123:      # "{"
+                if self.depth == 0:
+                    self.start = j
+                self.depth += 1
+                i = j + 1
+            else:               # "}"
+                self.depth -= 1
+                i = j + 1
+                if self.depth == 0:
+                    self.emit(buf[self.start:i])
+                    self.start = -1
+        if self.depth == 0 and self.start < 0:
+            self.buf = buf[i:] if i < n else b""
+            self.pos = 0
+        else:
+            keep = self.start if self.start >= 0 else i
+            self.buf = buf[keep:]
+            self.pos = i - keep
+            if self.start >= 0:
+                self.start = 0
+
+
+def objects(each, keep=KEEP):
+    """A body sink: each(entry) per object of a JSON array as it arrives, trimmed to keep."""
+    def emit(obj):
+        e = json.loads(obj)
+        each({k: e.get(k) for k in keep})
+    return _Splitter(emit).feed
+
+
+def download(url, out, site='upstream'):
+    """
+    GET url on a connection of its own; the body of a 200 goes to out(bytes)
+    in pieces of at most READ bytes, with the watchdog fed per piece.
+    Returns (status, validators). Raises OSError on network errors.
+    """
+    global requests
+    host, port, tls, path = _split(url)
+    sock, f = _open(host, port, tls)
+    try:
+        f.write(("GET %s HTTP/1.1\r\nHost: %s\r\nConnection: close\r\n"
+                 "User-Agent: metar-map\r\n\r\n" % (path, _name(host, port))).encode())
+        if hasattr(f, "flush"):
+            f.flush()
+        requests += 1
+        status, length, chunked, close, is_json, kept = _head(f)
+        timesvc.from_http(kept)
+        if status == 200:
+            def piece(b):
+                out(b)
+                watchdog.feed(site)
+            _body(f, length, chunked, piece)
+        return status, kept
+    finally:
+        sock.close()
+        watchdog.feed(site)
+
+
+def get(p, keep, each, site='upstream'):
+    """
+    Every batch of plan p (from batches()) over one connection; each(entry)
+    per object, trimmed to keep. Returns (HTTP-ish code, validators).
+    """
+    global requests
+    host, port, tls, heads = p
+    if not heads:
+        return 400, {}
+
+    def piece(b):
+        split(b)
+        watchdog.feed(site)         # a slow body must not starve the watchdog
+
+    sock = f = None
+    code = 200
+    kept = {}
+    try:
+        for head in heads:
+            if sock is None:
+                sock, f = _open(host, port, tls)
+            t0 = stats.start()
+            f.write(head)
+            if hasattr(f, "flush"):
+                f.flush()
+            requests += 1
+            status, length, chunked, close, is_json, kept = _head(f)
+            timesvc.from_http(kept)
+            if length is None and not chunked:
+                close = True
+            if status == 200 and not is_json:
+                status = 415                # negotiated JSON, got something else
+            if status == 204:
+                pass                        # none of the stations reported
+            elif status == 200:
+                split = objects(each, keep)
+                _body(f, length, chunked, piece)
+            else:
+                # read and drop the error body so the connection stays usable
+                if not close:
+                    _body(f, length, chunked, lambda b: None)
+                log.warn("Upstream: HTTP", status)
+                stats.count('http_' + str(status))
+                code = status
+                break
+            stats.stop('chunk', t0)
+            if close:
+                sock.close()
+                sock = f = None
+    except Exception as e:
+        log.warn("Upstream failed:", e)
+        stats.count('chunk_errors')
+        code = 500
+    finally:
+        if sock is not None:
+            try:
+                sock.close()
+            except:
+                pass
+        stats.collect()
+        watchdog.feed(site)
+    return code, kept
+
+
+def fetch(parse):
+    """All METAR batches over one connection; parse(list_of_entries) once. Returns an HTTP-ish code."""
+    global last_code, validators
+    if _plan is None:
+        return 400
+    t_fetch = stats.start()
+    entries = []
+    code, validators = get(_plan, KEEP, entries.append)
+    if code == 200:
+        code = parse(entries)
+    entries = None
+    stats.stop('fetch', t_fetch)
+    last_code = code
+    return code
+
+
+def refresh(parse, mirror):
+    """One refresh from SOURCE; "auto" fails over to mirror()."""
+    global _skip, failovers, source_used
+    if SOURCE == "direct" or (SOURCE == "auto" and not _skip):
+        source_used = "direct"
+        code = fetch(parse)
+        if code == 200 or SOURCE == "direct":
+            return code
+        failovers += 1
+        _skip = RETRY_EVERY
+        log.warn("Upstream: code", code, "- using the mirror for", RETRY_EVERY, "refreshes")
+    elif _skip:
+        _skip -= 1
+    source_used = "mirror"
+    return mirror()
+
+
+def reset():
+    global _skip, source_used
+    _skip = 0
+    source_used = None
+
+
+def status():
+    return {"source": SOURCE, "used": source_used, "batches": len(_plan[3]) if _plan else 0,
+            "requests": requests, "connections": connections, "failovers": failovers,
+            "bytes": bytes_in, "last_code": last_code}
@@ -0,0 +1,138 @@
+# watchdog.py — hardware watchdog plus a measured loop-iteration budget
+#
+# Every blocking operation in the firmware has a timeout (HTTP_TIMEOUT_S
+# for sockets, wifi_link's reconnect runs in the background, NTP is one
+# short attempt) and every long wait is sliced, with feed(site) between
+# slices. feed() also measures the gap since the previous feed: the
+# worst gap is the real loop-iteration budget, reported on /status, and
+# any gap over BUDGET_MS is logged with the site that ended it, so a
+# slow path shows up long before it trips the hardware reset.
+#
+# The RP2040 WDT cannot be stopped once started (and caps at ~8.3 s), so
+# start() is only called by main.py; setup mode keeps it fed from the
+# portal's event loop (portal.py).
+#
+# The one call that cannot be bounded is the DNS lookup: lwIP's
+# getaddrinfo() has no timeout and, with the link up but no DNS server
+# answering, retries for longer than the WDT allows. resolve() therefore
+# looks each name up once and caches the address for the rest of the
+# boot (prefetch() does the lookups main.py needs before start() arms
+# the WDT), feeds either side of any lookup it does make and keeps the
+# time it took (dns_max_ms on /status). A cached address only gets looked
+# up again after a connection to it failed, at most every DNS_RETRY_S:
+# a resolver that hangs then costs one reset per DNS_RETRY_S, not one
+# per refresh. Sockets opened through upstream.py also feed between
+# lookup, connect and TLS handshake, so each shows up as its own gap.
+
+import time, socket
+import log
+
+TIMEOUT_MS = 8000           # hardware reset after this long without a feed
+BUDGET_MS = 5000            # warn when an iteration gets this close
+HTTP_TIMEOUT_S = 3          # per socket operation, for every HTTP request
+DNS_RETRY_S = 900           # least time between lookups of one name once cached
+
+_wdt = None
+_last = time.ticks_ms()
+max_gap_ms = 0
+max_gap_site = None
+over_budget = 0
+feeds = 0
+
+_addrs = {}                 # (host, port) → [getaddrinfo entry, ticks_ms looked up, failed]
+dns_lookups = 0
+dns_max_ms = 0
+dns_max_host = None
+
+
+def start(timeout_ms=TIMEOUT_MS):
+    """Arm the hardware watchdog. Returns False if the port has none."""
+    global _wdt, _last
+    try:
+        from machine import WDT
+        _wdt = WDT(timeout=timeout_ms)
+    except Exception as e:
+        log.warn("Watchdog unavailable:", e)
+        return False
+    _last = time.ticks_ms()
+    log.info("Watchdog armed,", timeout_ms, "ms")
+    return True
+
+
+def feed(site=None):
+    global _last, max_gap_ms, max_gap_site, over_budget, feeds
+    now = time.ticks_ms()
+    gap = time.ticks_diff(now, _last)
+    _last = now
+    feeds += 1
+    if gap > max_gap_ms:
+        max_gap_ms = gap
+        max_gap_site = site
+    if gap > BUDGET_MS:
+        over_budget += 1
+        log.warn("Watchdog: %d ms before feed at" % gap, site)
+    if _wdt is not None:
+        _wdt.feed()
+
+
+def resolve(host, port):
+    """getaddrinfo() entry for host:port (SOCK_STREAM), looked up once and cached."""
+    global dns_lookups, dns_max_ms, dns_max_host
+    key = (host, port)
+    a = _addrs.get(key)
+    now = time.ticks_ms()
+    if a is not None and (not a[2] or time.ticks_diff(now, a[1]) < DNS_RETRY_S * 1000):
+        return a[0]
+    feed('dns')
+    try:
+        ai = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+    except OSError:
+        if a is None:
+            raise
+        a[1] = time.ticks_ms()      # keep the old address for another DNS_RETRY_S
+        return a[0]
+    finally:
+        ms = time.ticks_diff(time.ticks_ms(), now)
+        dns_lookups += 1
+        if ms > dns_max_ms:
+            dns_max_ms = ms
+            dns_max_host = host
+        feed('dns')
+    _addrs[key] = [ai, time.ticks_ms(), False]
+    return ai
+
+
+def unreachable(host, port):
+    """A connection to the cached address failed: allow a fresh lookup (see DNS_RETRY_S)."""
+    a = _addrs.get((host, port))
+    if a is not None:
+        a[2] = True
+
+
+def prefetch(urls):
+    """Look up the hosts of urls now (before start()); failures are left to resolve()."""
+    for url in urls:
+        if not url:
+            continue
+        proto, _, rest = url.partition("://")
+        host, _, port = rest.partition("/")[0].partition(":")
+        try:
+            resolve(host, int(port) if port else (443 if proto == "https" else 80))
+        except OSError as e:
+            log.warn("DNS: no address for", host, e)
+
+
+def reset_stats():
+    global _last, max_gap_ms, max_gap_site, over_budget, feeds
+    _last = time.ticks_ms()
+    max_gap_ms = 0
+    max_gap_site = None
+    over_budget = 0
+    feeds = 0
+
+
+def status():
+    return {"armed": _wdt is not None, "timeout_ms": TIMEOUT_MS, "max_gap_ms": max_gap_ms,
+            "max_gap_site": max_gap_site, "over_budget": over_budget, "feeds": feeds,
+            "dns_cached": len(_addrs), "dns_lookups": dns_lookups,
+            "dns_max_ms": dns_max_ms, "dns_max_host": dns_max_host}
@@ -0,0 +1,129 @@
+# webapp.py — station-mode phew server, pumped from the main loop (MicroPython)
+# The server runs cooperatively on the main thread: instead of
+# time.sleep() between frames, main.py calls webapp.serve_for(ms), which
+# lets uasyncio handle any pending requests for that long.
+#
+# Routes:
+#   /status   JSON from stats.snapshot()
+#   /log      log.py ring buffer, oldest first
+#   /history  per-station observation history (history.py), ?station=EGLL for one
+#   /taf      decoded forecast timeline, one digit per station per hour (taf.py)
+#   /, /map   live mirror of the map (app_templates/index.html)
+#   /map/stations  [[led, icao, name], ...], fetched once by the page
+#   /map/delta     ?since=<seq>: binary changes since seq (mirror.py)
+#   /settings      settings page (app_templates/settings.html)
+#   /settings.json GET values + schema, POST a JSON or form change set (settings.py)
+
+import json, time
+import stats
+import log
+import history
+import mirror
+import settings
+
+PORT = 80
+
+_loop = None
+_delta_resp = None   # one Response for every /map/delta poll (start())
+
+def _status(request):
+    return json.dumps(stats.snapshot()), 200, "application/json"
+
+def _log(request):
+    return log.dump(), 200, "text/plain"
+
+def _history(request):
+    import data
+    code = request.query.get("station") if request.query else None
+    return json.dumps(history.dump(data.leds, code)), 200, "application/json"
+
+def _taf(request):
+    import data, taf
+    return json.dumps(taf.dump(data.leds)), 200, "application/json"
+
+def _map(request):
+    from phew import server
+    return server.serve_file("app_templates/index.html")
+
+def _map_stations(request):
+    import data, stationdb
+    from phew import server
+    # names come off flash one by one; the page asks for this once
+    body = json.dumps([[ap["led"], ap["code"], stationdb.name(i)] for i, ap in enumerate(data.leds)]).encode()
+    # fetched first by pages served from other maps (?devices=), like /map/delta
+    return server.Response(body, 200, {
+        "Content-Type": "application/json", "Content-Length": len(body),
+        "Access-Control-Allow-Origin": "*",
+    })
+
+def _map_delta(request):
+    try:
+        since = int(request.query.get("since", 0)) if request.query else 0
+    except ValueError:
+        since = 0
+    # polled every 2 s by every open page: only the body and its length change
+    r = _delta_resp
+    r.body = mirror.delta(since)
+    r.headers["Content-Length"] = len(r.body)
+    return r
+
+def _settings_page(request):
+    from phew import server
+    return server.serve_file("app_templates/settings.html")
+
+def _settings_get(request):
+    return json.dumps(settings.export()), 200, "application/json"
+
+def _settings_post(request):
+    changes = request.data or request.form or {}
+    changed, errors = settings.update(changes)
+    body = json.dumps({"changed": changed, "errors": errors})
+    return body, (400 if errors else 200), "application/json"
+
+def _not_found(request):
+    return "Not found", 404
+
+def start():
+    """Register routes and open the listening socket (non-blocking)."""
+    global _loop, _delta_resp
+    try:
+        import uasyncio
+        from phew import server, logging
+    except ImportError as e:
+        print("webapp: phew unavailable:", e)
+        return False
+    # phew logs every request to flash at INFO; keep that off the hot path
+    logging.disable_logging_types(logging.LOG_INFO)
+    server.add_route("/status", _status)
+    server.add_route("/log", _log)
+    server.add_route("/history", _history)
+    server.add_route("/taf", _taf)
+    server.add_route("/", _map)
+    server.add_route("/map", _map)
+    server.add_route("/map/stations", _map_stations)
+    # the page may be served by another map (?devices=), so allow cross-origin polls
+    _delta_resp = server.Response(b"", 200, {
+        "Content-Type": "application/octet-stream", "Content-Length": 0,
+        "Cache-Control": "no-store", "Access-Control-Allow-Origin": "*",
+    })
+    server.add_route("/map/delta", _map_delta)
+    server.add_route("/settings", _settings_page)
+    server.add_route("/settings.json", _settings_get)
+    server.add_route("/settings.json", _settings_post, methods=["POST"])
+    server.set_callback(_not_found)
+    _loop = uasyncio.get_event_loop()
+    # same as phew's server.run(), minus run_forever()
+    _loop.create_task(uasyncio.start_server(server._handle_request, "0.0.0.0", PORT))
+    print("webapp: listening on port", PORT)
+    return True
+
+def serve_for(ms):
+    """Handle requests for ms milliseconds; plain sleep if not started."""
+    if _loop is None:
+        time.sleep_ms(ms)
+        return
+    import uasyncio
+    try:
+        _loop.run_until_complete(uasyncio.sleep_ms(ms))
+    except Exception as e:
+        print("webapp: serve error:", e)
@@ -0,0 +1,386 @@
+# wifi_link.py — station connect helpers for Pico W (MicroPython)
+# - Saved credentials (wifi.json)
+# - Fast reconnect from cached BSSID / channel (.wifi_cache.json)
+# - DHCP lease reused as a static IP on resume, for at most LEASE_REUSE_S
+# - Full scan + DHCP fallback
+# - Boot-to-connected timing
+# - Park / non-blocking resume between fetches (power.py)
+
+import network, utime, json
+import log
+
+WIFI_FILE  = "wifi.json"
+CACHE_FILE = ".wifi_cache.json"
+
+FAST_TIMEOUT_S = 8        # cached BSSID + static lease should associate quickly
+FULL_TIMEOUT_S = 30       # full scan + associate + DHCP
+FAST_STATIC_IP = True     # resume() reuses the last DHCP lease instead of asking again
+LEASE_REUSE_S = 3600      # ... for at most this long after it was granted
+
+# Set as early as possible (first import in boot.py) so the timing covers
+# everything between power-on and the first usable connection.
+BOOT_T0 = utime.ticks_ms()
+
+# Filled in by connect(); read by main.py / status reporting
+connect_ms   = None       # boot → connected, milliseconds
+connect_path = None       # "fast" | "full"
+
+# The lease reused by resume(). Only ever one granted since this boot:
+# the clock is not set yet at boot, so a cached lease's age is unknown.
+_lease_cfg = None         # wlan.ifconfig() after the last DHCP join
+_lease_t0  = None         # ticks_ms it was granted
+static_ip  = False        # the current link runs on the reused lease
+
+# ---------------------------------------------------------------
+def load_creds():
+    """Return (ssid, password) as bytes from wifi.json, or None."""
+    try:
+        with open(WIFI_FILE) as f:
+            creds = json.load(f)
+    except Exception as e:
+        log.warn("Wi-Fi: no wifi.json:", e)
+        return None
+    ssid = creds.get("ssid", "")
+    password = creds.get("password", "")
+    if isinstance(ssid, str): ssid = ssid.encode()
+    if isinstance(password, str): password = password.encode()
+    return ssid, password
+
+# ---------- CACHE ----------
+def _hex(b):
+    return "".join("%02x" % x for x in b)
+
+def _unhex(s):
+    return bytes(int(s[i:i + 2], 16) for i in range(0, len(s), 2))
+
+def load_cache(ssid):
+    """Cached {bssid, channel, ifconfig} for this SSID, or None."""
+    try:
+        with open(CACHE_FILE) as f:
+            c = json.load(f)
+    except:
+        return None
+    if c.get("ssid") != _hex(ssid):
+        return None
+    return c
+
+def save_cache(ssid, bssid, channel, ifconfig):
+    c = {
+        "ssid": _hex(ssid),
+        "bssid": _hex(bssid) if bssid else "",
+        "channel": channel or 0,
+        "ifconfig": list(ifconfig),
+        "connect_ms": connect_ms,
+    }
+    try:
+        with open(CACHE_FILE, "w") as f:
+            json.dump(c, f)
+    except Exception as e:
+        log.warn("Wi-Fi: could not write the cache:", e)
+
+def clear_cache():
+    try:
+        import os
+        os.remove(CACHE_FILE)
+    except:
+        pass
+
+# ---------- LEASE ----------
+def _leased(wlan):
+    """Joined with DHCP: remember the lease for resume()."""
+    global _lease_cfg, _lease_t0
+    _lease_cfg = wlan.ifconfig()
+    _lease_t0 = utime.ticks_ms()
+
+def _lease_fresh():
+    return (FAST_STATIC_IP and _lease_cfg is not None and
+            utime.ticks_diff(utime.ticks_ms(), _lease_t0) < LEASE_REUSE_S * 1000)
+
+def _use_dhcp(wlan):
+    global static_ip
+    if static_ip:
+        try:
+            wlan.ifconfig("dhcp")
+        except (OSError, TypeError, ValueError):
+            pass
+        static_ip = False
+
+def drop_lease():
+    """A request over the reused lease failed: forget it and ask DHCP again."""
+    global _lease_cfg
+    if not static_ip:
+        return
+    log.warn("Wi-Fi: request failed on the reused lease — back to DHCP")
+    _lease_cfg = None
+    _use_dhcp(network.WLAN(network.STA_IF))
+
+# ---------- CONNECT ----------
+def _wait_connected(wlan, timeout_s):
+    deadline = utime.ticks_add(utime.ticks_ms(), int(timeout_s * 1000))
+    while utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
+        if wlan.isconnected():
+            return True
+        if wlan.status() < 0:          # wrong password / no AP / fail
+            return False
+        utime.sleep_ms(100)
+    return wlan.isconnected()
+
+def _sta_up():
+    ap = network.WLAN(network.AP_IF)
+    ap.active(False)
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(True)
+    if not wlan.active():
+        log.warn("Wi-Fi: WLAN interface failed to start, retrying")
+        utime.sleep(0.5)
+        wlan.active(True)
+    return wlan
+
+def _sta_reset():
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(False)
+    utime.sleep_ms(200)
+    return _sta_up()
+
+def _best_bssid(wlan, ssid):
+    """Scan once; return (bssid, channel) of the strongest AP for ssid."""
+    best = None
+    try:
+        for n in wlan.scan():
+            # (ssid, bssid, channel, RSSI, security, hidden)
+            if n[0] == ssid and (best is None or n[3] > best[3]):
+                best = n
+    except OSError as e:
+        log.warn("Wi-Fi: wlan.scan() raised:", e)
+    if best is None:
+        return None, 0
+    return best[1], best[2]
+
+def _connect_fast(ssid, password, cache):
+    """Join the cached BSSID (no scan); the lease comes from DHCP."""
+    wlan = _sta_up()
+    if wlan.isconnected():
+        return wlan
+    bssid = _unhex(cache.get("bssid", ""))
+    try:
+        if bssid:
+            wlan.connect(ssid, password, bssid=bssid)
+        else:
+            wlan.connect(ssid, password)
+    except OSError as e:
+        log.warn("Wi-Fi: wlan.connect() raised:", e)
+        return None
+    if _wait_connected(wlan, FAST_TIMEOUT_S):
+        return wlan
+    return None
+
+def _connect_full(ssid, password):
+    """Reset STA, scan for the best BSSID, associate and DHCP."""
+    wlan = _sta_reset()
+    bssid, channel = _best_bssid(wlan, ssid)
+    try:
+        if bssid:
+            wlan.connect(ssid, password, bssid=bssid)
+        else:
+            wlan.connect(ssid, password)
+    except OSError as e:
+        log.warn("Wi-Fi: wlan.connect() raised:", e)
+        return None, None, 0
+    if _wait_connected(wlan, FULL_TIMEOUT_S):
+        return wlan, bssid, channel
+    return None, None, 0
+
+def connect(ssid, password, use_cache=True):
+    """
+    Connect STA. Tries the cached BSSID/lease first, then a full connect.
+    Records the successful BSSID, channel and lease for next time.
+    Returns the connected WLAN or None.
+    """
+    global connect_ms, connect_path
+    cache = load_cache(ssid) if use_cache else None
+
+    if cache:
+        t = utime.ticks_ms()
+        wlan = _connect_fast(ssid, password, cache)
+        if wlan:
+            _leased(wlan)
+            connect_path = "fast"
+            connect_ms = utime.ticks_diff(utime.ticks_ms(), BOOT_T0)
+            log.info("Wi-Fi: connected (cached BSSID ch%d) in %d ms:" % (cache.get("channel", 0), utime.ticks_diff(utime.ticks_ms(), t)), wlan.ifconfig())
+            return wlan
+        log.info("Wi-Fi: cached details failed — full connect")
+        clear_cache()
+
+    t = utime.ticks_ms()
+    wlan, bssid, channel = _connect_full(ssid, password)
+    if not wlan:
+        log.warn("Wi-Fi: connection failed")
+        network.WLAN(network.STA_IF).active(False)
+        return None
+    _leased(wlan)
+    connect_path = "full"
+    connect_ms = utime.ticks_diff(utime.ticks_ms(), BOOT_T0)
+    log.info("Wi-Fi: connected (full scan) in %d ms:" % utime.ticks_diff(utime.ticks_ms(), t), wlan.ifconfig())
+    save_cache(ssid, bssid, channel, wlan.ifconfig())
+    return wlan
+
+def log_boot_timing():
+    log.info("Boot → Wi-Fi connected: %s ms (%s path)" % (connect_ms, connect_path))
+
+# ---------- SUPERVISOR ----------
+# Non-blocking link watchdog for the main loop. Notices link loss, re-joins
+# in the background with exponential backoff and only resets the board
+# after a long, bounded outage.
+RECONNECT_MIN_S = 2
+RECONNECT_MAX_S = 120
+OUTAGE_RESET_S  = 1800    # 30 min dark link → machine.reset()
+HARD_RESET_EVERY = 4      # every Nth attempt also power-cycles the STA
+
+_creds       = None
+_down_since  = None       # ticks_ms when link loss was first seen
+_next_try    = 0          # ticks_ms of next reconnect attempt
+_backoff_s   = RECONNECT_MIN_S
+_attempts    = 0
+
+outages      = 0          # link losses seen since boot
+reconnects   = 0          # successful background reconnects
+last_outage_ms = 0        # duration of the last recovered outage
+
+# Parked by power.py: the radio is off on purpose, not an outage
+parked       = False
+_resume_t0   = None       # ticks_ms of resume(), until the link is back
+last_resume_ms = None     # resume() → connected, last time
+
+def _start_reconnect():
+    global _creds, _attempts
+    if _creds is None:
+        _creds = load_creds()
+    if not _creds:
+        return
+    ssid, password = _creds
+    _attempts += 1
+    if _attempts % HARD_RESET_EVERY == 0:
+        wlan = _sta_reset()
+    else:
+        wlan = network.WLAN(network.STA_IF)
+        wlan.active(True)
+    _use_dhcp(wlan)
+    cache = load_cache(ssid)
+    bssid = _unhex(cache.get("bssid", "")) if cache else b""
+    log.info("Wi-Fi: reconnect attempt", _attempts, "(next in %ds)" % _backoff_s)
+    try:
+        # Returns immediately; association completes while we keep rendering
+        if bssid and _attempts == 1:
+            wlan.connect(ssid, password, bssid=bssid)
+        else:
+            wlan.connect(ssid, password)
+    except OSError as e:
+        log.warn("Wi-Fi: wlan.connect() raised:", e)
+
+def supervise():
+    """
+    Call frequently from the main loop. Never blocks for long.
+    Returns True while the link is up.
+    """
+    global _down_since, _next_try, _backoff_s, _attempts
+    global outages, reconnects, last_outage_ms, _resume_t0, last_resume_ms
+    if parked:
+        return False
+    wlan = network.WLAN(network.STA_IF)
+    now = utime.ticks_ms()
+
+    if _resume_t0 is not None:
+        if wlan.isconnected():
+            last_resume_ms = utime.ticks_diff(now, _resume_t0)
+            _resume_t0 = None
+            if not static_ip:
+                _leased(wlan)
+            return True
+        if utime.ticks_diff(now, _resume_t0) < FAST_TIMEOUT_S * 1000:
+            return False
+        # the fast rejoin did not make it: treat as an ordinary outage
+        _resume_t0 = None
+
+    if wlan.isconnected():
+        if _down_since is not None:
+            last_outage_ms = utime.ticks_diff(now, _down_since)
+            reconnects += 1
+            log.info("Wi-Fi: link restored after %d ms" % last_outage_ms, wlan.ifconfig())
+            if not static_ip:
+                _leased(wlan)
+            _down_since = None
+            _backoff_s = RECONNECT_MIN_S
+            _attempts = 0
+        return True
+
+    if _down_since is None:
+        _down_since = now
+        _next_try = now
+        outages += 1
+        log.warn("Wi-Fi: link lost — reconnecting in background")
+
+    if utime.ticks_diff(now, _down_since) > OUTAGE_RESET_S * 1000:
+        import machine
+        log.error("Wi-Fi: outage exceeded %ds — resetting" % OUTAGE_RESET_S)
+        log.flush()
+        utime.sleep(1)
+        machine.reset()
+
+    if utime.ticks_diff(now, _next_try) >= 0:
+        _start_reconnect()
+        _next_try = utime.ticks_add(now, _backoff_s * 1000)
+        _backoff_s = min(_backoff_s * 2, RECONNECT_MAX_S)
+    return False
+
+def outage_ms():
+    """Milliseconds the link has currently been down (0 if up)."""
+    if _down_since is None:
+        return 0
+    return utime.ticks_diff(utime.ticks_ms(), _down_since)
+
+# ---------- PARK / RESUME (power.py) ----------
+def park():
+    """Switch the radio off; supervise() stands down until resume()."""
+    global parked, _resume_t0
+    parked = True
+    _resume_t0 = None
+    wlan = network.WLAN(network.STA_IF)
+    try:
+        wlan.disconnect()
+    except OSError:
+        pass
+    wlan.active(False)
+
+def resume():
+    """
+    Radio back on and start joining the cached BSSID, on the last lease
+    while it is fresh (else DHCP). Returns immediately; supervise() reports
+    the link once it is up and falls back to the normal reconnect path
+    after FAST_TIMEOUT_S.
+    """
+    global parked, _creds, _resume_t0, _down_since, static_ip
+    parked = False
+    _down_since = None
+    _resume_t0 = utime.ticks_ms()
+    if _creds is None:
+        _creds = load_creds()
+    if not _creds:
+        return
+    ssid, password = _creds
+    wlan = _sta_up()
+    cache = load_cache(ssid)
+    bssid = _unhex(cache.get("bssid", "")) if cache else b""
+    static_ip = False
+    if _lease_fresh():
+        try:
+            wlan.ifconfig(_lease_cfg)
+            static_ip = True
+        except Exception as e:
+            log.warn("Wi-Fi: static ifconfig rejected:", e)
+    try:
+        if bssid:
+            wlan.connect(ssid, password, bssid=bssid)
+        else:
+            wlan.connect(ssid, password)
+    except OSError as e:
+        log.warn("Wi-Fi: wlan.connect() raised:", e)